@@ -0,0 +1,315 @@
+"""Загрузка изображений игры с кешем масштабированных версий.
+
+Спрайты размером в клетку собираются в один атлас вместе с
+заранее повёрнутыми копиями. Масштабированные
+изображения сохраняются на диск в виде сырых RGBA-байтов, имя файла
+содержит хеш исходных PNG и размер, поэтому при следующем запуске
+декодирование и масштабирование пропускаются, а изменение исходника
+или размера клетки само приводит к пересборке.
+"""
+import hashlib
+import os
+from collections import OrderedDict
+
+import pygame as pg
+
+IMAGES_DIR = 'assets/images'
+CACHE_DIR = 'assets/cache'
+
+# Версия формата кеша, увеличивается при изменении способа сборки.
+CACHE_VERSION = 1
+
+# Спрайты размером в одну клетку поля, которые попадают в атлас.
+SPRITE_NAMES = ('snake_head', 'snake_body', 'apple', 'cherry', 'pulm',
+                'orange')
+
+
+def image_path(name: str) -> str:
+    """Путь к исходному PNG изображения."""
+    return os.path.join(IMAGES_DIR, f'{name}.png')
+
+
+def source_hash(names: tuple[str, ...], size: tuple[int, int],
+                variant: str = '') -> str:
+    """
+    Хеш исходных файлов и параметров сборки.
+
+    Args:
+        names: Имена исходных изображений.
+        size: Итоговый размер.
+        variant: Прочие параметры сборки в виде строки.
+
+    Returns:
+        Шестнадцатеричный ключ для имени файла кеша.
+    """
+    digest = hashlib.sha1(f'{CACHE_VERSION}:{size}:{variant}'.encode())
+    for name in names:
+        with open(image_path(name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def scaled(name: str, size: tuple[int, int]) -> pg.Surface:
+    """Исходное изображение, масштабированное в RGBA-поверхность."""
+    surface = pg.Surface(size, pg.SRCALPHA)
+    surface.blit(pg.transform.scale(pg.image.load(image_path(name)), size),
+                 (0, 0))
+    return surface
+
+
+def display_format(surface: pg.Surface) -> pg.Surface:
+    """Переводит поверхность в формат окна, если окно уже создано."""
+    if pg.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha()
+
+
+def cached_surface(prefix: str, names: tuple[str, ...],
+                   size: tuple[int, int], build,
+                   cache_dir: str = CACHE_DIR,
+                   variant: str = '') -> pg.Surface:
+    """
+    Поверхность из кеша на диске или собранная заново.
+
+    Args:
+        prefix: Префикс имени файла кеша.
+        names: Исходные изображения, от которых зависит результат.
+        size: Размер итоговой поверхности.
+        build: Функция без аргументов, собирающая поверхность.
+        cache_dir: Каталог кеша.
+        variant: Прочие параметры сборки, влияющие на результат.
+
+    Returns:
+        Поверхность в формате RGBA.
+    """
+    key = source_hash(names, size, variant)
+    path = os.path.join(cache_dir, f'{prefix}-{size[0]}x{size[1]}-{key}.rgba')
+    try:
+        with open(path, 'rb') as f:
+            return pg.image.frombytes(f.read(), size, 'RGBA')
+    except (OSError, ValueError):
+        pass
+
+    surface = build()
+    # Запись через временный файл, чтобы параллельный запуск не
+    # прочитал недописанный кеш.
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(pg.image.tobytes(surface, 'RGBA'))
+        os.replace(tmp_path, path)
+    except OSError:
+        # Кеш недоступен для записи (только чтение, нет места):
+        # игра работает с собранной поверхностью без кеша.
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return surface
+
+
+def load_image(name: str, size: tuple[int, int] | None = None,
+               cache_dir: str = CACHE_DIR) -> pg.Surface:
+    """
+    Загрузка изображения в формате окна.
+
+    Args:
+        name: Имя изображения без расширения.
+        size: Размер, до которого нужно масштабировать изображение.
+            None - оставить исходный размер без кеширования.
+        cache_dir: Каталог кеша.
+
+    Returns:
+        Поверхность изображения.
+    """
+    if size is None:
+        return display_format(pg.image.load(image_path(name)))
+
+    surface = cached_surface(name, (name,), size,
+                             lambda: scaled(name, size), cache_dir)
+    return display_format(surface)
+
+
+class SpriteAtlas:
+    """
+    Спрайты размером в клетку на одной поверхности.
+
+    Каждый кадр атласа - спрайт с углом поворота, повёрнутые копии
+    хранятся рядом с исходными, поэтому при отрисовке не нужен
+    pg.transform.rotate.
+
+    Attributes:
+        surface (pg.Surface): Поверхность атласа.
+        size (int): Размер спрайта в пикселях.
+        rects (dict[tuple[str, int], pg.Rect]): Области кадров на
+            атласе по ключу (имя, угол).
+    """
+
+    def __init__(self, surface: pg.Surface, size: int,
+                 frames: tuple[tuple[str, int], ...]):
+        self.surface = surface
+        self.size = size
+        self.rects = {frame: pg.Rect(i * size, 0, size, size)
+                      for i, frame in enumerate(frames)}
+
+    def image(self, name: str, angle: int = 0) -> pg.Surface:
+        """Спрайт как отдельная поверхность (без копирования пикселей)."""
+        return self.surface.subsurface(self.rects[name, angle])
+
+    def blit(self, target: pg.Surface, name: str, position,
+             angle: int = 0) -> pg.Rect:
+        """Отрисовка спрайта на поверхности target."""
+        return target.blit(self.surface, position, self.rects[name, angle])
+
+
+def atlas_frames(names: tuple[str, ...],
+                 rotations: dict[str, tuple[int, ...]]
+                 ) -> tuple[tuple[str, int], ...]:
+    """Ключи кадров атласа: спрайты без поворота, затем повёрнутые."""
+    frames = [(name, 0) for name in names]
+    for name, angles in rotations.items():
+        frames.extend((name, angle) for angle in angles if angle)
+    return tuple(frames)
+
+
+def load_atlas(size: int, names: tuple[str, ...] = SPRITE_NAMES,
+               rotations: dict[str, tuple[int, ...]] | None = None,
+               cache_dir: str = CACHE_DIR) -> SpriteAtlas:
+    """
+    Загрузка атласа спрайтов заданного размера.
+
+    Args:
+        size: Размер клетки в пикселях (с учётом масштаба экрана).
+        names: Имена спрайтов в порядке размещения на атласе.
+        rotations: Углы, на которые нужно заранее повернуть спрайты.
+        cache_dir: Каталог кеша.
+
+    Returns:
+        Атлас спрайтов.
+    """
+    frames = atlas_frames(names, rotations or {})
+
+    def build():
+        surface = pg.Surface((size * len(frames), size), pg.SRCALPHA)
+        for i, (name, angle) in enumerate(frames):
+            image = scaled(name, (size, size))
+            if angle:
+                image = pg.transform.rotate(image, angle)
+            surface.blit(image, (i * size, 0))
+        return surface
+
+    surface = cached_surface('atlas', names, (size * len(frames), size),
+                             build, cache_dir, variant=repr(frames))
+    return SpriteAtlas(display_format(surface), size, frames)
+
+
+class LazyAssets(dict):
+    """
+    Словарь ресурсов, загружаемых при первом обращении.
+
+    Attributes:
+        loaders (dict): Функции без аргументов, загружающие ресурс
+            по его ключу.
+    """
+
+    def __init__(self, loaders: dict):
+        super().__init__()
+        self.loaders = loaders
+
+    def __missing__(self, key):
+        """Загружает ресурс и запоминает его."""
+        value = self[key] = self.loaders[key]()
+        return value
+
+
+def load_font(name: str | None, size: int,
+              system: bool = False) -> pg.font.Font:
+    """
+    Загрузка шрифта с инициализацией модуля шрифтов.
+
+    Args:
+        name: Имя шрифта или None для шрифта по умолчанию.
+        size: Размер шрифта.
+        system: Искать шрифт среди системных.
+
+    Returns:
+        Объект шрифта.
+    """
+    if not pg.font.get_init():
+        pg.font.init()
+    if system:
+        return pg.font.SysFont(name, size)
+    return pg.font.Font(name, size)
+
+
+def init_mixer() -> bool:
+    """
+    Инициализация звука при первом использовании.
+
+    Returns:
+        True, если звук доступен.
+    """
+    if pg.mixer.get_init():
+        return True
+    try:
+        pg.mixer.init()
+    except pg.error:
+        return False
+    return True
+
+
+def load_sound(path: str) -> pg.mixer.Sound | None:
+    """
+    Загрузка звука.
+
+    Returns:
+        Звук или None, если на машине нет звукового устройства.
+    """
+    if not init_mixer():
+        return None
+    return pg.mixer.Sound(path)
+
+
+class TextCache:
+    """
+    Кеш отрисованного текста с вытеснением давно не используемого.
+
+    Attributes:
+        maxsize (int): Максимальное число хранимых поверхностей.
+        surfaces (OrderedDict): Поверхности по ключу
+            (шрифт, текст, цвет) от старых к свежим.
+        hits (int): Количество попаданий в кеш.
+        misses (int): Количество отрисовок текста.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font: pg.font.Font, text: str, color) -> pg.Surface:
+        """
+        Поверхность с текстом из кеша или отрисованная заново.
+
+        Args:
+            font: Шрифт.
+            text: Текст.
+            color: Цвет текста.
+
+        Returns:
+            Поверхность с текстом (общая для всех вызовов, изменять
+            её нельзя).
+        """
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.surfaces[key] = font.render(text, True, color)
+        if len(self.surfaces) > self.maxsize:
+            self.surfaces.popitem(last=False)
+        return surface
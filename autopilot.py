@@ -0,0 +1,288 @@
+"""Автопилот змейки: поиск пути по полю с переходом через края.
+
+Таблица соседей (номер клетки -> номера четырёх соседних клеток с
+учётом выхода за край, как в Snake.move) строится один раз на размер
+поля. Поле расстояний до яблок строится поиском в ширину от яблок по
+клеткам без стен постепенно, слоями на NumPy: на каждом решении обход
+продолжается, пока не дойдёт до одной из клеток рядом с головой, но
+не дальше FIELD_BUDGET клеток. Пока обход не дошёл до головы (большое поле,
+яблоко далеко), змейка идёт по расстоянию до яблока без учёта стен.
+Когда яблоки перемещаются, обход начинается заново, а решение стоит
+не больше нескольких слоёв обхода на поле любого размера.
+
+Чтобы не запереть себя, ход рядом с препятствиями проверяется
+ограниченной заливкой: после хода голове должно хватать места на длину
+змейки или путь к хвосту, который к тому времени освободится. Ход в
+открытое место (свободны клетки впереди, по бокам и по диагоналям
+впереди) не может отрезать часть поля, и заливка для него не нужна.
+Если безопасного хода к яблоку нет, змейка идёт туда, где больше
+места (за хвостом).
+
+Автопилот - бот с тем же интерфейсом, что в tournament.py:
+
+    direction = autopilot.drive(world, world.snake)
+"""
+from array import array
+
+import numpy as np
+
+import engine
+
+# Расстояние до клетки, до которой обход не дошёл.
+UNREACHABLE = 0x7FFFFFFF
+
+# Сколько клеток обход поля расстояний проходит за одно решение.
+FIELD_BUDGET = 1024
+
+# Индексы направлений, перпендикулярных каждому из engine.DIRECTIONS.
+SIDES = tuple(
+    tuple(i for i, side in enumerate(engine.DIRECTIONS)
+          if side[0] != direction[0] and side[1] != direction[1])
+    for direction in engine.DIRECTIONS)
+
+
+def neighbour_table(board: engine.Board) -> array:
+    """
+    Соседи всех клеток поля.
+
+    Returns:
+        Массив длиной 4 * board.size: для клетки i элементы
+        4 * i + d - номер соседней клетки в направлении
+        engine.DIRECTIONS[d].
+    """
+    cells = np.arange(board.size, dtype=np.int64)
+    xs, ys = cells % board.width, cells // board.width
+    table = np.empty((board.size, len(engine.DIRECTIONS)), dtype=np.int32)
+    for d, (dx, dy) in enumerate(engine.DIRECTIONS):
+        table[:, d] = ((ys + dy) % board.height * board.width
+                       + (xs + dx) % board.width)
+    return array('i', table.tobytes())
+
+
+class Autopilot:
+    """
+    Автопилот для одного размера поля.
+
+    Стены берутся из поля игры при каждом решении, поэтому автопилот
+    подходит для любых полей этого размера.
+
+    Attributes:
+        board (engine.Board): Поле, по размеру которого построена
+            таблица соседей.
+        table (array): Таблица соседей (см. neighbour_table).
+        neighbours (np.ndarray): Та же таблица формы (клетки, 4) для
+            обхода слоями.
+        field (np.ndarray): Расстояния от клеток до ближайшего
+            яблока; UNREACHABLE - обход до клетки ещё не дошёл.
+        key (tuple | None): Поле игры и клетки яблок, для которых
+            строится field.
+        frontier (np.ndarray): Последний пройденный слой обхода.
+        level (int): Расстояние клеток слоя frontier.
+        mark (np.ndarray): Рабочий массив для удаления повторов из
+            слоя обхода.
+        seen (array): Отметки заливки по клеткам; клетка посещена,
+            если отметка равна stamp.
+        stamp (int): Номер текущей заливки.
+    """
+
+    def __init__(self, board: engine.Board):
+        self.board = board
+        self.table = neighbour_table(board)
+        self.neighbours = np.frombuffer(self.table, dtype=np.int32).reshape(
+            board.size, len(engine.DIRECTIONS))
+        self.field = np.full(board.size, UNREACHABLE, dtype=np.int32)
+        self.key = None
+        self.frontier = np.empty(0, dtype=np.int32)
+        self.level = 0
+        self.mark = np.zeros(board.size, dtype=np.int32)
+        self.seen = array('I', bytes(4 * board.size))
+        self.stamp = 0
+
+    def distance_field(self, world: engine.World, near=None,
+                       budget: int | None = None) -> np.ndarray:
+        """
+        Поле расстояний до яблок игры world.
+
+        Обход идёт слоями (все клетки на одном расстоянии сразу) и
+        продолжается с того слоя, на котором остановился в прошлый
+        раз; если поле игры или клетки яблок изменились, он
+        начинается заново.
+
+        Args:
+            world: Состояние игры.
+            near: Клетки, до одной из которых нужно дойти, None -
+                пройти всё поле.
+            budget: Сколько клеток обхода можно пройти, None - без
+                ограничения. Хотя бы один слой проходится всегда.
+
+        Returns:
+            Поле расстояний: у пройденных клеток точное расстояние,
+            у остальных UNREACHABLE.
+        """
+        board = world.board
+        targets = tuple(board.index(apple.position) for apple in world.apples
+                        if apple.active)
+        key = (board, targets)
+        if key != self.key:
+            self.key = key
+            self.field = np.full(board.size, UNREACHABLE, dtype=np.int32)
+            self.frontier = np.array(targets, dtype=np.int32)
+            self.field[self.frontier] = 0
+            self.level = 0
+        field = self.field
+        near = () if near is None else near
+        walls = np.frombuffer(board.wall_map, dtype=np.uint8)
+        spent = 0
+        while (self.frontier.size and not any(field[cell] != UNREACHABLE
+                                              for cell in near)
+               and (budget is None or spent < budget)):
+            cells = self.neighbours[self.frontier].ravel()
+            cells = cells[(field[cells] == UNREACHABLE) & (walls[cells] == 0)]
+            # Клетка, соседняя с несколькими клетками слоя, остаётся
+            # одна: в mark остаётся последняя запись. В отличие от
+            # np.unique, слой не сортируется.
+            order = np.arange(cells.size, dtype=np.int32)
+            self.mark[cells] = order
+            cells = cells[self.mark[cells] == order]
+            self.level += 1
+            field[cells] = self.level
+            self.frontier = cells
+            spent += cells.size
+        return field
+
+    def estimate(self, cell: int) -> int:
+        """Число ходов от клетки до ближайшего яблока без учёта стен."""
+        board = self.board
+        x, y = cell % board.width, cell // board.width
+        best = UNREACHABLE
+        for target in self.key[1]:
+            dx = abs(x - target % board.width)
+            dy = abs(y - target // board.width)
+            best = min(best, min(dx, board.width - dx)
+                       + min(dy, board.height - dy))
+        return best
+
+    def open_ahead(self, world: engine.World, cell: int, d: int) -> bool:
+        """
+        Проверка, что ход в cell не отрезает часть поля.
+
+        Args:
+            world: Состояние игры.
+            cell: Клетка, в которую входит голова.
+            d: Индекс направления хода.
+        """
+        table, walls = self.table, world.board.wall_map
+        occupancy = world.occupancy
+        front = table[4 * cell + d]
+        if walls[front] or occupancy[front]:
+            return False
+        for side in SIDES[d]:
+            for near in (table[4 * cell + side], table[4 * front + side]):
+                if walls[near] or occupancy[near]:
+                    return False
+        return True
+
+    def room(self, world: engine.World, start: int, tail: int,
+             limit: int) -> tuple[int, bool]:
+        """
+        Ограниченная заливка свободных клеток от клетки start.
+
+        Args:
+            world: Состояние игры.
+            start: Клетка, в которую входит голова.
+            tail: Клетка хвоста: если до неё можно дойти, змейка
+                успеет за освобождающимся хвостом.
+            limit: Сколько клеток достаточно найти.
+
+        Returns:
+            Пара (найдено клеток, не больше limit; достижим ли хвост).
+        """
+        self.stamp += 1
+        stamp, seen = self.stamp, self.seen
+        walls, occupancy, table = (world.board.wall_map, world.occupancy,
+                                   self.table)
+        seen[start] = stamp
+        queue = [start]
+        for cell in queue:
+            for neighbour in table[4 * cell:4 * cell + 4]:
+                if neighbour == tail:
+                    return len(queue), True
+                if (seen[neighbour] == stamp or walls[neighbour]
+                        or occupancy[neighbour]):
+                    continue
+                seen[neighbour] = stamp
+                queue.append(neighbour)
+                if len(queue) >= limit:
+                    return len(queue), False
+        return len(queue), False
+
+    def __call__(self, world: engine.World,
+                 snake: engine.Snake) -> tuple[int, int] | None:
+        """
+        Направление змейки на следующий тик.
+
+        Returns:
+            Направление или None, если любой ход ведёт к гибели.
+        """
+        table, walls = self.table, world.board.wall_map
+        occupancy = world.occupancy
+        capacity = len(snake.body)
+        head = snake.body[snake.head]
+        tail = snake.body[(snake.head + snake.size - 1) % capacity]
+        # Хвост уходит с клетки на этом тике, если змейка не растёт.
+        tail_moves = snake.size >= snake.length
+        back = (-snake.direction[0], -snake.direction[1])
+
+        moves = []
+        for d, direction in enumerate(engine.DIRECTIONS):
+            cell = table[4 * head + d]
+            if direction == back or walls[cell]:
+                continue
+            if occupancy[cell] and not (tail_moves and cell == tail):
+                continue
+            moves.append((d, cell))
+        if not moves:
+            return None
+        field = self.distance_field(world, [cell for _, cell in moves],
+                                    FIELD_BUDGET)
+        # Клетки, до которых обход не дошёл, дальше пройденных; между
+        # собой они сравниваются по расстоянию без учёта стен.
+        moves.sort(key=lambda move: (
+            field[move[1]], self.estimate(move[1])
+            if field[move[1]] == UNREACHABLE else 0))
+
+        need = snake.length + 1
+        spaces = []
+        for d, cell in moves:
+            if self.open_ahead(world, cell, d):
+                return engine.DIRECTIONS[d]
+            space, reaches_tail = self.room(world, cell, tail, need)
+            if reaches_tail or space >= need:
+                return engine.DIRECTIONS[d]
+            spaces.append((space, d))
+        # Безопасного хода нет: туда, где больше места.
+        return engine.DIRECTIONS[max(spaces)[1]]
+
+
+# Автопилоты по размерам полей: таблицы соседей строятся один раз на
+# размер, а стены и поле расстояний берутся из поля каждой игры.
+_pilots = {}
+
+
+def drive(world: engine.World, snake: engine.Snake) -> tuple[int, int] | None:
+    """
+    Бот-автопилот: направление змейки на следующий тик.
+
+    Args:
+        world: Состояние игры.
+        snake: Управляемая змейка.
+
+    Returns:
+        Направление или None.
+    """
+    board = world.board
+    key = (board.width, board.height)
+    pilot = _pilots.get(key)
+    if pilot is None:
+        pilot = _pilots[key] = Autopilot(board)
+    return pilot(world, snake)
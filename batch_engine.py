@@ -0,0 +1,170 @@
+"""Пакетная версия игровой логики на NumPy.
+
+BatchWorld хранит N независимых игр в массивах и продвигает их все
+одним вызовом step. Правила совпадают с engine.step для змейки и
+яблока: выход за край поля, столкновения со стенами и телом, рост и
+перенос яблока. Бонусные фрукты в пакетном режиме не участвуют.
+
+Тело змейки хранится в сетке занятости: для каждой клетки записан
+тик, на котором её освободит хвост. Клетка занята, если это значение
+больше текущего тика, поэтому хвост не нужно удалять явно.
+"""
+import numpy as np
+
+from engine import DIRECTIONS, MAX_SPEED, SPEED_STEP, Board
+
+# Смещения для направлений в порядке engine.DIRECTIONS:
+# RIGHT, LEFT, UP, DOWN. Противоположное направление - индекс ^ 1.
+DIRECTION_DELTAS = np.array(DIRECTIONS, dtype=np.int64)
+
+# Попытки случайного выбора клетки до перехода к полному перебору.
+SAMPLE_ATTEMPTS = 8
+
+
+class BatchWorld:
+    """
+    Набор независимых игр, обновляемых одновременно.
+
+    Attributes:
+        board (engine.Board): Общее для всех игр поле.
+        size (int): Количество игр.
+        heads (np.ndarray): Координаты голов, форма (N, 2).
+        directions (np.ndarray): Индексы направлений в DIRECTIONS.
+        lengths (np.ndarray): Длины змеек.
+        speeds (np.ndarray): Скорости змеек.
+        scores (np.ndarray): Текущие счета.
+        fruits (np.ndarray): Координаты яблок, форма (N, 2).
+        grid (np.ndarray): Тик освобождения клеток, форма (N, W * H).
+        tick (int): Номер текущего тика.
+    """
+
+    def __init__(self, size: int, board: Board | None = None,
+                 seed: int | None = None):
+        """
+        Создание набора игр.
+
+        Args:
+            size: Количество игр.
+            board: Игровое поле, по умолчанию стандартное.
+            seed: Зерно генератора случайных чисел.
+        """
+        self.board = board or Board()
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        width, height = self.board.width, self.board.height
+        self.shape = np.array((width, height), dtype=np.int64)
+        self.walls = np.zeros(width * height, dtype=bool)
+        for x, y in self.board.walls:
+            self.walls[y * width + x] = True
+        self.free_cells = np.flatnonzero(~self.walls)
+
+        self.heads = np.zeros((size, 2), dtype=np.int64)
+        self.directions = np.zeros(size, dtype=np.int64)
+        self.lengths = np.zeros(size, dtype=np.int64)
+        self.speeds = np.zeros(size, dtype=np.float64)
+        self.scores = np.zeros(size, dtype=np.int64)
+        self.fruits = np.zeros((size, 2), dtype=np.int64)
+        self.grid = np.zeros((size, width * height), dtype=np.int64)
+        self.tick = 0
+        self.reset(np.ones(size, dtype=bool))
+
+    def cells(self, points: np.ndarray) -> np.ndarray:
+        """Переводит координаты (x, y) в номера клеток."""
+        return points[:, 1] * self.board.width + points[:, 0]
+
+    def reset(self, mask: np.ndarray) -> None:
+        """
+        Сброс выбранных игр в начальное состояние.
+
+        Args:
+            mask: Булев массив игр для сброса.
+        """
+        games = np.flatnonzero(mask)
+        if not games.size:
+            return
+        self.grid[games] = 0
+        starts = self.rng.choice(self.free_cells, size=games.size)
+        self.heads[games, 0] = starts % self.board.width
+        self.heads[games, 1] = starts // self.board.width
+        self.directions[games] = self.rng.integers(0, 4, size=games.size)
+        self.lengths[games] = 1
+        self.speeds[games] = 0.1
+        self.scores[games] = 0
+        self.grid[games, starts] = self.tick + 1
+        self.respawn_fruits(games)
+
+    def respawn_fruits(self, games: np.ndarray) -> None:
+        """
+        Перенос яблок выбранных игр в свободные клетки.
+
+        Сначала клетки выбираются случайно с проверкой занятости,
+        оставшиеся после SAMPLE_ATTEMPTS попыток игры (почти
+        заполненные поля) перебирают свободные клетки целиком.
+
+        Args:
+            games: Номера игр.
+        """
+        pending = games
+        for _ in range(SAMPLE_ATTEMPTS):
+            if not pending.size:
+                return
+            cells = self.rng.choice(self.free_cells, size=pending.size)
+            free = self.grid[pending, cells] <= self.tick
+            self.set_fruits(pending[free], cells[free])
+            pending = pending[~free]
+        for game in pending:
+            empty = self.free_cells[
+                self.grid[game, self.free_cells] <= self.tick]
+            if empty.size:
+                self.set_fruits(np.array([game]),
+                                self.rng.choice(empty, size=1))
+
+    def set_fruits(self, games: np.ndarray, cells: np.ndarray) -> None:
+        """Размещает яблоки выбранных игр в заданных клетках."""
+        self.fruits[games, 0] = cells % self.board.width
+        self.fruits[games, 1] = cells // self.board.width
+
+    def step(self, actions: np.ndarray | None = None
+             ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Продвигает все игры на один тик.
+
+        Args:
+            actions: Индексы новых направлений в DIRECTIONS, -1 - без
+                поворота. None - ни одна змейка не поворачивает.
+
+        Returns:
+            Тройка массивов: съела ли змейка яблоко, погибла ли она и
+            счёт на момент гибели (0 для выживших).
+        """
+        games = np.arange(self.size)
+        if actions is not None:
+            actions = np.asarray(actions)
+            # Поворот допустим только перпендикулярно движению.
+            turn = (actions >= 0) & (actions >> 1 != self.directions >> 1)
+            self.directions[turn] = actions[turn]
+
+        self.tick += 1
+        self.heads += DIRECTION_DELTAS[self.directions]
+        self.heads %= self.shape
+        heads = self.cells(self.heads)
+
+        dead = self.walls[heads] | (self.grid[games, heads] > self.tick)
+        self.grid[games, heads] = self.tick + self.lengths
+
+        ate = ~dead & (self.heads == self.fruits).all(axis=1)
+        eaten = np.flatnonzero(ate)
+        if eaten.size:
+            self.lengths[eaten] += 1
+            self.scores[eaten] += 10
+            self.speeds[eaten] = np.minimum(
+                self.speeds[eaten] + SPEED_STEP, MAX_SPEED)
+            # Каждый сегмент живёт на тик дольше - змейка растёт.
+            body = self.grid[eaten]
+            body[body > self.tick] += 1
+            self.grid[eaten] = body
+            self.respawn_fruits(eaten)
+
+        final_scores = np.where(dead, self.scores, 0)
+        self.reset(dead)
+        return ate, dead, final_scores
@@ -0,0 +1,127 @@
+"""Соединение тонкого клиента с сервером (см. server.py).
+
+Сокет читается в фоновом потоке, а игровой цикл pygame раз в кадр
+забирает накопившиеся тики без ожидания сети.
+"""
+import queue
+import socket
+import threading
+
+import engine
+import protocol
+
+
+class ConnectionRejected(Exception):
+    """Сервер не принял игрока: в комнате нет свободных змеек."""
+
+
+def read_message(sock: socket.socket) -> tuple[int, bytes]:
+    """
+    Читает одно сообщение из сокета.
+
+    Raises:
+        ConnectionError: Соединение закрыто.
+        ValueError: Слишком длинное сообщение.
+    """
+    kind, size = protocol.FRAME.unpack(read_exactly(sock, protocol.FRAME.size))
+    if size > protocol.MAX_MESSAGE:
+        raise ValueError('Слишком длинное сообщение')
+    return kind, read_exactly(sock, size)
+
+
+def read_exactly(sock: socket.socket, size: int) -> bytes:
+    """Читает ровно size байт."""
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError('Сервер закрыл соединение')
+        data += chunk
+    return bytes(data)
+
+
+class Connection:
+    """
+    Подключение к комнате сервера.
+
+    Attributes:
+        socket (socket.socket): Сокет соединения.
+        mirror (protocol.Mirror): Копия игры сервера.
+        inbox (queue.SimpleQueue): Тела сообщений MSG_TICK; None -
+            соединение закрыто.
+        thread (threading.Thread): Поток чтения.
+    """
+
+    def __init__(self, host: str, port: int, room: str, name: str,
+                 timeout: float = 5.0):
+        """
+        Вход в комнату и получение снимка игры.
+
+        Args:
+            host: Адрес сервера.
+            port: Порт сервера.
+            room: Название комнаты.
+            name: Имя игрока.
+            timeout: Время ожидания соединения и снимка (с).
+
+        Raises:
+            ConnectionRejected: В комнате нет свободных змеек.
+            OSError: Сервер недоступен.
+        """
+        self.socket = socket.create_connection((host, port), timeout)
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.socket.sendall(protocol.frame(protocol.MSG_JOIN,
+                                           protocol.pack_text(room, name)))
+        kind, payload = read_message(self.socket)
+        if kind != protocol.MSG_WELCOME:
+            self.socket.close()
+            raise ConnectionRejected(room)
+        self.mirror = protocol.Mirror(payload)
+        self.socket.settimeout(None)
+        self.inbox = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.run, name='net-reader',
+                                       daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        """Цикл потока чтения."""
+        try:
+            while True:
+                kind, payload = read_message(self.socket)
+                if kind == protocol.MSG_TICK:
+                    self.inbox.put(payload)
+        except (OSError, ValueError):
+            pass
+        self.inbox.put(None)
+
+    def receive(self) -> tuple[list[tuple], int, bool]:
+        """
+        Применяет к копии игры все полученные тики.
+
+        Returns:
+            Тройка: события тиков, количество тиков и признак
+            закрытого соединения.
+        """
+        events, ticks = [], 0
+        while True:
+            try:
+                payload = self.inbox.get_nowait()
+            except queue.Empty:
+                return events, ticks, False
+            if payload is None:
+                return events, ticks, True
+            events.extend(self.mirror.apply(payload))
+            ticks += 1
+
+    def send_turn(self, direction: tuple[int, int]) -> None:
+        """Отправляет поворот своей змейки."""
+        self.socket.sendall(protocol.frame(
+            protocol.MSG_TURN, bytes([engine.DIRECTIONS.index(direction)])))
+
+    def close(self) -> None:
+        """Закрывает соединение."""
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.socket.close()
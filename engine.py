@@ -0,0 +1,880 @@
+"""Игровая логика 'Змейки' без зависимости от pygame.
+
+Модуль не создаёт окон и не проигрывает звуков: состояние игры
+хранится в объекте World, а функция step продвигает его на один тик
+и возвращает список произошедших событий. Отрисовкой и звуком
+занимается фронтенд (my_snake.py).
+
+На одном поле может быть несколько змеек: step_all двигает их все
+за тик, а столкновения решаются по общей сетке занятости клеток.
+"""
+import math
+from array import array
+from functools import cached_property
+from random import Random, SystemRandom
+
+# Размеры игрового поля в клетках.
+GRID_WIDTH = 33
+GRID_HEIGHT = 25
+
+# Константы для смены направления движения змейки.
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+
+DIRECTIONS = (RIGHT, LEFT, UP, DOWN)
+
+# Константы фруктов.
+FRUIT_APPLE = 'apple'
+FRUIT_CHERRY = 'cherry'
+FRUIT_PLUM = 'pulm'
+FRUIT_ORANGE = 'orange'
+
+# Типы событий, которые возвращает step.
+EVENT_EAT = 'eat'
+EVENT_DEATH = 'death'
+
+# Прибавка скорости за съеденный фрукт и предельная скорость.
+SPEED_STEP = 0.05
+MAX_SPEED = 10
+
+# Время жизни бонуса и минимальный интервал между бонусами (секунды).
+# Таймеры считают в тиках: секунды переводятся в тики по скорости
+# змейки в момент появления бонуса.
+BONUS_LIFETIME = 10
+BONUS_INTERVAL = 15
+
+# События таймеров.
+TIMER_BONUS_EXPIRE = 'bonus_expire'
+TIMER_BONUS_WINDOW = 'bonus_window'
+
+# Начальный размер кольцевого буфера тела змейки.
+INITIAL_BODY_CAPACITY = 16
+
+# Количество ячеек колеса таймеров. Таймеры дальше этого числа тиков
+# лежат в ячейке до нужного оборота.
+TIMER_SLOTS = 256
+
+
+class Board:
+    """
+    Игровое поле в клетках.
+
+    Стены хранятся битовой картой по номерам клеток, поэтому память
+    поля - один байт на клетку, а множества всех клеток строятся
+    только по запросу.
+
+    Attributes:
+        width (int): Ширина поля.
+        height (int): Высота поля.
+        walls (frozenset[tuple[int, int]]): Клетки со стенами.
+        wall_map (bytearray): 1 для клеток со стенами, по номерам клеток.
+    """
+
+    def __init__(self, width: int = GRID_WIDTH, height: int = GRID_HEIGHT):
+        self.width = width
+        self.height = height
+        # Стены в виде креста через центр поля.
+        self.walls = frozenset(
+            {((width - 1) // 2, y) for y in range(height)}
+            | {(x, (height - 1) // 2) for x in range(width)}
+        )
+        self.wall_map = bytearray(width * height)
+        for cell in self.walls:
+            self.wall_map[self.index(cell)] = 1
+
+    @property
+    def size(self) -> int:
+        """Количество клеток поля."""
+        return self.width * self.height
+
+    @cached_property
+    def cells(self) -> frozenset[tuple[int, int]]:
+        """Все клетки поля (строится при первом обращении)."""
+        return frozenset((x, y) for x in range(self.width)
+                         for y in range(self.height))
+
+    @cached_property
+    def open_cells(self) -> frozenset[tuple[int, int]]:
+        """Клетки без стен (строится при первом обращении)."""
+        return self.cells - self.walls
+
+    def is_wall(self, cell: tuple[int, int]) -> bool:
+        """Проверка, стоит ли в клетке стена."""
+        return bool(self.wall_map[cell[1] * self.width + cell[0]])
+
+    def wrap(self, x: int, y: int) -> tuple[int, int]:
+        """Возвращает клетку с учётом выхода за границы поля."""
+        return x % self.width, y % self.height
+
+    def index(self, cell: tuple[int, int]) -> int:
+        """Номер клетки в построчной нумерации поля."""
+        return cell[1] * self.width + cell[0]
+
+    def point(self, index: int) -> tuple[int, int]:
+        """Клетка по её номеру."""
+        y, x = divmod(index, self.width)
+        return x, y
+
+
+# Отметка «клетки нет в индексе» в FreeCells.where.
+ABSENT = 0xFFFFFFFF
+
+
+class FreeCells:
+    """
+    Индекс свободных клеток с выбором случайной клетки за O(1).
+
+    Номера клеток хранятся в массиве items, а массив where указывает
+    позицию каждой клетки в нём. Удаление переставляет на место
+    удалённой клетки последнюю, поэтому все операции стоят O(1), а
+    память - 8 байт на клетку поля.
+
+    Attributes:
+        board (Board): Игровое поле.
+        items (array): Номера свободных клеток.
+        where (array): Позиция клетки в items или ABSENT.
+    """
+
+    def __init__(self, board: Board):
+        self.board = board
+        walls = board.wall_map
+        self.items = array('I', (i for i in range(board.size)
+                                 if not walls[i]))
+        self.where = array('I', [ABSENT]) * board.size
+        for position, index in enumerate(self.items):
+            self.where[index] = position
+
+    @property
+    def cells(self) -> list[tuple[int, int]]:
+        """Свободные клетки списком (для отладки и проверок)."""
+        return [self.board.point(index) for index in self.items]
+
+    def __len__(self) -> int:
+        """Количество свободных клеток."""
+        return len(self.items)
+
+    def __contains__(self, cell) -> bool:
+        """Проверка, свободна ли клетка."""
+        return self.where[self.board.index(cell)] != ABSENT
+
+    def add(self, cell: tuple[int, int]) -> None:
+        """Отмечает клетку свободной (повторный вызов ничего не меняет)."""
+        index = self.board.index(cell)
+        if self.where[index] == ABSENT:
+            self.where[index] = len(self.items)
+            self.items.append(index)
+
+    def discard(self, cell: tuple[int, int] | None) -> None:
+        """Отмечает клетку занятой (повторный вызов ничего не меняет)."""
+        if cell is None:
+            return
+        index = self.board.index(cell)
+        position = self.where[index]
+        if position == ABSENT:
+            return
+        self.where[index] = ABSENT
+        last = self.items.pop()
+        if position < len(self.items):
+            self.items[position] = last
+            self.where[last] = position
+
+    def choice(self, rng: Random) -> tuple[int, int] | None:
+        """Случайная свободная клетка или None, если свободных нет."""
+        if not self.items:
+            return None
+        return self.board.point(rng.choice(self.items))
+
+
+class Snake:
+    """
+    Змейка без отрисовки.
+
+    Тело хранится в кольцевом буфере номеров клеток, а счётчик
+    занятости по клеткам поля отвечает на вопрос "есть ли тут тело"
+    за O(1). Змейки одной игры делят общий счётчик, поэтому он
+    учитывает и чужие тела. Движение, рост и укорачивание хвоста
+    тоже стоят O(1) (рост - в среднем: заполненный буфер
+    удваивается), буфер занимает память по длине змейки, а не по
+    размеру поля.
+
+    Attributes:
+        direction (Tuple[int, int]): Текущее направление движения.
+        length (int): Длина змейки.
+        speed (float): Скорость змейки.
+        score (int): Текущий счёт змейки.
+        body (array): Кольцевой буфер номеров клеток тела.
+        head (int): Индекс головы в кольцевом буфере.
+        size (int): Количество сегментов в буфере.
+        occupancy (bytearray): Число сегментов в каждой клетке поля.
+    """
+
+    def __init__(self, board: Board, rng: Random, free: FreeCells,
+                 occupancy: bytearray | None = None):
+        """
+        Создание змейки.
+
+        Args:
+            board: Игровое поле.
+            rng: Генератор случайных чисел игры.
+            free: Индекс свободных клеток, который змейка обновляет
+                при движении.
+            occupancy: Общий счётчик занятости клеток змейками игры,
+                по умолчанию свой.
+        """
+        self.board = board
+        self.rng = rng
+        self.free = free
+        self.body = array('I', bytes(4 * INITIAL_BODY_CAPACITY))
+        self.occupancy = (bytearray(board.size) if occupancy is None
+                          else occupancy)
+        self.head = 0
+        self.size = 0
+        self.reset()
+
+    @property
+    def positions(self) -> list[tuple[int, int]]:
+        """Клетки сегментов от головы к хвосту."""
+        capacity = len(self.body)
+        return [self.board.point(self.body[(self.head + i) % capacity])
+                for i in range(self.size)]
+
+    @positions.setter
+    def positions(self, cells: list[tuple[int, int]]) -> None:
+        self.clear()
+        for cell in reversed(cells):
+            self.push(cell)
+
+    def grow_buffer(self) -> None:
+        """Удваивает кольцевой буфер, раскладывая тело с начала."""
+        capacity = len(self.body)
+        body = array('I', (self.body[(self.head + i) % capacity]
+                           for i in range(self.size)))
+        body.extend(bytes(4 * capacity))
+        self.body = body
+        self.head = 0
+
+    def push(self, cell: tuple[int, int]) -> None:
+        """Добавляет сегмент перед головой."""
+        if self.size == len(self.body):
+            self.grow_buffer()
+        index = self.board.index(cell)
+        self.head = (self.head - 1) % len(self.body)
+        self.body[self.head] = index
+        self.size += 1
+        self.occupancy[index] += 1
+        self.free.discard(cell)
+
+    def pop(self) -> None:
+        """Убирает последний сегмент хвоста."""
+        self.size -= 1
+        index = self.body[(self.head + self.size) % len(self.body)]
+        self.occupancy[index] -= 1
+        # Голова погибшей змейки может оказаться в стене.
+        if not self.occupancy[index] and not self.board.wall_map[index]:
+            self.free.add(self.board.point(index))
+
+    def clear(self) -> None:
+        """Убирает все сегменты с поля."""
+        while self.size:
+            self.pop()
+
+    def reset(self) -> None:
+        """Сброс змейки в случайную свободную клетку."""
+        self.clear()
+        self.direction = self.rng.choice(DIRECTIONS)
+        self.push(self.free.choice(self.rng))
+        self.length = 1
+        self.speed = 0.1
+        self.score = 0
+
+    def update_direction(self, new_dir: tuple[int, int]) -> None:
+        """
+        Поворот змейки.
+
+        Разворот на 180 градусов и движение в том же направлении
+        игнорируются.
+
+        Args:
+            new_dir: Новое направление движения (UP, DOWN, LEFT, RIGHT).
+        """
+        if new_dir[0] != self.direction[0] and new_dir[1] != self.direction[1]:
+            self.direction = new_dir
+
+    def next_head(self) -> tuple[int, int]:
+        """Клетка, в которую голова войдёт на следующем ходу."""
+        x_local, y_local = self.get_head_position()
+        dx, dy = self.direction
+        return self.board.wrap(x_local + dx, y_local + dy)
+
+    def make_room(self) -> None:
+        """Освобождает клетку хвоста, если змейка не растёт."""
+        if self.size >= self.length:
+            self.pop()
+
+    def move(self) -> None:
+        """Перемещение змейки в текущем направлении."""
+        head = self.next_head()
+        # Хвост освобождает клетку раньше, чем в неё может войти голова.
+        self.make_room()
+        self.push(head)
+
+    def accelerate(self) -> None:
+        """Увеличивает скорость змейки, не превышая MAX_SPEED."""
+        self.speed = min(MAX_SPEED, self.speed + SPEED_STEP)
+
+    def shrink(self, length: int) -> None:
+        """Укорачивает змейку до заданной длины."""
+        self.length = length
+        while self.size > length:
+            self.pop()
+
+    def occupies(self, cell: tuple[int, int]) -> bool:
+        """Проверка, занята ли клетка телом змейки."""
+        return self.occupancy[self.board.index(cell)] > 0
+
+    def bites_itself(self) -> bool:
+        """
+        Проверка, попала ли голова в тело.
+
+        На общем счётчике занятости это и своё тело, и чужое, и
+        голова другой змейки в той же клетке.
+        """
+        return self.occupancy[self.body[self.head]] > 1
+
+    def get_head_position(self) -> tuple[int, int]:
+        """Возвращает клетку головы змейки."""
+        return self.board.point(self.body[self.head])
+
+
+class Fruit:
+    """
+    Фрукт на поле.
+
+    Клетка фрукта записывается в общий индекс «клетка - фрукт», по
+    которому столкновение с головой проверяется за O(1).
+
+    Attributes:
+        name (str): Название фрукта (ключ в FRUIT_TYPES).
+        position (Tuple[int, int]): Клетка фрукта.
+        active (bool): Находится ли фрукт на поле.
+        spawn_time (float): Игровое время появления фрукта.
+        timer (Timer | None): Таймер исчезновения фрукта.
+        index (dict): Общий индекс фруктов по клеткам.
+    """
+
+    def __init__(self, name: str, active: bool = False,
+                 index: dict | None = None):
+        self.name = name
+        self.index = {} if index is None else index
+        self._position = None
+        self.active = active
+        self.spawn_time = 0.0
+        self.timer = None
+
+    @property
+    def position(self) -> tuple[int, int] | None:
+        """Клетка фрукта."""
+        return self._position
+
+    @position.setter
+    def position(self, cell: tuple[int, int] | None) -> None:
+        if self.index.get(self._position) is self:
+            del self.index[self._position]
+        self._position = cell
+        if cell is not None:
+            self.index[cell] = self
+
+    def randomize_position(self, rng: Random, free: FreeCells) -> None:
+        """
+        Перенос фрукта в случайную свободную клетку.
+
+        Занятая фруктом клетка удаляется из индекса. Если свободных
+        клеток не осталось, фрукт убирается с поля.
+
+        Args:
+            rng: Генератор случайных чисел игры.
+            free: Индекс свободных клеток.
+        """
+        self.position = free.choice(rng)
+        self.active = self.position is not None
+        free.discard(self.position)
+
+    def place(self, cell: tuple[int, int], free: FreeCells) -> None:
+        """
+        Переносит фрукт в клетку cell.
+
+        Прежняя клетка фрукта возвращается в индекс свободных клеток,
+        новая удаляется из него.
+
+        Args:
+            cell: Новая клетка фрукта.
+            free: Индекс свободных клеток.
+        """
+        self.release(free)
+        self.position = cell
+        self.active = True
+        free.discard(cell)
+
+    def release(self, free: FreeCells) -> None:
+        """
+        Убирает фрукт с поля и возвращает его клетку в индекс.
+
+        Args:
+            free: Индекс свободных клеток.
+        """
+        if self.active:
+            free.add(self.position)
+        self.active = False
+
+
+class Timer:
+    """
+    Событие, запланированное на тик.
+
+    Attributes:
+        tick (int): Тик срабатывания.
+        event (tuple): Событие (тип, данные).
+        cancelled (bool): Таймер отменён.
+    """
+
+    __slots__ = ('tick', 'event', 'cancelled')
+
+    def __init__(self, tick: int, event: tuple):
+        self.tick = tick
+        self.event = event
+        self.cancelled = False
+
+
+class TimerWheel:
+    """
+    Колесо таймеров по номерам тиков.
+
+    Таймер кладётся в ячейку tick % size, поэтому планирование и
+    отмена стоят O(1), а на каждом тике просматривается только одна
+    ячейка.
+
+    Attributes:
+        slots (list[list[Timer]]): Ячейки колеса.
+        tick (int): Последний обработанный тик.
+    """
+
+    def __init__(self, size: int = TIMER_SLOTS):
+        self.slots = [[] for _ in range(size)]
+        self.tick = 0
+
+    def schedule(self, delay: int, event: tuple) -> Timer:
+        """
+        Планирует событие.
+
+        Args:
+            delay: Через сколько тиков сработать (не меньше 1).
+            event: Событие (тип, данные).
+
+        Returns:
+            Таймер, который можно отменить.
+        """
+        timer = Timer(self.tick + max(1, delay), event)
+        self.slots[timer.tick % len(self.slots)].append(timer)
+        return timer
+
+    @staticmethod
+    def cancel(timer: Timer | None) -> None:
+        """Отменяет таймер, если он есть."""
+        if timer is not None:
+            timer.cancelled = True
+
+    def advance(self) -> list[tuple]:
+        """
+        Переходит к следующему тику.
+
+        Returns:
+            События, сработавшие на этом тике, в порядке планирования.
+        """
+        self.tick += 1
+        slot = self.slots[self.tick % len(self.slots)]
+        if not slot:
+            return []
+        due = [timer.event for timer in slot
+               if timer.tick == self.tick and not timer.cancelled]
+        slot[:] = [timer for timer in slot
+                   if timer.tick > self.tick and not timer.cancelled]
+        return due
+
+
+class World:
+    """
+    Полное состояние одной игры.
+
+    Attributes:
+        board (Board): Игровое поле.
+        seed (int | None): Зерно генератора, None - генератор передан
+            снаружи.
+        rng (Random): Генератор случайных чисел игры.
+        free (FreeCells): Клетки без стен, змеек и фруктов.
+        occupancy (bytearray): Число сегментов всех змеек в каждой
+            клетке поля.
+        snakes (List[Snake]): Змейки в порядке игроков.
+        snake (Snake): Первая змейка; её скорость задаёт темп игры.
+        fruits (dict): Индекс фруктов по клеткам.
+        apples (List[Fruit]): Яблоки.
+        apple (Fruit): Первое яблоко.
+        bonuses (List[Fruit]): Бонусные фрукты, по одному каждого вида
+            с временем жизни.
+        score (int): Текущий счёт первой змейки.
+        tick (int): Количество выполненных тиков.
+        time (float): Игровое время в секундах.
+        timers (TimerWheel): Запланированные события игры.
+        bonus_ready (bool): Интервал после прошлого бонуса прошёл.
+    """
+
+    def __init__(self, board: Board | None = None, rng: Random | None = None,
+                 seed: int | None = None, apples: int = 1,
+                 snakes: int = 1):
+        """
+        Создание игры.
+
+        Args:
+            board: Игровое поле, по умолчанию стандартное.
+            rng: Готовый генератор случайных чисел.
+            seed: Зерно нового генератора, если rng не передан.
+                По умолчанию выбирается случайно.
+            apples: Количество яблок на поле.
+            snakes: Количество змеек на поле.
+        """
+        self.board = board or Board()
+        if rng is None and seed is None:
+            seed = random_seed()
+        self.seed = None if rng else seed
+        self.rng = rng or Random(seed)
+        self.free = FreeCells(self.board)
+        self.occupancy = bytearray(self.board.size)
+        self.snakes = [Snake(self.board, self.rng, self.free, self.occupancy)
+                       for _ in range(snakes)]
+        self.snake = self.snakes[0]
+        self.fruits = {}
+        self.apples = [Fruit(FRUIT_APPLE, index=self.fruits)
+                       for _ in range(apples)]
+        for apple in self.apples:
+            apple.randomize_position(self.rng, self.free)
+        self.apple = self.apples[0]
+        self.bonuses = [Fruit(name, index=self.fruits)
+                        for name, kind in FRUIT_TYPES.items()
+                        if kind.lifetime]
+        self.tick = 0
+        self.time = 0.0
+        self.timers = TimerWheel()
+        self.bonus_ready = False
+        self.timers.schedule(self.ticks_for(BONUS_INTERVAL),
+                             (TIMER_BONUS_WINDOW, None))
+
+    @property
+    def score(self) -> int:
+        """Текущий счёт первой змейки."""
+        return self.snake.score
+
+    @score.setter
+    def score(self, value: int) -> None:
+        self.snake.score = value
+
+    def blocked(self, cell: tuple[int, int]) -> bool:
+        """Проверка, стоит ли в клетке стена или тело змейки."""
+        index = self.board.index(cell)
+        return bool(self.board.wall_map[index] or self.occupancy[index])
+
+    def ticks_for(self, seconds: float) -> int:
+        """Количество тиков в seconds при текущей скорости змейки."""
+        # Округление убирает погрешность деления перед ceil.
+        return math.ceil(round(seconds / tick_duration(self.snake.speed), 6))
+
+    def fruit_at(self, cell: tuple[int, int]) -> Fruit | None:
+        """Фрукт на поле в клетке cell или None."""
+        fruit = self.fruits.get(cell)
+        return fruit if fruit is not None and fruit.active else None
+
+    def visible_bonuses(self) -> list[Fruit]:
+        """Активные бонусы, которые нужно показать игроку."""
+        return [bonus for bonus in self.bonuses if bonus.active]
+
+    def bonus_remaining(self, bonus: Fruit) -> int:
+        """Оставшееся время жизни бонуса в целых секундах."""
+        if bonus.timer is None:
+            return 0
+        seconds = (bonus.timer.tick - self.tick) * tick_duration(
+            self.snake.speed)
+        return min(BONUS_LIFETIME, max(0, math.ceil(round(seconds, 6))))
+
+
+def random_seed() -> int:
+    """Случайное 64-битное зерно для новой игры."""
+    return SystemRandom().getrandbits(64)
+
+
+def tick_duration(speed: float) -> float:
+    """Длительность одного тика в секундах при заданной скорости."""
+    return 1 / (5 + speed)
+
+
+class FruitType:
+    """
+    Вид фрукта.
+
+    Attributes:
+        name (str): Название вида, оно же имя спрайта.
+        effect (Callable[[World, Snake, Fruit], None]): Эффект при
+            поедании.
+        chance (float): Шанс появления бонуса за тик после интервала.
+        lifetime (float | None): Время жизни на поле в секундах,
+            None - фрукт не исчезает (яблоко).
+        allowed (Callable[[World], bool]): Может ли фрукт появиться
+            при текущем состоянии игры (хотя бы для одной змейки).
+    """
+
+    def __init__(self, name: str, effect, chance: float = 0.0,
+                 lifetime: float | None = None, allowed=None):
+        self.name = name
+        self.effect = effect
+        self.chance = chance
+        self.lifetime = lifetime
+        self.allowed = allowed or (lambda world: True)
+
+
+# Зарегистрированные виды фруктов по названию.
+FRUIT_TYPES = {}
+
+
+def register_fruit(name: str, chance: float = 0.0,
+                   lifetime: float | None = None, allowed=None):
+    """
+    Декоратор, регистрирующий эффект нового вида фрукта.
+
+    Args:
+        name: Название вида.
+        chance: Шанс появления бонуса за тик после интервала.
+        lifetime: Время жизни на поле в секундах.
+        allowed: Условие появления, функция от World.
+
+    Returns:
+        Декоратор функции эффекта (world, snake, fruit) -> None, где
+        snake - съевшая фрукт змейка.
+    """
+    def decorator(effect):
+        FRUIT_TYPES[name] = FruitType(name, effect, chance, lifetime,
+                                      allowed)
+        return effect
+    return decorator
+
+
+@register_fruit(FRUIT_APPLE)
+def eat_apple(world: World, snake: Snake, fruit: Fruit) -> None:
+    """Рост змейки, очки и новое место яблока."""
+    snake.length += 1
+    snake.score += 10
+    snake.accelerate()
+    fruit.randomize_position(world.rng, world.free)
+
+
+@register_fruit(FRUIT_ORANGE, chance=0.01, lifetime=BONUS_LIFETIME,
+                allowed=lambda world: any(snake.length > 5
+                                          for snake in world.snakes))
+def eat_orange(world: World, snake: Snake, fruit: Fruit) -> None:
+    """Уменьшает длину змейки (не менее 5 сегментов)."""
+    snake.shrink(max(5, snake.length - 1))
+    snake.score += 30
+
+
+@register_fruit(FRUIT_PLUM, chance=0.01, lifetime=BONUS_LIFETIME,
+                allowed=lambda world: any(snake.speed > 1
+                                          for snake in world.snakes))
+def eat_plum(world: World, snake: Snake, fruit: Fruit) -> None:
+    """Уменьшает скорость на 0.5 (не менее 1)."""
+    snake.speed = max(1, snake.speed - 0.5)
+    snake.score += 30
+
+
+@register_fruit(FRUIT_CHERRY, chance=0.05, lifetime=BONUS_LIFETIME)
+def eat_cherry(world: World, snake: Snake, fruit: Fruit) -> None:
+    """Бонус очков в зависимости от времени на поле."""
+    time_active = int(world.time - fruit.spawn_time)
+    snake.score += 150 - 10 * time_active
+    snake.length += 1
+    snake.accelerate()
+
+
+def bonus_spawn(world: World) -> None:
+    """Попытка активировать бонусный фрукт после интервала."""
+    if not world.bonus_ready:
+        return
+    rng = world.rng
+    # Перемешивает список, чтобы бонусы проверялись в случайном порядке.
+    rng.shuffle(world.bonuses)
+    for bonus in world.bonuses:
+        kind = FRUIT_TYPES[bonus.name]
+        if (bonus.active or not kind.allowed(world)
+                or rng.random() >= kind.chance):
+            continue
+        bonus.randomize_position(rng, world.free)
+        if not bonus.active:
+            return
+        bonus.spawn_time = world.time
+        bonus.timer = world.timers.schedule(
+            world.ticks_for(kind.lifetime), (TIMER_BONUS_EXPIRE, bonus))
+        world.bonus_ready = False
+        world.timers.schedule(world.ticks_for(BONUS_INTERVAL),
+                              (TIMER_BONUS_WINDOW, None))
+        return
+
+
+def fire_timers(world: World) -> None:
+    """Обрабатывает таймеры, сработавшие на текущем тике."""
+    for kind, data in world.timers.advance():
+        if kind == TIMER_BONUS_EXPIRE:
+            # Истёкший бонус убирается с поля.
+            data.release(world.free)
+            data.timer = None
+        elif kind == TIMER_BONUS_WINDOW:
+            world.bonus_ready = True
+
+
+def eat_fruit(world: World, snake: Snake, fruit: Fruit) -> None:
+    """Применяет эффект фрукта, съеденного змейкой snake."""
+    # Клетка фрукта теперь под головой змейки и в индекс не возвращается.
+    fruit.active = False
+    world.timers.cancel(fruit.timer)
+    fruit.timer = None
+    FRUIT_TYPES[fruit.name].effect(world, snake, fruit)
+
+
+def move_snakes(world: World) -> None:
+    """
+    Перемещает все змейки на клетку.
+
+    Сначала освобождаются хвосты всех змеек, затем в новые клетки
+    входят головы, поэтому голова может занять клетку, которую на
+    этом же ходу покинул хвост другой змейки.
+    """
+    snakes = world.snakes
+    heads = [snake.next_head() for snake in snakes]
+    for snake in snakes:
+        snake.make_room()
+    for snake, head in zip(snakes, heads):
+        snake.push(head)
+
+
+def handle_collisions(world: World) -> list[tuple]:
+    """
+    Обработка столкновений всех змеек после хода.
+
+    Каждая голова проверяется по общей сетке занятости за O(1):
+    больше одного сегмента в клетке головы означает удар в своё или
+    чужое тело, а две головы в одной клетке гибнут обе, поэтому
+    спорный фрукт никому не достаётся. Погибшие змейки
+    возвращаются на поле после того, как выжившие съели фрукты.
+
+    Returns:
+        Список событий (тип события, номер змейки, данные).
+    """
+    walls = world.board.wall_map
+    occupancy = world.occupancy
+    crashed = [occupancy[cell] > 1 or walls[cell]
+               for cell in (snake.body[snake.head] for snake in world.snakes)]
+    events = []
+    for player, snake in enumerate(world.snakes):
+        if crashed[player]:
+            events.append((EVENT_DEATH, player, snake.score))
+            continue
+        # Фрукт под головой находится по индексу клеток.
+        fruit = world.fruit_at(snake.get_head_position())
+        if fruit is not None:
+            eat_fruit(world, snake, fruit)
+            events.append((EVENT_EAT, player, fruit.name))
+    dead = [snake for player, snake in enumerate(world.snakes)
+            if crashed[player]]
+    heads = [snake.get_head_position() for snake in dead]
+    for snake in dead:
+        snake.clear()
+    # Фрукт, на котором встретились головы, остаётся на поле: его
+    # клетка снова занята до того, как погибшие змейки выберут клетки.
+    for cell in heads:
+        if world.fruit_at(cell) is not None:
+            world.free.discard(cell)
+    for snake in dead:
+        snake.reset()
+    return events
+
+
+def step_all(world: World, actions=None) -> tuple[World, list[tuple]]:
+    """
+    Продвигает игру с несколькими змейками на один тик.
+
+    Стоимость тика растёт линейно с числом змеек: каждая голова
+    проверяется по сетке занятости, без попарных сравнений змеек.
+
+    Args:
+        world: Состояние игры.
+        actions: Новые направления змеек в порядке world.snakes,
+            None в списке - змейка не поворачивает. None - никто не
+            поворачивает.
+
+    Returns:
+        Пара (состояние после тика, список событий (тип, номер
+        змейки, данные)).
+    """
+    if actions is not None:
+        for snake, action in zip(world.snakes, actions):
+            if action is not None:
+                snake.update_direction(action)
+    world.tick += 1
+    world.time += tick_duration(world.snake.speed)
+    fire_timers(world)
+    bonus_spawn(world)
+    move_snakes(world)
+    return world, handle_collisions(world)
+
+
+def step(world: World,
+         action: tuple[int, int] | None = None) -> tuple[World, list[tuple]]:
+    """
+    Продвигает игру на один тик.
+
+    Состояние изменяется на месте, чтобы тик не требовал копирования
+    змейки; функция не обращается к окну, звуку и системным часам.
+    Остальные змейки, если они есть, не поворачивают.
+
+    Args:
+        world: Состояние игры.
+        action: Новое направление первой змейки или None, чтобы не
+            поворачивать.
+
+    Returns:
+        Пара (состояние после тика, список событий первой змейки).
+    """
+    _, events = step_all(world, (action,))
+    return world, [(kind, data) for kind, player, data in events
+                   if player == 0]
+
+
+def steer_clear(world: World, snake: Snake) -> tuple[int, int] | None:
+    """
+    Простой соперник: сворачивает, только если впереди препятствие.
+
+    Args:
+        world: Состояние игры.
+        snake: Управляемая змейка.
+
+    Returns:
+        Направление поворота в свободную клетку или None, если путь
+        прямо свободен или свернуть некуда.
+    """
+    if not world.blocked(snake.next_head()):
+        return None
+    x, y = snake.get_head_position()
+    board = world.board
+    dx, dy = snake.direction
+    turns = [(dy, dx), (-dy, -dx)]
+    world.rng.shuffle(turns)
+    for tx, ty in turns:
+        if not world.blocked(board.wrap(x + tx, y + ty)):
+            return tx, ty
+    return None
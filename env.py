@@ -0,0 +1,404 @@
+"""Среда для обучения ботов в стиле Gym: reset() и step().
+
+Наблюдение - тензор uint8 формы (каналы, высота, ширина) с единицами
+в занятых клетках. Каналы: стены, тело, голова, яблоки и по одному
+каналу на каждый вид бонуса (см. channel_names). Тензор выделяется
+один раз и заполняется на месте: стены копируются при сбросе, тело
+берётся из счётчика занятости движка через представление NumPy без
+копирования, а голова и фрукты переставляются по нескольким клеткам.
+
+Награда - прирост счёта за тик по правилам engine (яблоко 10, апельсин
+и слива 30, вишня - меньше с каждой секундой на поле). Гибель
+заканчивает эпизод.
+
+SharedEnvBatch запускает среды в процессах, которые пишут наблюдения,
+награды и признаки конца эпизода в общую память; между процессами
+передаются только короткие команды.
+"""
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import engine
+
+# Предел тиков эпизода, после него эпизод обрезается.
+MAX_STEPS = 10000
+
+# Номера постоянных каналов наблюдения.
+CHANNEL_WALLS = 0
+CHANNEL_BODY = 1
+CHANNEL_HEAD = 2
+CHANNEL_APPLE = 3
+
+
+def bonus_names() -> list[str]:
+    """Виды бонусов, у каждого свой канал, по названию."""
+    return sorted(name for name, kind in engine.FRUIT_TYPES.items()
+                  if kind.lifetime)
+
+
+def channel_names() -> list[str]:
+    """Названия каналов наблюдения по порядку."""
+    return ['walls', 'body', 'head', engine.FRUIT_APPLE, *bonus_names()]
+
+
+class SnakeEnv:
+    """
+    Игра одной змейки как среда обучения.
+
+    Действие - индекс направления в engine.DIRECTIONS или None (не
+    поворачивать); разворот назад игнорируется, как в игре.
+
+    Attributes:
+        board (engine.Board): Игровое поле.
+        max_steps (int): Предел тиков эпизода.
+        observation (np.ndarray): Буфер наблюдения, который
+            обновляется на месте при каждом reset и step.
+        world (engine.World | None): Текущая игра.
+        channels (dict[str, int]): Номер канала фрукта по названию.
+        marked (list[tuple]): Клетки каналов головы и фруктов,
+            отмеченные в прошлом наблюдении.
+    """
+
+    def __init__(self, board_size: tuple[int, int] = (engine.GRID_WIDTH,
+                                                      engine.GRID_HEIGHT),
+                 max_steps: int = MAX_STEPS,
+                 observation: np.ndarray | None = None):
+        """
+        Создание среды.
+
+        Args:
+            board_size: Размер поля в клетках.
+            max_steps: Предел тиков эпизода.
+            observation: Готовый буфер наблюдения (например, в общей
+                памяти) формы observation_shape, по умолчанию новый.
+        """
+        self.board = engine.Board(*board_size)
+        self.max_steps = max_steps
+        self.channels = {name: channel for channel, name
+                         in enumerate(channel_names())
+                         if channel >= CHANNEL_APPLE}
+        shape = observation_shape(board_size)
+        if observation is None:
+            observation = np.zeros(shape, dtype=np.uint8)
+        elif observation.shape != shape or observation.dtype != np.uint8:
+            raise ValueError(f'Буфер наблюдения должен быть uint8 {shape}')
+        self.observation = observation
+        self.world = None
+        self.occupancy = None
+        self.marked = []
+
+    def grid(self, buffer) -> np.ndarray:
+        """Представление байтов по клеткам поля формы (высота, ширина)."""
+        return np.frombuffer(buffer, dtype=np.uint8).reshape(
+            self.board.height, self.board.width)
+
+    def reset(self, seed: int | None = None) -> tuple[np.ndarray, dict]:
+        """
+        Начинает новый эпизод.
+
+        Args:
+            seed: Зерно игры, по умолчанию случайное.
+
+        Returns:
+            Пара (наблюдение, сведения об игре).
+        """
+        self.world = engine.World(self.board, seed=seed)
+        self.occupancy = self.grid(self.world.occupancy)
+        self.observation.fill(0)
+        self.observation[CHANNEL_WALLS] = self.grid(self.board.wall_map)
+        self.marked = []
+        self.observe()
+        return self.observation, self.info()
+
+    def observe(self) -> None:
+        """Обновляет буфер наблюдения по текущей игре."""
+        observation = self.observation
+        np.minimum(self.occupancy, 1, out=observation[CHANNEL_BODY])
+        for cell in self.marked:
+            observation[cell] = 0
+        marked = []
+        x, y = self.world.snake.get_head_position()
+        marked.append((CHANNEL_HEAD, y, x))
+        for fruit in (*self.world.apples, *self.world.bonuses):
+            if fruit.active:
+                x, y = fruit.position
+                marked.append((self.channels[fruit.name], y, x))
+        for cell in marked:
+            observation[cell] = 1
+        self.marked = marked
+
+    def info(self) -> dict:
+        """Счёт, длина змейки и номер тика."""
+        world = self.world
+        return {'score': world.score, 'length': world.snake.length,
+                'tick': world.tick}
+
+    def step(self, action: int | None
+             ) -> tuple[np.ndarray, float, bool, bool, dict]:
+        """
+        Один тик игры.
+
+        Args:
+            action: Индекс направления в engine.DIRECTIONS или None.
+
+        Returns:
+            Наблюдение, награда, признак гибели, признак обрезки
+            эпизода по max_steps и сведения об игре. После гибели
+            info['score'] - счёт на момент гибели.
+        """
+        world = self.world
+        score = world.score
+        direction = None if action is None else engine.DIRECTIONS[action]
+        _, events = engine.step(world, direction)
+        info = self.info()
+        terminated = False
+        reward = world.score - score
+        for kind, data in events:
+            if kind == engine.EVENT_DEATH:
+                terminated = True
+                reward = 0
+                info['score'] = data
+        self.observe()
+        truncated = not terminated and world.tick >= self.max_steps
+        return self.observation, float(reward), terminated, truncated, info
+
+
+def observation_shape(board_size: tuple[int, int]) -> tuple[int, int, int]:
+    """Форма наблюдения для поля board_size."""
+    return len(channel_names()), board_size[1], board_size[0]
+
+
+def batch_arrays(count: int, board_size: tuple[int, int]) -> dict:
+    """Формы и типы общих массивов пакета из count сред."""
+    return {
+        'observations': ((count, *observation_shape(board_size)), np.uint8),
+        'actions': ((count,), np.int8),
+        'rewards': ((count,), np.float32),
+        'terminated': ((count,), np.bool_),
+        'truncated': ((count,), np.bool_),
+        'scores': ((count,), np.int32),
+    }
+
+
+def attach(blocks: dict, count: int,
+           board_size: tuple[int, int]) -> dict[str, np.ndarray]:
+    """Массивы NumPy поверх блоков общей памяти."""
+    return {name: np.ndarray(shape, dtype, buffer=blocks[name].buf)
+            for name, (shape, dtype) in batch_arrays(count,
+                                                     board_size).items()}
+
+
+def episode_seed(first_seed: int | None, index: int, episode: int,
+                 count: int) -> int | None:
+    """
+    Зерно эпизода среды пакета.
+
+    Среда index получает зёрна first_seed + index, затем с шагом count,
+    поэтому зёрна всех эпизодов пакета различны и весь пакет
+    воспроизводится по first_seed.
+
+    Returns:
+        Зерно или None (случайное), если first_seed не задан.
+    """
+    if first_seed is None:
+        return None
+    return first_seed + index + episode * count
+
+
+def worker(names: dict, count: int, board_size: tuple[int, int],
+           max_steps: int, envs: range, connection) -> None:
+    """
+    Процесс пакета: ведёт среды envs и пишет результаты в общую память.
+
+    Команды приходят по connection: ('reset', первое зерно), ('step',)
+    и ('close',). После каждой команды процесс отвечает None, а если
+    команда не удалась - исключением.
+    """
+    blocks = {name: shared_memory.SharedMemory(block_name)
+              for name, block_name in names.items()}
+    arrays = attach(blocks, count, board_size)
+    observations = arrays['observations']
+    games = {index: SnakeEnv(board_size, max_steps, observations[index])
+             for index in envs}
+    first_seed = None
+    episodes = dict.fromkeys(envs, 0)
+    while True:
+        command = connection.recv()
+        if command[0] == 'close':
+            break
+        try:
+            if command[0] == 'reset':
+                first_seed = command[1]
+                for index, env in games.items():
+                    episodes[index] = 0
+                    env.reset(episode_seed(first_seed, index, 0, count))
+                    arrays['scores'][index] = 0
+            else:
+                actions = arrays['actions']
+                for index, env in games.items():
+                    action = int(actions[index])
+                    _, reward, terminated, truncated, info = env.step(
+                        action if action >= 0 else None)
+                    arrays['rewards'][index] = reward
+                    arrays['terminated'][index] = terminated
+                    arrays['truncated'][index] = truncated
+                    arrays['scores'][index] = info['score']
+                    if terminated or truncated:
+                        # Сразу новый эпизод, как в векторных средах Gym.
+                        episodes[index] += 1
+                        env.reset(episode_seed(first_seed, index,
+                                               episodes[index], count))
+        except Exception as error:
+            # Ошибка уходит родителю вместо ответа: иначе он ждал бы
+            # ответа от упавшего процесса вечно.
+            connection.send(error)
+        else:
+            connection.send(None)
+    del arrays, observations, games
+    for block in blocks.values():
+        block.close()
+    connection.send(None)
+
+
+class SharedEnvBatch:
+    """
+    Пакет сред в нескольких процессах с общей памятью.
+
+    Наблюдения всех сред лежат в одном массиве общей памяти формы
+    (count, каналы, высота, ширина); step записывает действия в общий
+    массив и возвращает представления общих массивов без копирования.
+    Законченные эпизоды сразу начинаются заново, тогда scores хранит
+    итоговый счёт законченного эпизода. Зёрна новых эпизодов выводятся
+    из зерна reset (см. episode_seed), так что пакет воспроизводим.
+
+    Attributes:
+        count (int): Количество сред.
+        board_size (tuple[int, int]): Размер поля.
+        observations (np.ndarray): Наблюдения всех сред.
+        actions (np.ndarray): Действия для следующего step, -1 - не
+            поворачивать.
+        rewards (np.ndarray): Награды последнего step.
+        terminated (np.ndarray): Змейка погибла на последнем step.
+        truncated (np.ndarray): Эпизод обрезан на последнем step.
+        scores (np.ndarray): Счёт сред после последнего step.
+    """
+
+    def __init__(self, count: int, workers: int = 2,
+                 board_size: tuple[int, int] = (engine.GRID_WIDTH,
+                                                engine.GRID_HEIGHT),
+                 max_steps: int = MAX_STEPS):
+        """
+        Создание общей памяти и запуск процессов.
+
+        Args:
+            count: Количество сред.
+            workers: Количество процессов.
+            board_size: Размер поля.
+            max_steps: Предел тиков эпизода.
+        """
+        self.count = count
+        self.board_size = board_size
+        self.blocks = {
+            name: shared_memory.SharedMemory(
+                create=True,
+                size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+            for name, (shape, dtype) in batch_arrays(count,
+                                                     board_size).items()}
+        for name, array in attach(self.blocks, count, board_size).items():
+            setattr(self, name, array)
+        self.actions.fill(-1)
+        names = {name: block.name for name, block in self.blocks.items()}
+        context = multiprocessing.get_context()
+        self.connections = []
+        self.processes = []
+        workers = max(1, min(workers, count))
+        for part in range(workers):
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=worker, daemon=True,
+                args=(names, count, board_size, max_steps,
+                      range(part, count, workers), child))
+            process.start()
+            # Свой конец канала остаётся только у процесса: если он
+            # умрёт, recv в родителе получит EOFError, а не зависнет.
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def command(self, *command) -> None:
+        """
+        Отправляет команду всем процессам и ждёт их ответа.
+
+        Raises:
+            Exception: Исключение, которым ответил процесс, или
+                RuntimeError, если процесс завершился.
+        """
+        for connection in self.connections:
+            connection.send(command)
+        errors = []
+        # Ответы читаются от всех процессов, чтобы каналы не сбились.
+        for connection in self.connections:
+            try:
+                reply = connection.recv()
+            except EOFError:
+                reply = RuntimeError('процесс пакета сред завершился')
+            if reply is not None:
+                errors.append(reply)
+        if errors:
+            raise errors[0]
+
+    def reset(self, seed: int | None = None) -> np.ndarray:
+        """
+        Новые эпизоды во всех средах.
+
+        Args:
+            seed: Зерно первой среды, остальные получают seed + номер.
+
+        Returns:
+            Наблюдения всех сред.
+        """
+        self.command('reset', seed)
+        return self.observations
+
+    def step(self, actions=None) -> tuple[np.ndarray, ...]:
+        """
+        Один тик всех сред.
+
+        Args:
+            actions: Действия сред, по умолчанию уже записанные в
+                self.actions.
+
+        Returns:
+            Наблюдения, награды, признаки гибели и обрезки эпизодов.
+        """
+        if actions is not None:
+            self.actions[:] = actions
+        self.command('step')
+        return (self.observations, self.rewards, self.terminated,
+                self.truncated)
+
+    def close(self) -> None:
+        """Останавливает процессы и освобождает общую память."""
+        if not self.processes:
+            return
+        try:
+            self.command('close')
+        finally:
+            for process in self.processes:
+                process.join()
+            self.processes = []
+            for name in self.blocks:
+                setattr(self, name, None)
+            for block in self.blocks.values():
+                block.close()
+                block.unlink()
+
+    def __enter__(self) -> 'SharedEnvBatch':
+        """Пакет для блока with."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Останавливает процессы при выходе из блока with."""
+        self.close()
@@ -1,12 +1,32 @@
-"""Модуль игры 'Змейка' на Pygame."""
-import json
+"""
+Модуль игры 'Змейка' на Pygame.
+
+Импорт модуля не инициализирует pygame: окно создаётся при запуске
+первой сцены, изображения, шрифты и звуки загружаются при первом
+обращении к ним.
+"""
+import atexit
+import os
+import sys
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
-from random import choice, random, shuffle
+from collections import deque
+from time import perf_counter, process_time, strftime
+
+# Отметка до импорта pygame и остальных модулей игры: время запуска
+# включает импорт, основную часть холодного старта.
+_import_started = perf_counter()
 
 import pygame as pg
 import pygame_menu
 
+import assets
+import autopilot
+import client
+import engine
+import replay
+import scores
+from engine import DOWN, EVENT_DEATH, EVENT_EAT, LEFT, RIGHT, UP
+
 # Размеры различных окон.
 SCREEN_SIZE = (860, 500)
 SCREEN_NAME_INPUT = (400, 200)
@@ -17,14 +37,61 @@ SCREEN_GAME_MENU = (250, 550)
 GRID_SIZE = 20
 AREA_SIZE = (660, 500)
 
+# Видимая часть поля в клетках.
+VIEW_SIZE = (AREA_SIZE[0] // GRID_SIZE, AREA_SIZE[1] // GRID_SIZE)
+
+# Размер поля в клетках. Поле может быть больше окна, тогда камера
+# следует за головой змейки (см. --board=ШxВ).
+BOARD_SIZE = (engine.GRID_WIDTH, engine.GRID_HEIGHT)
+
+# Количество змеек-соперников на поле (см. --rivals=N). Соперники
+# сворачивают только перед препятствием (engine.steer_clear).
+RIVALS = 0
+
+# Змейкой игрока управляет автопилот (см. --autopilot): демонстрация
+# игры, рекорды при этом не записываются.
+AUTOPILOT = False
+
+# Голова держится не ближе этого числа клеток к краю видимой части.
+CAMERA_MARGIN = 6
+
+# Клетки fon.png, из которых собирается фон большого поля: период
+# шахматной травы в клетках и клетки стен разной ориентации.
+GROUND_PERIOD = 4
+WALL_TILES = {
+    'vertical': (16, 0),
+    'horizontal': (0, 12),
+    'cross': (16, 12),
+}
+
 BOARD_BACKGROUND_COLOR = '#d9e0c1'
 SNAKE_COLOR = '#ffeb00'
 
-# Константы для смены направления движения змейки.
-UP = (0, -1)
-DOWN = (0, 1)
-LEFT = (-1, 0)
-RIGHT = (1, 0)
+# Обновлять в игровом окне только изменившиеся области.
+DIRTY_RECTS = True
+
+# Частота кадров отрисовки. Логика идёт своими тиками независимо от неё.
+RENDER_FPS = 60
+# Больше этого времени за кадр не учитывается (пауза, перетаскивание
+# окна), чтобы игра не пыталась догнать его сотнями тиков.
+MAX_FRAME_TIME = 0.25
+
+# Частота перерисовки меню с анимацией (мигающий курсор ввода).
+# Меню без анимации перерисовываются только по событиям.
+MENU_FPS = 30
+
+BACKGROUND_MUSIC = 'assets/sounds/background_music.mp3'
+
+# Каталог записей игр, см. replay.py.
+REPLAYS_DIR = 'replays'
+
+# Сервер сетевой игры 'адрес:порт' (см. --connect) и комната на нём.
+# None - игра идёт локально.
+SERVER = None
+ROOM = 'lobby'
+
+# Количество результатов на странице таблицы рекордов.
+SCORES_SHOWN = 5
 
 # Угол поворота головы в зависимости от направления.
 ANGLE = {
@@ -46,469 +113,1077 @@ TURN_MAP = {
     (pg.K_RIGHT, DOWN): RIGHT
 }
 
-WALL_POSITIONS = set()
+clock = pg.time.Clock()
 
-# Позиции вертикальной стены.
-for y in range(0, AREA_SIZE[1], GRID_SIZE):
-    WALL_POSITIONS.add(((AREA_SIZE[0] // 2) - GRID_SIZE // 2, y))
+# Изображения загружаются в формате окна при первом обращении.
+# Масштабированные версии берутся из кеша на диске (см. assets.py).
+images = assets.LazyAssets({
+    'fon': lambda: assets.load_image('fon'),
+    'frame': lambda: assets.load_image('frame'),
+    'logo': lambda: assets.load_image('logo', (300, 225)),
+    'logo_menu': lambda: assets.load_image('logo'),
+    'manual': lambda: assets.load_image('manual', (800, 600)),
+    # Спрайты размером в клетку поля и повороты головы на одном атласе.
+    'atlas': lambda: assets.load_atlas(
+        GRID_SIZE, rotations={'snake_head': tuple(ANGLE.values())}),
+})
+
+# Звуки загружаются при первом проигрывании.
+sounds = assets.LazyAssets({
+    'ate': lambda: assets.load_sound('assets/sounds/ate.wav'),
+    'open_menu': lambda: assets.load_sound('assets/sounds/open_menu.ogg'),
+    'click_mouse': lambda: assets.load_sound(
+        'assets/sounds/click_mouse.ogg'),
+})
+
+# Отрисованные строки текста для повторного использования.
+texts = assets.TextCache()
+
+fonts = assets.LazyAssets({
+    'bonus': lambda: assets.load_font(None, 24),
+    'pause': lambda: assets.load_font(None, 30),
+    'stats': lambda: assets.load_font('comicsans', 27, system=True),
+})
+
+# Время от начала импорта модуля до этапов запуска (секунды).
+startup_times = {}
+
+# Хранилище рекордов и фоновая запись, см. score_store и score_writer.
+_score_store = None
+_score_writer = None
+
+
+# Процессорное время по сценам (секунды).
+scene_cpu_times = {}
+
+
+def charge_cpu(scene: str, started: float) -> float:
+    """
+    Добавляет сцене процессорное время, прошедшее с отметки.
 
-# Позиции горизонтальной стены.
-for x in range(0, AREA_SIZE[0], GRID_SIZE):
-    WALL_POSITIONS.add((x, (AREA_SIZE[1] // 2) - GRID_SIZE // 2))
+    Args:
+        scene: Название сцены.
+        started: Предыдущая отметка process_time.
 
-# Все доступные для игры ячейки.
-GRID_POSITIONS = {(x, y) for x in range(0, AREA_SIZE[0], GRID_SIZE)
-                  for y in range(0, AREA_SIZE[1], GRID_SIZE)}
+    Returns:
+        Новая отметка process_time.
+    """
+    now = process_time()
+    scene_cpu_times[scene] = scene_cpu_times.get(scene, 0.0) + now - started
+    return now
 
-# Исключает стены из списка доступных ячеек.
-DRAW_POSITIONS = GRID_POSITIONS - WALL_POSITIONS
 
-START_POSITION = [choice(tuple(DRAW_POSITIONS))]
+def cpu_report() -> str:
+    """Процессорное время по сценам в виде текста, по убыванию."""
+    lines = [f'{scene:>20}: {seconds:8.3f} s'
+             for scene, seconds in sorted(scene_cpu_times.items(),
+                                          key=lambda item: -item[1])]
+    return '\n'.join(lines)
 
-# Константы фруктов.
-FRUIT_APPLE = 'apple'
-FRUIT_CHERRY = 'cherry'
-FRUIT_PLUM = 'pulm'
-FRUIT_ORANGE = 'orange'
 
-# Инициализация Pygame
-pg.init()
+def mark_startup(stage: str) -> None:
+    """Запоминает время первого достижения этапа запуска."""
+    startup_times.setdefault(stage, perf_counter() - _import_started)
 
-# Основное игровое окно.
-screen = pg.display.set_mode(SCREEN_SIZE)
 
-clock = pg.time.Clock()
-pg.display.set_caption('Изгиб питона')
-
-# Загрузка изображений(pg.transform.scale - изменяет размер изображения).
-images = {
-    'fon': pg.image.load('assets/images/fon.png'),
-    'frame': pg.image.load('assets/images/frame.png'),
-    'logo': pg.transform.scale(pg.image.load('assets/images/logo.png'),
-                               (300, 225)),
-    'logo_menu': pg.image.load('assets/images/logo.png'),
-    'manual': pg.transform.scale(pg.image.load('assets/images/manual.png'),
-                                 (800, 600)),
-    'snake_head': pg.transform.scale(
-        pg.image.load('assets/images/snake_head.png'),
-        (GRID_SIZE, GRID_SIZE)
-    ),
-    'snake_body': pg.transform.scale(
-        pg.image.load('assets/images/snake_body.png'),
-        (GRID_SIZE, GRID_SIZE)
-    ),
-    'apple': pg.transform.scale(pg.image.load('assets/images/apple.png'),
-                                (GRID_SIZE, GRID_SIZE)),
-    'cherry': pg.transform.scale(pg.image.load('assets/images/cherry.png'),
-                                 (GRID_SIZE, GRID_SIZE)),
-    'pulm': pg.transform.scale(pg.image.load('assets/images/pulm.png'),
-                               (GRID_SIZE, GRID_SIZE)),
-    'orange': pg.transform.scale(pg.image.load('assets/images/orange.png'),
-                                 (GRID_SIZE, GRID_SIZE)),
-}
+def open_window(size: tuple[int, int] = SCREEN_SIZE) -> pg.Surface:
+    """
+    Создаёт окно игры или меняет его размер.
 
-# Загрузка звуков.
-sounds = {
-    'background_music': pg.mixer.Sound("assets/sounds/background_music.mp3"),
-    'ate': pg.mixer.Sound("assets/sounds/ate.wav"),
-    'open_menu': pg.mixer.Sound("assets/sounds/open_menu.ogg"),
-    'click_mouse': pg.mixer.Sound("assets/sounds/click_mouse.ogg"),
-}
+    Args:
+        size: Размер окна.
+
+    Returns:
+        Поверхность окна.
+    """
+    global screen
+    first_window = not pg.display.get_init()
+    current = pg.display.get_surface() if not first_window else None
+    if current is not None and current.get_size() == tuple(size):
+        # Окно нужного размера уже есть, сцена просто рисует в нём.
+        screen = current
+        return screen
+    # set_mode у открытого окна меняет его размер, не пересоздавая.
+    screen = pg.display.set_mode(size)
+    if first_window:
+        pg.display.set_caption('Изгиб питона')
+        mark_startup('window')
+    return screen
+
+
+def __getattr__(name: str):
+    """Создаёт окно при первом обращении к my_snake.screen."""
+    if name == 'screen':
+        return open_window()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def play_sound(name: str, volume: float | None = None) -> None:
+    """
+    Проигрывает звук, если звук доступен.
+
+    Args:
+        name: Ключ звука в словаре sounds.
+        volume: Громкость канала от 0 до 1.
+    """
+    sound = sounds[name]
+    if sound is None:
+        return
+    channel = sound.play()
+    if channel is not None and volume is not None:
+        channel.set_volume(volume)
+
+
+def play_music(volume: float) -> None:
+    """Запускает фоновую музыку потоком с диска, если она доступна."""
+    if not assets.init_mixer():
+        return
+    try:
+        pg.mixer.music.load(BACKGROUND_MUSIC)
+    except (pg.error, FileNotFoundError):
+        return
+    pg.mixer.music.set_volume(volume)
+    pg.mixer.music.play(-1)
 
 
 class GameObject(ABC):
-    """Базовый класс для игровых объектов."""
+    """
+    Базовый класс для игровых объектов.
+
+    Объект описывает себя набором спрайтов по клеткам поля. Спрайт -
+    кортеж (ключ изображения, угол поворота, подпись или None), по
+    нему GameState находит клетки, изменившиеся с прошлого кадра.
+    """
 
     @abstractmethod
+    def sprites(self) -> list[tuple[tuple[int, int], tuple]]:
+        """Пары (клетка, спрайт) для отрисовки объекта."""
+
     def draw(self) -> None:
         """Отрисовка объекта на поверхности"""
+        batch = SpriteBatch()
+        for cell, sprite in self.sprites():
+            batch.add_sprite(cell_rect(cell), sprite)
+        batch.flush(screen)
 
-    def draw_images(self, image: pg.Surface,
-                    position: tuple[int, int]) -> None:
-        """Отрисовка изображения объекта на заданной позиции."""
-        screen.blit(image, position)
 
+def to_screen(cell: tuple[int, int]) -> tuple[int, int]:
+    """Переводит клетку поля в координаты окна."""
+    return cell[0] * GRID_SIZE, cell[1] * GRID_SIZE
 
-class Snake(GameObject):
+
+def cell_rect(cell: tuple[int, int]) -> pg.Rect:
+    """Прямоугольник клетки поля в координатах окна."""
+    return pg.Rect(to_screen(cell), (GRID_SIZE, GRID_SIZE))
+
+
+class Camera:
     """
-    Класс змейки.
+    Видимая часть поля.
+
+    Если поле помещается в окно, камера неподвижна и клетки окна
+    совпадают с клетками поля. Иначе камера сдвигается так, чтобы
+    голова оставалась не ближе CAMERA_MARGIN клеток к краю. Поле
+    замкнуто, поэтому координаты считаются по модулю его размера.
 
     Attributes:
-        direction (Tuple[int, int]): Текущее направление движения.
-        positions (List[Tuple[int, int]]): Список позиций сегментов тела.
-        length (int): Длина змейки.
-        speed (float): Скорость змейки.
+        board_size (tuple[int, int]): Размер поля в клетках.
+        view_size (tuple[int, int]): Размер видимой части в клетках.
+        origin (tuple[int, int]): Клетка поля в левом верхнем углу.
+        scrolls (bool): Поле больше окна и камера двигается.
+    """
+
+    def __init__(self, board_size: tuple[int, int],
+                 view_size: tuple[int, int] = VIEW_SIZE):
+        self.board_size = board_size
+        self.view_size = (min(view_size[0], board_size[0]),
+                          min(view_size[1], board_size[1]))
+        self.origin = (0, 0)
+        self.scrolls = self.view_size != board_size
+
+    @staticmethod
+    def follow_axis(origin: int, cell: int, board: int, view: int) -> int:
+        """Новое начало камеры по одной оси."""
+        if board <= view:
+            return 0
+        margin = min(CAMERA_MARGIN, (view - 1) // 2)
+        offset = (cell - origin) % board
+        if offset < margin:
+            origin = cell - margin
+        elif offset >= view - margin:
+            origin = cell - view + margin + 1
+        return origin % board
+
+    def follow(self, cell: tuple[int, int]) -> bool:
+        """
+        Сдвигает камеру к клетке.
+
+        Returns:
+            True, если камера сдвинулась.
+        """
+        origin = tuple(self.follow_axis(*args) for args in zip(
+            self.origin, cell, self.board_size, self.view_size))
+        moved = origin != self.origin
+        self.origin = origin
+        return moved
+
+    def to_view(self, cell: tuple[int, int]) -> tuple[int, int] | None:
+        """Клетка окна для клетки поля или None, если её не видно."""
+        x = (cell[0] - self.origin[0]) % self.board_size[0]
+        y = (cell[1] - self.origin[1]) % self.board_size[1]
+        if x >= self.view_size[0] or y >= self.view_size[1]:
+            return None
+        return x, y
+
+    def rows(self):
+        """Пары (y в окне, y на поле) видимых строк."""
+        height = self.board_size[1]
+        return ((y, (self.origin[1] + y) % height)
+                for y in range(self.view_size[1]))
+
+    def columns(self) -> list[tuple[int, int]]:
+        """Пары (x в окне, x на поле) видимых столбцов."""
+        width = self.board_size[0]
+        return [(x, (self.origin[0] + x) % width)
+                for x in range(self.view_size[0])]
+
+
+def cells_under(rect: pg.Rect) -> set[tuple[int, int]]:
+    """Клетки поля, которые задевает прямоугольник окна."""
+    return {(x, y)
+            for x in range(rect.left // GRID_SIZE,
+                           (rect.right - 1) // GRID_SIZE + 1)
+            for y in range(rect.top // GRID_SIZE,
+                           (rect.bottom - 1) // GRID_SIZE + 1)}
+
+
+class SpriteBatch:
+    """
+    Изображения кадра, отправляемые на экран одним вызовом.
+
+    Вместо blit на каждый сегмент змейки все изображения кадра
+    собираются в список и рисуются одним Surface.blits, порядок
+    элементов списка сохраняет порядок слоёв.
+
+    Attributes:
+        items (list): Тройки (источник, позиция, область источника).
+        draw_calls (int): Вызовы отрисовки в последнем кадре.
+        blit_count (int): Изображений в последнем кадре.
     """
 
     def __init__(self):
-        super().__init__()
-        self.direction = None
-        self.reset()
+        self.items = []
+        self.draw_calls = 0
+        self.blit_count = 0
 
-    def reset(self) -> None:
+    def add(self, source: pg.Surface, dest, area: pg.Rect | None = None):
+        """Добавляет изображение в кадр."""
+        self.items.append((source, dest, area))
+
+    def add_sprite(self, rect: pg.Rect, sprite: tuple) -> None:
         """
-        Сброс состояния змейки в начальное положение.
+        Добавляет в кадр спрайт.
 
         Args:
-            direction: Направление движения змейки.
+            rect: Область окна размером в клетку.
+            sprite: Кортеж (ключ изображения, угол поворота, подпись).
         """
-        # Первое направление RIGHT. После reset случайное.
-        self.direction = choice((RIGHT, LEFT, UP, DOWN))
-        # Случайная позиция змейки.
-        self.positions = [choice(tuple(DRAW_POSITIONS))]
-        self.length = 1
-        self.speed = 0.1
+        image_name, angle, label = sprite
+        atlas = images['atlas']
+        self.add(atlas.surface, rect, atlas.rects[image_name, angle])
+        if label is not None:
+            text = texts.render(fonts['bonus'], label, (100, 0, 0))
+            text_rect = text.get_rect(center=rect.center)
+            # Подпись обрезается по границам своей клетки.
+            visible = text_rect.clip(rect)
+            self.add(text, visible,
+                     visible.move(-text_rect.x, -text_rect.y))
+
+    def flush(self, target: pg.Surface) -> None:
+        """Рисует накопленные изображения и очищает очередь."""
+        self.blit_count = len(self.items)
+        self.draw_calls = 0
+        if self.items:
+            target.blits(self.items, doreturn=False)
+            self.draw_calls = 1
+        self.items = []
 
-    def update_direction(self, new_dir: tuple[int, int]) -> None:
+
+class Snake(GameObject):
+    """
+    Отрисовка змейки.
+
+    Attributes:
+        body (engine.Snake): Змейка из игровой логики.
+    """
+
+    def __init__(self, body: engine.Snake | None = None):
         """
-        Обновление направления движения змейки.
+        Создание отрисовки.
 
         Args:
-            new_dir: Новое направление движения (UP, DOWN, LEFT, RIGHT).
+            body: Змейка из игровой логики, по умолчанию змейка новой
+                игры.
         """
-        self.direction = new_dir
+        super().__init__()
+        self.body = body if body is not None else engine.World().snake
+
+    # Прежний интерфейс змейки передаётся змейке из игровой логики.
+
+    @property
+    def positions(self) -> list[tuple[int, int]]:
+        """Клетки сегментов от головы к хвосту."""
+        return self.body.positions
+
+    @property
+    def direction(self) -> tuple[int, int]:
+        """Текущее направление движения."""
+        return self.body.direction
+
+    def get_head_position(self) -> tuple[int, int]:
+        """Позиция головы змейки."""
+        return self.body.get_head_position()
 
     def move(self) -> None:
-        """Перемещение змейки в текущем направлении."""
-        x_local, y_local = self.get_head_position()
-        dx, dy = self.direction
-
-        # Обновляет позиции с учётом границ игрового поля.
-        self.positions.insert(0, (
-            (x_local + dx * GRID_SIZE) % AREA_SIZE[0],
-            (y_local + dy * GRID_SIZE) % AREA_SIZE[1])
-        )
-        if len(self.positions) > self.length:
-            self.positions.pop()
+        """Сдвиг змейки на одну клетку."""
+        self.body.move()
 
-    def draw(self) -> None:
-        """Отрисовка змейки на экране."""
-        # Рисует и поворачивает голову в зависимости от направления.
-        rotated_head = pg.transform.rotate(images['snake_head'],
-                                           ANGLE[self.direction])
-        self.draw_images(rotated_head, self.get_head_position())
+    def reset(self) -> None:
+        """Сброс змейки в случайную свободную клетку."""
+        self.body.reset()
 
-        # Рисует тело.
-        for pos in self.positions[1:]:
-            self.draw_images(images['snake_body'], pos)
+    def update_direction(self, new_dir: tuple[int, int]) -> None:
+        """Поворот змейки (см. engine.Snake.update_direction)."""
+        self.body.update_direction(new_dir)
 
-    def get_head_position(self):
-        """Возвращает позицию головы змейки."""
-        return self.positions[0]
+    def sprites(self) -> list[tuple[tuple[int, int], tuple]]:
+        """Тело змейки и повёрнутая по направлению голова."""
+        positions = self.body.positions
+        body = [(pos, ('snake_body', 0, None)) for pos in positions[1:]]
+        # Голова рисуется последней, поверх тела.
+        body.append((positions[0],
+                     ('snake_head', ANGLE[self.body.direction], None)))
+        return body
 
 
 class Fruit(GameObject):
-    """Базовый класс для фруктов"""
-
-    def __init__(self, occupied: set[tuple[int, int]], image_name: str):
-        """
-        Инициализация фрукта.
+    """
+    Отрисовка фрукта.
 
-        Args:
-            occupied: Множество занятых позиций.
-            image_name: Ключ изображения в словаре images.
-        """
-        super().__init__()
-        self.image = images[image_name]
-        self.randomize_position(occupied)
+    Attributes:
+        fruit (engine.Fruit): Фрукт из игровой логики.
+    """
 
-    def randomize_position(self, occupied: set[tuple[int, int]]) -> None:
+    def __init__(self, fruit: engine.Fruit | None = None):
         """
-        Генерация случайной позиции для фрукта.
+        Создание отрисовки.
 
         Args:
-            occupied: Множество занятых позиций.
+            fruit: Фрукт из игровой логики, по умолчанию яблоко новой
+                игры.
         """
-        self.position = choice(tuple(GRID_POSITIONS - set(occupied)))
+        super().__init__()
+        self.fruit = fruit if fruit is not None else engine.World().apple
 
-    def draw(self) -> None:
-        """Отрисовка фрукта, если он активен."""
-        self.draw_images(self.image, self.position)
+    def sprites(self) -> list[tuple[tuple[int, int], tuple]]:
+        """Фрукт, если он на поле."""
+        if not self.fruit.active:
+            return []
+        return [(self.fruit.position, (self.fruit.name, 0, None))]
 
 
 class Apple(Fruit):
     """Класс яблоко"""
 
-    def __init__(self, snake_positions: list[tuple[int, int]]):
-        super().__init__(set(snake_positions) | WALL_POSITIONS, FRUIT_APPLE)
-
 
 class Bonus(Fruit):
     """
-    Бонусный фрукт с временным эффектом.
+    Бонусный фрукт с таймером обратного отсчёта.
 
     Attributes:
-        spawn_time (datetime): Время появления бонуса.
-        font (pg.font.Font): Шрифт для отображения таймера.
-        fruit_name (str): Название фрукта (для определения эффекта).
-        active_bonus (Optional[Bonus]): Активный бонусный фрукт.
+        world (engine.World): Состояние игры для расчёта таймера.
     """
 
-    spawn_time = datetime.now()
-    font = pg.font.Font(None, 24)
+    def __init__(self, fruit: engine.Fruit, world: engine.World):
+        super().__init__(fruit)
+        self.world = world
 
-    def __init__(self, fruit_name: str):
-        super().__init__(set(), fruit_name)
-        self.fruit_name = fruit_name
-        self.active_bonus = None
+    def sprites(self) -> list[tuple[tuple[int, int], tuple]]:
+        """Фрукт с подписью оставшегося времени."""
+        if not self.fruit.active:
+            return []
+        remaining = self.world.bonus_remaining(self.fruit)
+        return [(self.fruit.position, (self.fruit.name, 0, str(remaining)))]
 
-    def activate(self, occupied: set[tuple[int, int]]) -> None:
-        """
-        Активация бонуса на игровом поле.
 
-        Args:
-            occupied: Множество занятых позиций.
-        """
-        self.randomize_position(occupied)
-        Bonus.spawn_time = datetime.now()
+class GameState:
+    """
+    Класс для управления игровым состоянием.
 
-    def draw(self) -> None:
-        """Отрисовка бонуса с таймером обратного отсчёта."""
-        # Отрисовывает базовое изображение фрукта.
-        super().draw()
+    Правила игры живут в модуле engine, GameState только передаёт
+    ему тики и отображает результат.
 
-        # Рассчитывает оставшееся время.
-        elapsed = (datetime.now() - Bonus.spawn_time).seconds
-        remaining = max(0, 10 - elapsed)
+    Логика идёт тиками фиксированной игровой длительности
+    (engine.tick_duration), а кадры рисуются с частотой RENDER_FPS.
+    Между тиками голова змейки плавно перемещается из предыдущей
+    клетки в текущую поверх сетки спрайтов.
 
-        # Создаёт и позиционируем текст с таймером.
-        text = Bonus.font.render(str(remaining), 1, (100, 0, 0))
-        text_rect = text.get_rect(
-            center=(
-                self.position[0] + GRID_SIZE // 2,
-                self.position[1] + GRID_SIZE // 2
-            )
-        )
-        screen.blit(text, text_rect)
+    Поле может быть больше окна: тогда камера следует за головой, а
+    кадр собирается обходом видимых клеток, поэтому время кадра и
+    память фона зависят от размера окна, а не поля.
 
+    На поле могут быть змейки-соперники: движок двигает их вместе со
+    змейкой игрока, а счёт, рекорд и камера относятся к игроку.
 
-class GameState:
-    """
-    Класс для управления игровым состоянием.
+    В режиме dirty_rects кадр не перерисовывается целиком: GameState
+    помнит, какой спрайт нарисован в каждой клетке и какой текст в
+    каждой строке статистики, восстанавливает фон только под
+    изменившимися местами и передаёт их в pg.display.update.
 
     Attributes:
         screen (pg.Surface): Игровое окно.
         font (pg.font.Font): Шрифт для интерфейса.
-        snake (Snake): Объект змейки.
-        apple (Apple): Объект яблока.
-        bonuses (List[Bonus]): Список бонусных фруктов.
-        score (int): Текущий счет игрока.
+        world (engine.World): Состояние игровой логики.
+        camera (Camera): Видимая часть поля.
+        snakes (List[Snake]): Отрисовка змеек, первая - змейка игрока.
+        snake (Snake): Отрисовка змейки игрока.
+        apples (List[Apple]): Отрисовка яблок.
+        apple (Apple): Отрисовка первого яблока.
+        bonuses (List[Bonus]): Отрисовка бонусных фруктов.
         paused (bool): Флаг паузы игры.
         player_name (str): Имя текущего игрока.
         best_score (int): Лучший счет.
+        dirty_rects (bool): Обновлять только изменившиеся области.
+        background (pg.Surface): Фон окна без игровых объектов.
+        drawn_sprites (dict): Спрайты, нарисованные в прошлом кадре.
+        drawn_stats (list): Строки статистики прошлого кадра.
+        full_redraw (bool): Следующий кадр нужно нарисовать целиком.
+        batch (SpriteBatch): Изображения текущего кадра; после
+            отрисовки хранит счётчики вызовов последнего кадра.
+        lag (float): Накопленное время, ещё не отданное логике.
+        prev_head (tuple[int, int]): Клетка головы до последнего тика.
+        overlay_rect (pg.Rect): Где голова нарисована в прошлом кадре
+            между клетками, или None.
+        turns (TurnQueue): Повороты, ожидающие тиков логики.
+        recording (replay.Replay): Запись игры для воспроизведения,
+            None в игре с соперниками.
+        autopilot (bool): Змейкой игрока управляет автопилот.
     """
 
-    def __init__(self, player_name: str):
+    def __init__(self, player_name: str, dirty_rects: bool = DIRTY_RECTS,
+                 board_size: tuple[int, int] | None = None,
+                 rivals: int | None = None,
+                 world: engine.World | None = None):
         """
         Инициализация игрового состояния.
 
         Args:
             player_name: Имя текущего игрока.
+            dirty_rects: Обновлять только изменившиеся области окна.
+            board_size: Размер поля в клетках, по умолчанию BOARD_SIZE.
+            rivals: Количество соперников, по умолчанию RIVALS.
+            world: Готовое состояние игры (копия игры сервера), тогда
+                board_size и rivals не используются.
         """
-        self.screen = pg.display.set_mode(SCREEN_SIZE)
-        self.font = pg.font.SysFont('comicsans', 27)
-        self.snake = Snake()
-        self.apple = Apple(self.snake.positions)
+        self.screen = open_window(SCREEN_SIZE)
+        self.font = fonts['stats']
+        self.world = world or engine.World(
+            engine.Board(*(board_size or BOARD_SIZE)),
+            snakes=1 + (RIVALS if rivals is None else rivals))
+        self.camera = Camera((self.world.board.width,
+                              self.world.board.height))
+        self.camera.follow(self.world.snake.get_head_position())
+        self.snakes = [Snake(snake) for snake in self.world.snakes]
+        self.snake = self.snakes[0]
+        self.apples = [Apple(apple) for apple in self.world.apples]
+        self.apple = self.apples[0]
+        self.bonuses = [Bonus(bonus, self.world)
+                        for bonus in self.world.bonuses]
 
-        # Создаёт бонусные фрукты.
-        self.bonuses = [
-            Bonus(FRUIT_ORANGE),  # Уменьшение длины.
-            Bonus(FRUIT_PLUM),  # Уменьшение скорости.
-            Bonus(FRUIT_CHERRY),  # Бонус очков.
-        ]
-
-        self.score = 0
         self.paused = False
         self.player_name = player_name
         self.best_score = load_best_score()
 
-    def bonus_spawn(self):
-        """Проверка условий и активация бонусных фруктов."""
-        # Спавн бонуса не чаще 15 секунд.
-        if datetime.now() - Bonus.spawn_time < timedelta(seconds=15):
-            return
-        # Перемешивает список для последующей вставки в цикл.
-        # Множество здесь не подходит потому что оно сохраняет
-        # порядок вставки.
-        shuffle(self.bonuses)
-        # Проверяет условия для активации
-        for bonus in self.bonuses:
-            # Условия для активации разных типов бонусов.
-            conditions = {
-                FRUIT_ORANGE: self.snake.length > 5 and random() <= 0.01,
-                # 1% шанс только если длина змейки > 5.
-                FRUIT_PLUM: self.snake.speed > 1 and random() <= 0.01,
-                # 1% шанс если скорости скорость змейки > 1.
-                FRUIT_CHERRY: random() < 0.05  # 5% шанс всегда.
-            }
-
-            # Активирует подходящий бонус если он еще не активен.
-            if conditions[bonus.fruit_name] and not bonus.active_bonus:
-                # Занятые позиции.
-                occupied = set(self.snake.positions) | WALL_POSITIONS
-                bonus.activate(occupied)
-                bonus.active_bonus = bonus
-                break
-
-    def handle_collision(self) -> None:
-        """Обработка столкновений змейки."""
-        # Проверка столкновения с яблоком.
-        if self.snake.get_head_position() == self.apple.position:
-            self.snake.length += 1
-            self.score += 10
-            self.snake.speed += 0.05
-            self.apple.randomize_position(
-                set(self.snake.positions) | WALL_POSITIONS)
-            sounds['ate'].play()
-
-        # Проверка столкновения с телом.
-        if self.snake.get_head_position() in self.snake.positions[1:]:
-            save_score(self.player_name, self.score)
-            self.score = 0
-            self.snake.reset()
-
-        # Проверка столкновения со стенами.
-        if self.snake.get_head_position() in WALL_POSITIONS:
-            save_score(self.player_name, self.score)
-            self.score = 0
-            self.snake.reset()
-
-        # Проверка столкновения с бонусами.
-        for bonus in self.bonuses:
-            if (bonus.active_bonus and bonus.position
-               == self.snake.get_head_position()):
-                # Обработка разных типов бонусов.
-                if bonus.fruit_name == FRUIT_ORANGE:
-                    # Уменьшает длину змейки (не менее 5 сегментов).
-                    self.snake.length = max(5, self.snake.length - 1)
-                    self.snake.positions \
-                        = self.snake.positions[:self.snake.length]
-                    self.score += 30
-
-                elif bonus.fruit_name == FRUIT_PLUM:
-                    # Уменьшает скорость на 0.5 (не менее 1).
-                    self.snake.speed = max(1, self.snake.speed - 0.5)
-                    self.score += 30
-
-                elif bonus.fruit_name == FRUIT_CHERRY:
-                    # Бонус очков в зависимости от времени активации.
-                    time_active = (datetime.now() - bonus.spawn_time).seconds
-                    points = 150 - 10 * time_active
-                    self.score += points
-                    self.snake.length += 1
-                    self.snake.speed += 0.05
-
-                # Деактивирует бонус и проигрывает звук.
-                bonus.active_bonus = None
-                sounds['ate'].play()
-
-    def draw_all(self) -> None:
-        """Отрисовка всех игровых объектов и статистики."""
-        # Отрисовка изображений и фона.
-        screen.fill(BOARD_BACKGROUND_COLOR)
-        screen.blit(images['fon'], (0, 0))
-        screen.blit(images['frame'], (660, 0))
-        screen.blit(images['logo'], (610, 0))
-
-        # Отрисовка бонусов
-        for bonus in self.bonuses:
-            if (bonus.active_bonus and datetime.now()
-                    < Bonus.spawn_time + timedelta(seconds=10)):
-                bonus.draw()
-
-        # Отображение игровой статистики.
-        interface_data = [
+        self.dirty_rects = dirty_rects
+        self.background = self.make_background()
+        self.drawn_sprites = {}
+        self.drawn_stats = []
+        self.full_redraw = True
+        self.batch = SpriteBatch()
+
+        self.lag = 0.0
+        self.prev_head = None
+        self.overlay_rect = None
+        self.turns = TurnQueue()
+        # Запись хранит только повороты игрока, поэтому игры с
+        # соперниками не записываются.
+        self.recording = None
+        if world is None and len(self.world.snakes) == 1:
+            self.recording = replay.Replay(self.world.seed,
+                                           self.world.board.width,
+                                           self.world.board.height)
+        self.autopilot = AUTOPILOT and world is None
+
+    @property
+    def score(self) -> int:
+        """Текущий счёт игрока."""
+        return self.world.score
+
+    def tick(self) -> None:
+        """Один шаг игровой логики и реакция на его события."""
+        turn = self.turns.pop(perf_counter())
+        world = self.world
+        if self.autopilot:
+            turn = autopilot.drive(world, world.snake)
+            # В запись попадают только настоящие повороты.
+            if turn == world.snake.direction:
+                turn = None
+        actions = [turn, *(engine.steer_clear(world, rival)
+                           for rival in world.snakes[1:])]
+        _, events = engine.step_all(world, actions)
+        # Звуки и рекорды - только для змейки игрока.
+        events = [(kind, data) for kind, player, data in events
+                  if player == 0]
+        if self.recording is not None:
+            self.recording.record(world, turn, events)
+        self.handle_events(events)
+
+    def handle_events(self, events: list[tuple]) -> None:
+        """Звуки и рекорды по событиям змейки игрока."""
+        for kind, data in events:
+            if kind == EVENT_EAT:
+                play_sound('ate')
+            elif kind == EVENT_DEATH:
+                if not self.autopilot:
+                    save_score(self.player_name, data)
+                self.best_score = max(self.best_score, data)
+                # Повороты старой змейки новой не нужны.
+                self.turns.clear()
+
+    def advance(self, elapsed: float) -> float:
+        """
+        Выполняет тики логики, накопившиеся за прошедшее время.
+
+        Если кадр рисовался дольше тика, выполняется несколько тиков
+        подряд: отрисовка пропускает кадры, а не замедляет игру.
+
+        Args:
+            elapsed: Реальное время с прошлого кадра в секундах.
+
+        Returns:
+            Доля следующего тика, прошедшая к моменту кадра (0..1).
+        """
+        self.lag += elapsed
+        duration = engine.tick_duration(self.world.snake.speed)
+        while self.lag >= duration:
+            self.lag -= duration
+            self.prev_head = self.world.snake.get_head_position()
+            self.tick()
+            duration = engine.tick_duration(self.world.snake.speed)
+        self.follow_camera()
+        return self.lag / duration
+
+    def follow_camera(self) -> None:
+        """Сдвигает камеру к голове змейки игрока."""
+        if self.camera.follow(self.world.snake.get_head_position()):
+            # Поле под камерой сдвинулось, кадр рисуется целиком.
+            self.draw_field(self.background)
+            self.full_redraw = True
+
+    def head_overlay(self, alpha: float) -> tuple[pg.Rect, tuple] | None:
+        """
+        Голова змейки между предыдущей и текущей клеткой.
+
+        Args:
+            alpha: Доля пути от предыдущей клетки к текущей.
+
+        Returns:
+            Пара (область окна, спрайт) или None, если голову нужно
+            рисовать в её клетке (переход через край поля, сброс).
+        """
+        snake = self.world.snake
+        if self.prev_head is None or alpha >= 1:
+            return None
+        head = self.camera.to_view(snake.get_head_position())
+        prev_head = self.camera.to_view(self.prev_head)
+        # Голова за краем окна или камера сдвинулась вместе с ней.
+        if head is None or prev_head is None:
+            return None
+        dx, dy = head[0] - prev_head[0], head[1] - prev_head[1]
+        if abs(dx) + abs(dy) != 1:
+            return None
+        x, y = to_screen(prev_head)
+        rect = pg.Rect(round(x + dx * alpha * GRID_SIZE),
+                       round(y + dy * alpha * GRID_SIZE),
+                       GRID_SIZE, GRID_SIZE)
+        return rect, ('snake_head', ANGLE[snake.direction], None)
+
+    def make_background(self) -> pg.Surface:
+        """Фон игрового окна: поле, рамка и логотип."""
+        background = pg.Surface(SCREEN_SIZE)
+        background.fill(BOARD_BACKGROUND_COLOR)
+        board = self.world.board
+        # На fon.png нарисованы стены стандартного поля. Поле другого
+        # размера собирается из его клеток, а клетки окна за краем
+        # поля остаются цвета фона.
+        if (board.width, board.height) == (engine.GRID_WIDTH,
+                                           engine.GRID_HEIGHT):
+            background.blit(images['fon'], (0, 0))
+        else:
+            self.draw_field(background)
+        background.blit(images['frame'], (660, 0))
+        background.blit(images['logo'], (610, 0))
+        return background
+
+    def draw_field(self, background: pg.Surface) -> None:
+        """
+        Рисует траву и стены видимой части поля нестандартного размера.
+
+        Трава повторяется с периодом GROUND_PERIOD клеток и
+        сдвигается вместе с камерой, стены берутся из клеток fon.png.
+        """
+        fon = images['fon']
+        ground = GROUND_PERIOD * GRID_SIZE
+        tile = pg.Rect(0, 0, ground, ground)
+        area = pg.Rect((0, 0), to_screen(self.camera.view_size))
+        background.set_clip(area)
+        shift_x, shift_y = (-(origin % GROUND_PERIOD) * GRID_SIZE
+                            for origin in self.camera.origin)
+        background.blits(
+            [(fon, (x, y), tile)
+             for x in range(shift_x, area.right, ground)
+             for y in range(shift_y, area.bottom, ground)],
+            doreturn=False)
+        background.set_clip(None)
+
+        board = self.world.board
+        columns = self.camera.columns()
+        walls = []
+        for view_y, y in self.camera.rows():
+            row = y * board.width
+            for view_x, x in columns:
+                if board.wall_map[row + x]:
+                    source = cell_rect(WALL_TILES[self.wall_kind((x, y))])
+                    walls.append((fon, to_screen((view_x, view_y)), source))
+        background.blits(walls, doreturn=False)
+
+    def wall_kind(self, cell: tuple[int, int]) -> str:
+        """Ориентация стены по соседним клеткам."""
+        board = self.world.board
+        x, y = cell
+        vertical = (board.is_wall(board.wrap(x, y - 1))
+                    or board.is_wall(board.wrap(x, y + 1)))
+        horizontal = (board.is_wall(board.wrap(x - 1, y))
+                      or board.is_wall(board.wrap(x + 1, y)))
+        if vertical and horizontal:
+            return 'cross'
+        return 'vertical' if vertical else 'horizontal'
+
+    def frame_sprites(self) -> dict[tuple[int, int], tuple]:
+        """Спрайты текущего кадра по клеткам окна (верхний слой побеждает)."""
+        if self.camera.scrolls:
+            return self.visible_sprites()
+        sprites = {}
+        # Порядок слоёв: бонусы, яблоко, соперники, змейка игрока.
+        for game_object in (*self.bonuses, *self.apples, *self.snakes[1:],
+                            self.snake):
+            sprites.update(game_object.sprites())
+        return sprites
+
+    def visible_sprites(self) -> dict[tuple[int, int], tuple]:
+        """
+        Спрайты видимых клеток большого поля.
+
+        Обходятся только клетки окна: тела находятся по общему
+        счётчику занятости, фрукты - по индексу клеток.
+        """
+        world = self.world
+        width = world.board.width
+        occupancy = world.occupancy
+        body = ('snake_body', 0, None)
+        columns = self.camera.columns()
+        sprites = {}
+        for view_y, y in self.camera.rows():
+            row = y * width
+            for view_x, x in columns:
+                if occupancy[row + x]:
+                    sprites[view_x, view_y] = body
+                    continue
+                fruit = world.fruit_at((x, y))
+                if fruit is not None:
+                    label = (str(world.bonus_remaining(fruit))
+                             if fruit.timer else None)
+                    sprites[view_x, view_y] = (fruit.name, 0, label)
+        # Голова игрока рисуется последней, поверх соперников.
+        for snake in reversed(world.snakes):
+            head = self.camera.to_view(snake.get_head_position())
+            if head is not None:
+                sprites[head] = ('snake_head', ANGLE[snake.direction], None)
+        return sprites
+
+    def stats(self) -> list[str]:
+        """Строки игровой статистики."""
+        return [
             f'Счёт: {self.score}',
             f'Рекорд: {self.best_score}',
-            f'Скорость: {round(self.snake.speed, 1)}',
-            f'Длина: {self.snake.length}',
+            f'Скорость: {round(self.world.snake.speed, 1)}',
+            f'Длина: {self.world.snake.length}',
             f'Игрок: {self.player_name}',
         ]
+
+    def draw_sprites(self, alpha: float) -> list[pg.Rect]:
+        """
+        Добавляет в кадр клетки, спрайт в которых изменился.
+
+        Args:
+            alpha: Доля пути головы от предыдущей клетки к текущей.
+
+        Returns:
+            Прямоугольники перерисованных клеток.
+        """
+        rects = []
+        sprites = self.frame_sprites()
+        overlay = self.head_overlay(alpha)
+        if overlay:
+            del sprites[self.camera.to_view(
+                self.world.snake.get_head_position())]
+        # Клетки под головой прошлого кадра перерисовываются всегда.
+        forced = (cells_under(self.overlay_rect) if self.overlay_rect
+                  else set())
+        for cell in self.drawn_sprites.keys() | sprites.keys() | forced:
+            sprite = sprites.get(cell)
+            if cell not in forced and self.drawn_sprites.get(cell) == sprite:
+                continue
+            rect = cell_rect(cell)
+            # Пустая в прошлом кадре клетка уже показывает фон.
+            if cell in self.drawn_sprites or cell in forced:
+                self.batch.add(self.background, rect, rect)
+            if sprite is not None:
+                self.batch.add_sprite(rect, sprite)
+            rects.append(rect)
+        self.drawn_sprites = sprites
+
+        self.overlay_rect = None
+        if overlay:
+            self.overlay_rect, sprite = overlay
+            self.batch.add_sprite(self.overlay_rect, sprite)
+            rects.append(self.overlay_rect)
+        return rects
+
+    def draw_stats(self) -> list[pg.Rect]:
+        """
+        Добавляет в кадр изменившиеся строки статистики.
+
+        Returns:
+            Прямоугольники перерисованных строк.
+        """
+        rects = []
+        stats = self.stats()
         # enumerate - формирует пару счётчик и элемент.
-        for i, text in enumerate(interface_data):
-            surf = self.font.render(text, 1, (0, 0, 0))
-            screen.blit(surf, (675, 200 + i * 40))
+        for i, text in enumerate(stats):
+            if i < len(self.drawn_stats) and self.drawn_stats[i] == text:
+                continue
+            rect = pg.Rect(675, 200 + i * 40, SCREEN_SIZE[0] - 675, 40)
+            self.batch.add(self.background, rect, rect)
+            surf = texts.render(self.font, text, (0, 0, 0))
+            self.batch.add(surf, rect.topleft)
+            rects.append(rect)
+        self.drawn_stats = stats
+        return rects
+
+    def draw_all(self, alpha: float = 1.0) -> None:
+        """
+        Отрисовка всех игровых объектов и статистики.
 
-        # Отрисовка яблока и змейки.
-        self.apple.draw()
-        self.snake.draw()
+        Args:
+            alpha: Доля пути головы от предыдущей клетки к текущей,
+                1 - голова в своей клетке.
+        """
+        if self.full_redraw or not self.dirty_rects:
+            # Кадр с нуля: фон и все объекты.
+            self.batch.add(self.background, (0, 0))
+            self.drawn_sprites = {}
+            self.drawn_stats = []
+            self.overlay_rect = None
+            self.draw_sprites(alpha)
+            self.draw_stats()
+            self.batch.flush(screen)
+            self.full_redraw = False
+            pg.display.update()
+            return
 
-        pg.display.update()
+        rects = self.draw_sprites(alpha) + self.draw_stats()
+        self.batch.flush(screen)
+        if rects:
+            pg.display.update(rects)
+
+
+class RemoteGameState(GameState):
+    """
+    Тонкий клиент сетевой игры.
+
+    Правила выполняет сервер: клиент отправляет ему повороты и
+    применяет присланные изменения к копии игры, а отрисовка та же,
+    что у локальной игры. Голова плавно движется между тиками по
+    среднему интервалу их прихода.
+
+    Attributes:
+        connection (client.Connection): Соединение с сервером.
+        interval (float): Средний интервал между тиками сервера (с).
+        since_tick (float): Время с прихода последнего тика (с).
+    """
+
+    def __init__(self, player_name: str, connection: client.Connection,
+                 dirty_rects: bool = DIRTY_RECTS):
+        """
+        Игра по копии состояния сервера.
+
+        Args:
+            player_name: Имя текущего игрока.
+            connection: Соединение с комнатой сервера.
+            dirty_rects: Обновлять только изменившиеся области окна.
+        """
+        self.connection = connection
+        world = connection.mirror.world
+        # Змейка игрока становится первой: её показывает камера и
+        # статистика. Изменения с сервера идут по номерам змеек копии.
+        slot = connection.mirror.slot
+        world.snakes.insert(0, world.snakes.pop(slot))
+        world.snake = world.snakes[0]
+        super().__init__(player_name, dirty_rects, world=world)
+        self.interval = 0.1
+        self.since_tick = 0.0
+
+    def advance(self, elapsed: float) -> float:
+        """
+        Отправляет повороты и применяет тики, пришедшие с сервера.
+
+        Args:
+            elapsed: Реальное время с прошлого кадра в секундах.
+
+        Returns:
+            Доля интервала до следующего тика, прошедшая к кадру.
+        """
+        now = perf_counter()
+        turn = self.turns.pop(now)
+        while turn is not None:
+            self.connection.send_turn(turn)
+            turn = self.turns.pop(now)
+
+        self.since_tick += elapsed
+        head = self.world.snake.get_head_position()
+        events, ticks, closed = self.connection.receive()
+        if closed:
+            quit_game(self)
+        if ticks:
+            self.interval += (self.since_tick / ticks - self.interval) / 4
+            self.since_tick = 0.0
+            # Плавное движение только на один тик.
+            self.prev_head = head if ticks == 1 else None
+            slot = self.connection.mirror.slot
+            self.handle_events([(kind, data) for kind, player, data in events
+                                if player == slot])
+        self.follow_camera()
+        return min(1.0, self.since_tick / self.interval)
+
+
+def score_store() -> scores.ScoreStore:
+    """Хранилище рекордов для чтения, открываемое при первом обращении."""
+    global _score_store
+    if _score_store is None:
+        _score_store = scores.ScoreStore(scores.SCORES_DB)
+    return _score_store
+
+
+def score_writer() -> scores.ScoreWriter:
+    """Фоновая запись рекордов, запускаемая при первом обращении."""
+    global _score_writer
+    if _score_writer is None:
+        _score_writer = scores.ScoreWriter(scores.SCORES_DB)
+        # Страховка на случай выхода в обход quit_game.
+        atexit.register(_score_writer.close)
+    return _score_writer
 
 
 def save_score(name: str, score: int) -> None:
     """
-    Сохраняет результат игрока в файл рекордов.
+    Передаёт результат игрока на запись в фоновом потоке.
 
     Args:
         name: Имя игрока.
         score: Достигнутый счет.
     """
-    try:
-        with open('scores.json', 'r', encoding='utf-8') as f:
-            scores = json.load(f)
-    except FileNotFoundError:
-        scores = []
-
-    scores.append({
-        'name': name,
-        'score': score,
-        'date': datetime.now().strftime('%Y-%m-%d')
-    })
-
-    with open('scores.json', 'w', encoding='utf-8') as f:
-        # Сохраняет только 5 лучших результатов.
-        json.dump(sorted(scores,
-                         key=lambda x: x['score'], reverse=True)[:5], f)
+    score_writer().submit(name, score)
 
 
-def load_scores() -> list[dict]:
+def load_scores(offset: int = 0, limit: int = SCORES_SHOWN,
+                name: str | None = None,
+                date: str | None = None) -> list[dict]:
     """
-    Загружает таблицу рекордов из файла.
+    Загружает часть таблицы лучших результатов.
+
+    Args:
+        offset: Сколько лучших результатов пропустить.
+        limit: Количество результатов.
+        name: Только результаты этого игрока.
+        date: Начало даты игры, например '2024-05'.
 
     Returns:
         Список словарей с результатами игроков.
     """
-    try:
-        with open('scores.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+    # Таблица должна включать результаты, ещё стоящие в очереди.
+    if _score_writer is not None:
+        _score_writer.flush()
+    return score_store().top(limit, offset, name, date)
 
 
 def load_best_score() -> int:
     """
-    Загрузка лучшего счёта из таблицы рекордов.
+    Лучший счёт из памяти, с диска читается только при запуске.
 
     Returns:
         Лучший счёт или 0, если таблица пуста.
     """
-    scores = load_scores()
-    return max(scores, key=lambda x: x['score'])['score'] if scores else 0
+    return score_writer().best
+
+
+def save_replay(game_state: 'GameState') -> str | None:
+    """
+    Сохраняет запись игры в REPLAYS_DIR.
+
+    Returns:
+        Путь к файлу записи или None, если игра не началась или не
+        записывалась.
+    """
+    recording = game_state.recording
+    if recording is None or not recording.ticks:
+        return None
+    os.makedirs(REPLAYS_DIR, exist_ok=True)
+    path = os.path.join(
+        REPLAYS_DIR,
+        f'{strftime("%Y%m%d-%H%M%S")}-{recording.seed:016x}.snkr')
+    recording.save(path)
+    return path
+
+
+def quit_game(game_state: 'GameState | None' = None) -> None:
+    """
+    Дописывает рекорды и запись игры и завершает игру.
+
+    Args:
+        game_state: Текущая игра, если выход из неё.
+    """
+    if game_state is not None:
+        save_replay(game_state)
+    if _score_writer is not None:
+        _score_writer.close()
+    pg.quit()
+    raise SystemExit
+
+
+class TurnQueue:
+    """
+    Очередь поворотов, нажатых между тиками логики.
+
+    Каждый поворот проверяется по TURN_MAP относительно последнего
+    поворота в очереди, а не текущего направления змейки, поэтому два
+    быстрых нажатия (например, вверх и налево) выполняются на двух
+    следующих тиках, а не теряются.
+
+    Attributes:
+        turns (deque): Пары (направление, время нажатия).
+        maxlen (int): Максимальная длина очереди.
+        latencies (deque): Последние задержки от нажатия до хода (с).
+    """
+
+    def __init__(self, maxlen: int = 3):
+        self.turns = deque()
+        self.maxlen = maxlen
+        self.latencies = deque(maxlen=100)
+
+    def __len__(self) -> int:
+        """Количество ожидающих поворотов."""
+        return len(self.turns)
+
+    def push(self, key: int, direction: tuple[int, int],
+             timestamp: float) -> bool:
+        """
+        Добавляет поворот по нажатой клавише.
+
+        Args:
+            key: Код клавиши.
+            direction: Текущее направление змейки.
+            timestamp: Время нажатия (perf_counter).
+
+        Returns:
+            True, если поворот допустим и добавлен в очередь.
+        """
+        if self.turns:
+            direction = self.turns[-1][0]
+        new_dir = TURN_MAP.get((key, direction))
+        if new_dir is None or len(self.turns) >= self.maxlen:
+            return False
+        self.turns.append((new_dir, timestamp))
+        return True
+
+    def pop(self, now: float) -> tuple[int, int] | None:
+        """
+        Поворот для очередного тика.
+
+        Args:
+            now: Время выполнения тика (perf_counter).
+
+        Returns:
+            Направление или None, если поворотов нет.
+        """
+        if not self.turns:
+            return None
+        direction, timestamp = self.turns.popleft()
+        self.latencies.append(now - timestamp)
+        return direction
+
+    def clear(self) -> None:
+        """Сбрасывает ожидающие повороты."""
+        self.turns.clear()
+
+    def latency_report(self) -> dict[str, float]:
+        """
+        Задержка от нажатия до хода змейки по последним поворотам.
+
+        Returns:
+            Словарь с количеством замеров, средней и максимальной
+            задержкой в миллисекундах.
+        """
+        if not self.latencies:
+            return {'count': 0, 'mean_ms': 0.0, 'max_ms': 0.0}
+        return {
+            'count': len(self.latencies),
+            'mean_ms': 1000 * sum(self.latencies) / len(self.latencies),
+            'max_ms': 1000 * max(self.latencies),
+        }
 
 
-def handle_keys(snake: Snake, game_state: GameState) -> bool:
+def handle_keys(snake: engine.Snake, game_state: GameState) -> bool:
     """
     Обрабатывает пользовательский ввод.
 
+    Вызывается каждый кадр: повороты с временем нажатия попадают в
+    очередь game_state.turns и выполняются на следующих тиках.
+
     Returns:
         Обновленное состояние паузы.
     """
+    now = perf_counter()
     for event in pg.event.get():
         if event.type == pg.QUIT:
-            pg.quit()
-            raise SystemExit
+            quit_game(game_state)
         if event.type == pg.KEYDOWN:
             if event.key == pg.K_p:
                 return not game_state.paused  # Переключает паузу.
             elif event.key == pg.K_ESCAPE:
-                pg.quit()
-                raise SystemExit
-            elif (not game_state.paused
-                  and (event.key, snake.direction) in TURN_MAP):
-                snake.update_direction(TURN_MAP.get(
-                    (event.key, snake.direction))
-                )
+                quit_game(game_state)
+            elif not game_state.paused:
+                game_state.turns.push(event.key, snake.direction, now)
     return game_state.paused
 
 
@@ -533,10 +1208,29 @@ def create_menu_theme(coord: tuple[int, int]) -> pygame_menu.themes.Theme:
     return theme
 
 
+def wait_events(animated: bool) -> list[pg.event.Event]:
+    """
+    Ожидает события для следующего кадра меню.
+
+    Args:
+        animated: В меню есть анимация. Тогда кадры идут с частотой
+            MENU_FPS, иначе процесс спит до прихода события.
+
+    Returns:
+        Список событий.
+    """
+    if animated:
+        clock.tick(MENU_FPS)
+        return pg.event.get()
+    return [pg.event.wait(), *pg.event.get()]
+
+
 def update(menu_surface: pg.Surface,
            menu: pygame_menu.Menu,
            image: pg.Surface = None,
-           coord: tuple[int, int] | None = None) -> None:
+           coord: tuple[int, int] | None = None,
+           animated: bool = False,
+           until=None) -> None:
     """
     Обновляет и отображает меню.
 
@@ -545,83 +1239,315 @@ def update(menu_surface: pg.Surface,
         menu: Объект меню.
         image: Изображения.
         coord: Координаты для отрисовки фонового изображения.
+        animated: Меню нужно перерисовывать без событий.
+        until: Функция без аргументов, по истинному результату
+            которой цикл завершается. None - цикл бесконечный.
     """
+    scene = menu.get_title()
+    mark = process_time()
+    events = pg.event.get()
     while True:
         screen.fill(BOARD_BACKGROUND_COLOR)
         if image:
             screen.blit(image, coord)
         # Обработка звука при выборе виджета.
-        events = pg.event.get()
         for event in events:
             if event.type == pg.KEYDOWN:
                 if event.key in (pg.K_UP, pg.K_DOWN, pg.K_RETURN):
-                    sounds['click_mouse'].play().set_volume(0.6)
+                    play_sound('click_mouse', 0.6)
 
         menu.update(events)
+        mark = charge_cpu(scene, mark)
+        # Кнопка могла сменить сцену, старое меню уже не рисуем.
+        if until and until():
+            return
         menu.draw(menu_surface)
         pg.display.update()
+        mark_startup('first_frame')
+        mark = charge_cpu(scene, mark)
+        events = wait_events(animated)
+
 
+class MenuScene:
+    """
+    Сцена с меню, которое собирается один раз и переиспользуется.
 
-def name_input() -> None:
+    Attributes:
+        size (tuple[int, int]): Размер окна сцены.
+        menu (pygame_menu.Menu): Объект меню.
+        image (str | None): Имя фонового изображения в images.
+        coord (tuple[int, int] | None): Координаты фонового изображения.
+        animated (bool): Меню нужно перерисовывать без событий.
+        on_enter (Callable | None): Вызывается с меню при каждом
+            показе сцены.
+    """
+
+    def __init__(self, size: tuple[int, int], menu: pygame_menu.Menu,
+                 image: str | None = None,
+                 coord: tuple[int, int] | None = None,
+                 animated: bool = False, on_enter=None):
+        self.size = size
+        self.menu = menu
+        self.image = image
+        self.coord = coord
+        self.animated = animated
+        self.on_enter = on_enter
+
+    def run(self, scenes: 'SceneManager') -> None:
+        """
+        Показывает меню, пока сцена остаётся на вершине стека.
+
+        Args:
+            scenes: Менеджер сцен.
+        """
+        surface = open_window(self.size)
+        if self.on_enter:
+            self.on_enter(self.menu)
+        image = images[self.image] if self.image else None
+        update(surface, self.menu, image, self.coord, self.animated,
+               until=lambda: scenes.current is not self)
+
+
+class GameScene:
+    """
+    Сцена игры.
+
+    Attributes:
+        player_name (str): Имя игрока.
+    """
+
+    def __init__(self, player_name: str):
+        self.player_name = player_name
+
+    def run(self, scenes: 'SceneManager') -> None:
+        """
+        Запускает игровой цикл и возвращается к предыдущей сцене.
+
+        Если к серверу подключиться не удалось, вместо игры
+        показывается сообщение об ошибке.
+        """
+        try:
+            main(self.player_name)
+        except ConnectionFailed as error:
+            scenes.pop()
+            scenes.push(notice(scenes, str(error)))
+            return
+        scenes.pop()
+
+
+class SceneManager:
+    """
+    Плоский стек сцен.
+
+    Кнопки меню не вызывают следующий экран напрямую, а только меняют
+    стек. Цикл run показывает сцену с вершины стека, поэтому глубина
+    вызовов не растёт при переходах, а каждое меню собирается один раз.
+
+    Attributes:
+        builders (dict[str, Callable]): Функции, собирающие сцену по
+            имени.
+        scenes (dict[str, MenuScene]): Уже собранные сцены.
+        stack (list): Стек показываемых сцен.
+    """
+
+    def __init__(self, builders: dict):
+        self.builders = builders
+        self.scenes = {}
+        self.stack = []
+
+    @property
+    def current(self):
+        """Сцена на вершине стека или None."""
+        return self.stack[-1] if self.stack else None
+
+    def scene(self, name: str) -> MenuScene:
+        """Сцена по имени, собранная при первом обращении."""
+        if name not in self.scenes:
+            # pygame_menu требует полной инициализации pygame и
+            # открытого окна для перевода поверхностей в его формат.
+            if not pg.get_init():
+                pg.init()
+            if pg.display.get_surface() is None:
+                open_window()
+            self.scenes[name] = self.builders[name](self)
+        return self.scenes[name]
+
+    def push(self, scene) -> None:
+        """
+        Переход к сцене.
+
+        Args:
+            scene: Имя сцены или готовый объект сцены.
+        """
+        play_sound('open_menu')
+        if isinstance(scene, str):
+            scene = self.scene(scene)
+        self.stack.append(scene)
+
+    def pop(self) -> None:
+        """Возврат к предыдущей сцене."""
+        play_sound('open_menu')
+        self.stack.pop()
+
+    def run(self, name: str) -> None:
+        """
+        Показывает сцены, пока стек не опустеет.
+
+        Args:
+            name: Имя первой сцены.
+        """
+        self.stack.append(self.scene(name))
+        while self.stack:
+            self.current.run(self)
+
+
+def notice(scenes: SceneManager, text: str) -> MenuScene:
+    """Окно с сообщением и кнопкой возврата."""
+    menu = pygame_menu.Menu('Ошибка', 400, 200,
+                            screen_dimension=SCREEN_NAME_INPUT,
+                            theme=create_menu_theme((130, 0)))
+    menu.add.label(text, font_size=18, wordwrap=True)
+    menu.add.button('Назад', scenes.pop)
+    return MenuScene(SCREEN_NAME_INPUT, menu)
+
+
+def name_input(scenes: SceneManager) -> MenuScene:
     """Окно ввода имени игрока."""
-    name_input_screen = pg.display.set_mode(SCREEN_NAME_INPUT)
     menu = pygame_menu.Menu('Введите имя', 400, 200,
+                            screen_dimension=SCREEN_NAME_INPUT,
                             theme=create_menu_theme((100, 0)))
     name_widget = menu.add.text_input('Имя: ', default='Player 1')
-    # Лямбда обеспечивает отложеный запуск main.
-    menu.add.button('Играть', lambda: [sounds['open_menu'].play(),
-                                       main(name_widget.get_value())])
-    menu.add.button('Назад', lambda: [sounds['open_menu'].play(),
-                                      game_menu()])
-    update(name_input_screen, menu)
+    # Лямбда обеспечивает отложеный запуск игры.
+    menu.add.button('Играть', lambda: scenes.push(
+        GameScene(name_widget.get_value())))
+    menu.add.button('Назад', scenes.pop)
+    # Курсор в поле ввода мигает, меню нужно перерисовывать.
+    return MenuScene(SCREEN_NAME_INPUT, menu, animated=True)
 
 
-def show_scores() -> None:
-    """Отображает таблицу рекордов."""
-    show_scores_screen = pg.display.set_mode(SCREEN_SHOW_SCORES)
-    menu = pygame_menu.Menu('Рекорды', 600, 400,
-                            theme=create_menu_theme((230, 0)))
-
-    scores = load_scores()
-    if not scores:
-        menu.add.label('Пока нет рекордов!')
-    else:
-        for score in scores:
-            menu.add.label(
-                f"{score['name']}: {score['score']} ({score['date']})")
-
-    menu.add.button('Назад', lambda: [sounds['open_menu'].play(),
-                                      game_menu()])
+class Leaderboard:
+    """
+    Таблица рекордов с постраничным просмотром и фильтрами.
 
-    update(show_scores_screen, menu)
+    Виджеты строк создаются один раз, при смене страницы или фильтра
+    из хранилища читается только видимая страница и меняются надписи.
 
+    Attributes:
+        rows (list): Надписи строк таблицы.
+        pages (pygame_menu.widgets.Label): Надпись с номером страницы.
+        page (int): Номер текущей страницы с нуля.
+        name (str): Фильтр по имени игрока, пустая строка - без фильтра.
+        date (str): Фильтр по началу даты, пустая строка - без фильтра.
+        has_next (bool): За текущей страницей есть ещё результаты.
+    """
 
-def manual() -> None:
+    def __init__(self, menu: pygame_menu.Menu):
+        self.pages = menu.add.label('')
+        self.rows = [menu.add.label('') for _ in range(SCORES_SHOWN)]
+        self.page = 0
+        self.name = ''
+        self.date = ''
+        self.has_next = False
+
+    def refresh(self) -> None:
+        """Загружает текущую страницу и обновляет надписи."""
+        # Лишняя строка показывает, есть ли следующая страница.
+        results = load_scores(self.page * SCORES_SHOWN, SCORES_SHOWN + 1,
+                              self.name or None, self.date or None)
+        self.has_next = len(results) > SCORES_SHOWN
+        for i, row in enumerate(self.rows):
+            if i < len(results):
+                score = results[i]
+                row.set_title(
+                    f"{score['name']}: {score['score']} ({score['date']})")
+            else:
+                empty = not results and not i
+                row.set_title('Пока нет рекордов!' if empty else '')
+        self.pages.set_title(f'Страница {self.page + 1}')
+
+    def turn(self, delta: int) -> None:
+        """Переход на соседнюю страницу, если она есть."""
+        if delta > 0 and not self.has_next or self.page + delta < 0:
+            return
+        self.page += delta
+        self.refresh()
+
+    def filter(self, name: str | None = None,
+               date: str | None = None) -> None:
+        """Меняет фильтры и показывает первую страницу."""
+        if name is not None:
+            self.name = name.strip()
+        if date is not None:
+            self.date = date.strip()
+        self.page = 0
+        self.refresh()
+
+    def reset(self, menu: pygame_menu.Menu) -> None:
+        """Показ таблицы с первой страницы при входе в сцену."""
+        self.page = 0
+        self.refresh()
+
+
+def show_scores(scenes: SceneManager) -> MenuScene:
+    """Отображает таблицу рекордов."""
+    theme = create_menu_theme((230, 0))
+    # Фильтры, строки и кнопки должны поместиться без прокрутки.
+    theme.widget_font_size = 20
+    theme.widget_margin = (0, 2)
+    theme.widget_padding = (2, 8)
+    menu = pygame_menu.Menu('Рекорды', 600, 400,
+                            screen_dimension=SCREEN_SHOW_SCORES,
+                            theme=theme)
+    menu.add.text_input('Игрок: ', maxchar=20,
+                        onchange=lambda name: board.filter(name=name))
+    menu.add.text_input('Дата: ', maxchar=10,
+                        onchange=lambda date: board.filter(date=date))
+    board = Leaderboard(menu)
+    # Кнопки в одну строку под таблицей. Отступы упакованных в рамку
+    # кнопок не учитываются, поэтому они нулевые.
+    buttons = menu.add.frame_h(560, 40)
+    buttons.pack(menu.add.button('< Пред.', board.turn, -1, margin=(0, 0)))
+    buttons.pack(menu.add.button('Назад', scenes.pop, margin=(0, 0)),
+                 align=pygame_menu.locals.ALIGN_CENTER)
+    buttons.pack(menu.add.button('След. >', board.turn, 1, margin=(0, 0)),
+                 align=pygame_menu.locals.ALIGN_RIGHT)
+
+    # Рекорды меняются между показами, страница читается заново.
+    return MenuScene(SCREEN_SHOW_SCORES, menu, animated=True,
+                     on_enter=board.reset)
+
+
+def manual(scenes: SceneManager) -> MenuScene:
     """Отображает инструкцию к игре."""
-    manual_screen = pg.display.set_mode(SCREEN_MANUAL)
     menu = pygame_menu.Menu('Инструкция', 660, 600,
+                            screen_dimension=SCREEN_MANUAL,
                             theme=create_menu_theme((230, 0)))
-    btn = menu.add.button('Назад', lambda: [sounds['open_menu'].play(),
-                                            game_menu()])
+    btn = menu.add.button('Назад', scenes.pop)
     btn.set_position(500, 500)
 
-    update(manual_screen, menu, images['manual'], coord=(0, 0))
+    return MenuScene(SCREEN_MANUAL, menu, 'manual', coord=(0, 0))
 
 
-def game_menu() -> None:
+def game_menu(scenes: SceneManager) -> MenuScene:
     """Главное меню игры."""
-    game_menu_screen = pg.display.set_mode(SCREEN_GAME_MENU)
     menu = pygame_menu.Menu('Меню', 200, 300, position=(25, 240, False),
+                            screen_dimension=SCREEN_GAME_MENU,
                             theme=create_menu_theme((55, 0)))
-    menu.add.button('Играть', lambda: [sounds['open_menu'].play(),
-                                       name_input()])
-    menu.add.button('Рекорды', lambda: [sounds['open_menu'].play(),
-                                        show_scores()])
-    menu.add.button('Правила', lambda: [sounds['open_menu'].play(),
-                                        manual()])
-    menu.add.button('Выход', pygame_menu.events.EXIT)
+    menu.add.button('Играть', scenes.push, 'name_input')
+    menu.add.button('Рекорды', scenes.push, 'scores')
+    menu.add.button('Правила', scenes.push, 'manual')
+    menu.add.button('Выход', quit_game)
 
-    update(game_menu_screen, menu, images['logo_menu'], (-70, -20))
+    return MenuScene(SCREEN_GAME_MENU, menu, 'logo_menu', (-70, -20))
+
+
+# Сцены меню по именам для SceneManager.
+MENU_SCENES = {
+    'menu': game_menu,
+    'name_input': name_input,
+    'scores': show_scores,
+    'manual': manual,
+}
 
 
 def show_pause_menu(game_state) -> bool:
@@ -631,9 +1557,9 @@ def show_pause_menu(game_state) -> bool:
     overlay.fill((0, 0, 0, 128))  # Чёрный с 50% прозрачностью.
 
     # Создает текст.
-    font = pg.font.Font(None, 30)
-    text = font.render("Нажмите любую клавишу что бы продолжить", True,
-                       (255, 255, 255))
+    text = texts.render(fonts['pause'],
+                        "Нажмите любую клавишу что бы продолжить",
+                        (255, 255, 255))
     text_rect = text.get_rect(
         center=(AREA_SIZE[0] // 2, AREA_SIZE[1] // 2))
 
@@ -644,21 +1570,61 @@ def show_pause_menu(game_state) -> bool:
     game_state.screen.blit(overlay, (0, 0))
     game_state.screen.blit(text, text_rect)
     pg.display.update()
+    # После оверлея кадр нужно восстановить целиком.
+    game_state.full_redraw = True
 
     # Ожидаем нажатия любой клавиши.
     # Пришлось реализовать отдельно из основной
     # функции управления это не работало.
+    mark = process_time()
     while True:
-        for event in pg.event.get():
-            if event.type == pg.QUIT:
-                pg.quit()
-                raise SystemExit
-            # Возвращаемся в игру при любом нажатии.
-            if event.type == pg.KEYDOWN:
-                if event.key == pg.K_ESCAPE:
-                    pg.quit()
-                    raise SystemExit
-                return False
+        # Процесс спит до прихода события.
+        event = pg.event.wait()
+        mark = charge_cpu('pause', mark)
+        if event.type == pg.QUIT:
+            quit_game(game_state)
+        # Возвращаемся в игру при любом нажатии.
+        if event.type == pg.KEYDOWN:
+            if event.key == pg.K_ESCAPE:
+                quit_game(game_state)
+            return False
+
+
+class ConnectionFailed(Exception):
+    """Не удалось войти в комнату сервера; текст - для игрока."""
+
+
+def parse_server(address: str) -> tuple[str, int]:
+    """
+    Адрес и порт сервера из строки 'адрес:порт'.
+
+    Raises:
+        ValueError: Строка не вида 'адрес:порт'.
+    """
+    host, _, port = address.rpartition(':')
+    if not host or not port.isdigit() or not 0 < int(port) < 1 << 16:
+        raise ValueError(f'адрес сервера {address!r} не вида адрес:порт')
+    return host, int(port)
+
+
+def connect(player_name: str) -> client.Connection:
+    """
+    Вход в комнату ROOM сервера SERVER.
+
+    Raises:
+        ConnectionFailed: Сервер недоступен, комната заполнена или
+            адрес сервера неверен.
+    """
+    try:
+        host, port = parse_server(SERVER)
+        return client.Connection(host, port, ROOM, player_name)
+    except client.ConnectionRejected:
+        raise ConnectionFailed(f'В комнате {ROOM} нет свободных змеек')
+    except ValueError as error:
+        raise ConnectionFailed(f'Неверный {error}')
+    except OSError as error:
+        raise ConnectionFailed(f'Сервер {SERVER} недоступен: '
+                               f'{error.strerror or error}')
 
 
 def main(player_name: str = 'Player 1') -> None:
@@ -668,31 +1634,98 @@ def main(player_name: str = 'Player 1') -> None:
     Args:
         player_name: Имя текущего игрока.
     """
-    state = GameState(player_name)
-    sounds['background_music'].play(-1).set_volume(0.4)
+    if SERVER:
+        state = RemoteGameState(player_name, connect(player_name))
+    else:
+        state = GameState(player_name)
+    play_music(0.4)
 
+    mark = process_time()
     while True:
-        state.paused = handle_keys(state.snake, state)
+        mark = charge_cpu('game', mark)
+        state.paused = handle_keys(state.world.snake, state)
 
         # Обработка паузы.
         if state.paused:
             show_pause_menu(state)
+            mark = process_time()
             state.paused = False
+            # Время на паузе не идёт в зачёт логике.
+            clock.tick()
             continue
 
-        # Активирует бонус.
-        state.bonus_spawn()
-        # Обновляет позицию змейки.
-        state.snake.move()
-        # Проверяет на столкновение с объектами.
-        state.handle_collision()
-
-        # Обновление скорости отображения.
-        clock.tick(5 + state.snake.speed)
+        # Ожидание следующего кадра и тики логики за прошедшее время.
+        elapsed = min(clock.tick(RENDER_FPS) / 1000, MAX_FRAME_TIME)
+        alpha = state.advance(elapsed)
 
         # Отрисовка игровых объектов.
-        state.draw_all()
+        state.draw_all(alpha)
+
+
+def parse_board(size: str) -> tuple[int, int]:
+    """
+    Размер поля из строки 'ШxВ'.
+
+    Ширина и высота - целые от 1 до 65535: больше не помещается
+    в заголовок записи партии (см. replay.HEADER).
+
+    Raises:
+        ValueError: Строка не вида 'ШxВ' или размер вне пределов.
+    """
+    sides = size.split('x')
+    if (len(sides) != 2
+            or not all(side.isdigit() and 0 < int(side) < 1 << 16
+                       for side in sides)):
+        raise ValueError(f'размер поля {size!r}')
+    return int(sides[0]), int(sides[1])
+
+
+def parse_option(value: str, parse, usage: str):
+    """
+    Значение настройки, разобранное функцией parse.
+
+    Args:
+        value: Значение из командной строки.
+        parse: Разбор значения, при ошибке бросает ValueError.
+        usage: Подсказка к настройке.
+
+    Returns:
+        Результат parse. Неверное значение завершает программу с
+        подсказкой.
+    """
+    try:
+        return parse(value)
+    except ValueError as error:
+        sys.exit(f'Неверный {error}. Использование: {usage}')
+
+
+def parse_options(argv: list[str]) -> None:
+    """
+    Настройки из командной строки: --board=ШxВ, --rivals=N,
+    --autopilot, --connect=адрес:порт, --room=название.
+
+    Неверное значение завершает программу с подсказкой.
+    """
+    global BOARD_SIZE, RIVALS, AUTOPILOT, SERVER, ROOM
+    for arg in argv:
+        if arg.startswith('--board='):
+            BOARD_SIZE = parse_option(arg[len('--board='):], parse_board,
+                                      '--board=ШxВ, стороны от 1 до 65535')
+        elif arg.startswith('--rivals='):
+            RIVALS = int(arg[len('--rivals='):])
+        elif arg == '--autopilot':
+            AUTOPILOT = True
+        elif arg.startswith('--connect='):
+            SERVER = arg[len('--connect='):]
+            parse_option(SERVER, parse_server, '--connect=адрес:порт')
+        elif arg.startswith('--room='):
+            ROOM = arg[len('--room='):]
 
 
 if __name__ == '__main__':
-    game_menu()
+    parse_options(sys.argv[1:])
+    try:
+        SceneManager(MENU_SCENES).run('menu')
+    finally:
+        if '--cpu-report' in sys.argv:
+            print(cpu_report())
@@ -0,0 +1,317 @@
+"""Сетевой протокол игры.
+
+Сообщение - кадр из заголовка (тип, длина) и тела из чисел
+переменной длины (см. replay.write_varint). Сервер отправляет
+подключившемуся игроку снимок игры один раз, а дальше рассылает на
+каждом тике только изменения:
+
+    OP_HEAD   змейка, клетка головы, направление
+    OP_TAIL   змейка, сколько сегментов убрать с хвоста
+    OP_RESET  змейка, клетка новой змейки, направление (гибель)
+    OP_FRUIT  фрукт, клетка + 1 (0 - фрукта нет), тик исчезновения
+    OP_STATS  змейка, счёт, длина, скорость в сотых
+
+Операция и номер объекта упакованы в одно число (номер << 3 | op),
+поэтому ход змейки на поле до 128x128 занимает 4-5 байт.
+
+Клиент применяет изменения к своей копии engine.World, так что
+отрисовка тонкого клиента не отличается от локальной игры.
+"""
+import struct
+
+import engine
+from replay import read_varint, write_varint
+
+# Тип сообщения и длина тела.
+FRAME = struct.Struct('<BI')
+
+# Сообщения клиента: вход в комнату (комната и имя) и поворот.
+MSG_JOIN = 1
+MSG_TURN = 2
+# Сообщения сервера: снимок игры, изменения за тик, отказ.
+MSG_WELCOME = 3
+MSG_TICK = 4
+MSG_REJECT = 5
+
+OP_HEAD = 0
+OP_TAIL = 1
+OP_RESET = 2
+OP_FRUIT = 3
+OP_STATS = 4
+
+# Количество аргументов каждой операции.
+OP_ARGS = {OP_HEAD: 2, OP_TAIL: 1, OP_RESET: 2, OP_FRUIT: 2, OP_STATS: 3}
+OP_BITS = 3
+
+# Наибольшая длина тела сообщения.
+MAX_MESSAGE = 1 << 24
+
+
+def frame(kind: int, payload: bytes = b'') -> bytes:
+    """Кадр сообщения для отправки."""
+    return FRAME.pack(kind, len(payload)) + payload
+
+
+def pack_ints(values) -> bytes:
+    """Упаковывает неотрицательные числа подряд."""
+    out = bytearray()
+    for value in values:
+        write_varint(out, value)
+    return bytes(out)
+
+
+def unpack_ints(data: bytes) -> list[int]:
+    """Распаковывает все числа тела сообщения."""
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+def pack_text(*texts: str) -> bytes:
+    """Упаковывает строки с длиной перед каждой."""
+    out = bytearray()
+    for text in texts:
+        data = text.encode('utf-8')
+        write_varint(out, len(data))
+        out += data
+    return bytes(out)
+
+
+def unpack_text(data: bytes) -> list[str]:
+    """Распаковывает строки, упакованные pack_text."""
+    texts, pos = [], 0
+    while pos < len(data):
+        size, pos = read_varint(data, pos)
+        if pos + size > len(data):
+            raise ValueError('Сообщение обрезано')
+        texts.append(data[pos:pos + size].decode('utf-8'))
+        pos += size
+    return texts
+
+
+def fruit_slots(world: engine.World) -> list[engine.Fruit]:
+    """
+    Фрукты игры в постоянном порядке: яблоки, затем бонусы по названию.
+
+    world.bonuses перемешивается при появлении бонусов, а бонус
+    каждого вида один, поэтому порядок по названию у сервера и
+    клиента одинаков.
+    """
+    return [*world.apples,
+            *sorted(world.bonuses, key=lambda bonus: bonus.name)]
+
+
+def snake_stats(snake: engine.Snake) -> tuple[int, int, int]:
+    """Счёт, длина и скорость змейки в сотых."""
+    return max(0, snake.score), snake.length, round(snake.speed * 100)
+
+
+def fruit_state(fruit: engine.Fruit,
+                board: engine.Board) -> tuple[int, int]:
+    """Клетка фрукта + 1 (0 - фрукта нет) и тик его исчезновения."""
+    if not fruit.active:
+        return 0, 0
+    return (board.index(fruit.position) + 1,
+            fruit.timer.tick if fruit.timer else 0)
+
+
+class DeltaTracker:
+    """
+    Изменения игры за тик для рассылки клиентам.
+
+    Хранит то, что клиенты уже знают о каждой змейке и фрукте, и
+    после тика сравнивает с этим состояние игры. Сравнение стоит O(1)
+    на змейку: голова и размер тела, а не списки клеток.
+
+    Attributes:
+        world (engine.World): Игра на сервере.
+        fruits (list[engine.Fruit]): Фрукты в порядке fruit_slots.
+        heads (list[int]): Известная клиентам клетка головы змеек.
+        sizes (list[int]): Известное клиентам число сегментов.
+        stats (list[tuple]): Известные клиентам snake_stats.
+        fruit_states (list[tuple]): Известные клиентам fruit_state.
+    """
+
+    def __init__(self, world: engine.World):
+        self.world = world
+        self.fruits = fruit_slots(world)
+        self.heads = [snake.body[snake.head] for snake in world.snakes]
+        self.sizes = [snake.size for snake in world.snakes]
+        self.stats = [snake_stats(snake) for snake in world.snakes]
+        self.fruit_states = [fruit_state(fruit, world.board)
+                             for fruit in self.fruits]
+
+    def snapshot(self, slot: int) -> bytes:
+        """
+        Полное состояние игры для нового игрока.
+
+        Args:
+            slot: Номер змейки игрока.
+
+        Returns:
+            Тело сообщения MSG_WELCOME.
+        """
+        world = self.world
+        values = [world.board.width, world.board.height, slot, world.tick,
+                  len(world.apples), len(world.snakes)]
+        for snake in world.snakes:
+            values.append(engine.DIRECTIONS.index(snake.direction))
+            values.extend(snake_stats(snake))
+            values.append(snake.size)
+            capacity = len(snake.body)
+            values.extend(snake.body[(snake.head + i) % capacity]
+                          for i in range(snake.size))
+        values.append(len(self.fruits))
+        for fruit in self.fruits:
+            values.extend(fruit_state(fruit, world.board))
+        return pack_ints(values)
+
+    def delta(self, events: list[tuple]) -> bytes:
+        """
+        Изменения за последний тик.
+
+        Args:
+            events: События тика из engine.step_all.
+
+        Returns:
+            Тело сообщения MSG_TICK.
+        """
+        world = self.world
+        dead = {player for kind, player, _ in events
+                if kind == engine.EVENT_DEATH}
+        out = bytearray()
+        write_varint(out, world.tick)
+
+        def op(code: int, target: int, *args: int) -> None:
+            write_varint(out, target << OP_BITS | code)
+            for arg in args:
+                write_varint(out, arg)
+
+        for player, snake in enumerate(world.snakes):
+            head = snake.body[snake.head]
+            direction = engine.DIRECTIONS.index(snake.direction)
+            if player in dead:
+                op(OP_RESET, player, head, direction)
+            elif head != self.heads[player]:
+                op(OP_HEAD, player, head, direction)
+                removed = self.sizes[player] + 1 - snake.size
+                if removed:
+                    op(OP_TAIL, player, removed)
+            self.heads[player] = head
+            self.sizes[player] = snake.size
+            stats = snake_stats(snake)
+            if stats != self.stats[player]:
+                op(OP_STATS, player, *stats)
+                self.stats[player] = stats
+        for slot, fruit in enumerate(self.fruits):
+            state = fruit_state(fruit, world.board)
+            if state != self.fruit_states[slot]:
+                op(OP_FRUIT, slot, *state)
+                self.fruit_states[slot] = state
+        return bytes(out)
+
+
+def set_stats(snake: engine.Snake, score: int, length: int,
+              speed: int) -> None:
+    """Записывает в змейку значения snake_stats."""
+    snake.score = score
+    snake.length = length
+    snake.speed = speed / 100
+
+
+def set_fruit(fruit: engine.Fruit, board: engine.Board, cell: int,
+              expires: int) -> None:
+    """Записывает во фрукт значения fruit_state."""
+    fruit.position = board.point(cell - 1) if cell else None
+    fruit.active = bool(cell)
+    fruit.timer = engine.Timer(expires, None) if expires else None
+
+
+class Mirror:
+    """
+    Копия игры сервера на клиенте.
+
+    Attributes:
+        world (engine.World): Копия игры; правила в ней не
+            выполняются, состояние приходит с сервера.
+        snakes (list[engine.Snake]): Змейки в порядке сервера;
+            world.snakes клиент может переставлять.
+        fruits (list[engine.Fruit]): Фрукты в порядке fruit_slots.
+        slot (int): Номер змейки игрока.
+    """
+
+    def __init__(self, payload: bytes):
+        """
+        Создание копии по снимку.
+
+        Args:
+            payload: Тело сообщения MSG_WELCOME.
+
+        Raises:
+            ValueError: Снимок не подходит к правилам клиента.
+        """
+        values = iter(unpack_ints(payload))
+        width, height, self.slot, tick, apples, snakes = (
+            next(values) for _ in range(6))
+        board = engine.Board(width, height)
+        self.world = world = engine.World(board, seed=0, apples=apples,
+                                          snakes=snakes)
+        world.tick = tick
+        self.snakes = list(world.snakes)
+        for snake in self.snakes:
+            snake.clear()
+        for snake in self.snakes:
+            snake.direction = engine.DIRECTIONS[next(values)]
+            set_stats(snake, next(values), next(values), next(values))
+            snake.positions = [board.point(next(values))
+                               for _ in range(next(values))]
+        self.fruits = fruit_slots(world)
+        if next(values) != len(self.fruits):
+            raise ValueError('Виды фруктов клиента и сервера различаются')
+        for fruit in self.fruits:
+            set_fruit(fruit, board, next(values), next(values))
+
+    def apply(self, payload: bytes) -> list[tuple]:
+        """
+        Применяет изменения за тик.
+
+        Args:
+            payload: Тело сообщения MSG_TICK.
+
+        Returns:
+            События тика в формате engine.step_all. У EVENT_EAT вместо
+            названия фрукта - None, его клиент не получает.
+        """
+        world = self.world
+        board = world.board
+        values = unpack_ints(payload)
+        world.tick = values[0]
+        events = []
+        pos = 1
+        while pos < len(values):
+            target = values[pos] >> OP_BITS
+            code = values[pos] & (1 << OP_BITS) - 1
+            args = values[pos + 1:pos + 1 + OP_ARGS[code]]
+            pos += 1 + OP_ARGS[code]
+            if code == OP_FRUIT:
+                set_fruit(self.fruits[target], board, *args)
+                continue
+            snake = self.snakes[target]
+            if code == OP_HEAD:
+                snake.push(board.point(args[0]))
+                snake.direction = engine.DIRECTIONS[args[1]]
+            elif code == OP_TAIL:
+                for _ in range(args[0]):
+                    snake.pop()
+            elif code == OP_RESET:
+                events.append((engine.EVENT_DEATH, target, snake.score))
+                snake.positions = [board.point(args[0])]
+                snake.direction = engine.DIRECTIONS[args[1]]
+            elif code == OP_STATS:
+                # Счёт растёт только от фруктов, после гибели он падает.
+                if args[0] > snake.score:
+                    events.append((engine.EVENT_EAT, target, None))
+                set_stats(snake, *args)
+        return events
@@ -0,0 +1,212 @@
+"""Запись и воспроизведение игр.
+
+Игра полностью определяется зерном генератора и поворотами змейки,
+поэтому запись хранит только их: заголовок с размером поля, зерном и
+числом тиков, затем повороты в виде пар (тиков с прошлого поворота,
+направление), упакованных в одно число переменной длины. Следом идут
+счета на момент каждой гибели и итоговый счёт - по ним воспроизведение
+проверяет, что игра повторилась.
+
+Воспроизведение идёт через engine.step без окна и часов:
+
+    python replay.py replays/game.snkr
+"""
+import struct
+import sys
+from time import perf_counter
+
+import engine
+
+MAGIC = b'SNKR'
+# Версия увеличивается, когда меняются правила и старые записи
+# перестают повторяться.
+VERSION = 3
+
+# Магия, версия, ширина и высота поля, зерно, количество тиков.
+HEADER = struct.Struct('<4sBHHQI')
+
+# Направление занимает 2 младших бита в записи поворота.
+DIRECTION_BITS = 2
+
+
+def write_varint(out: bytearray, value: int) -> None:
+    """Дописывает неотрицательное число в формате LEB128."""
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    """
+    Читает число в формате LEB128.
+
+    Args:
+        data: Байты записи.
+        pos: Позиция начала числа.
+
+    Returns:
+        Пара (число, позиция после него).
+    """
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError('Запись игры обрезана')
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Replay:
+    """
+    Запись одной игры.
+
+    Attributes:
+        seed (int): Зерно генератора случайных чисел игры.
+        width (int): Ширина поля.
+        height (int): Высота поля.
+        ticks (int): Количество тиков игры.
+        turns (list[tuple[int, int]]): Повороты в виде пар (номер тика,
+            индекс направления в engine.DIRECTIONS).
+        deaths (list[int]): Счёт на момент каждой гибели.
+        score (int): Счёт в конце записи.
+    """
+
+    def __init__(self, seed: int, width: int = engine.GRID_WIDTH,
+                 height: int = engine.GRID_HEIGHT):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.ticks = 0
+        self.turns = []
+        self.deaths = []
+        self.score = 0
+
+    def record(self, world: engine.World,
+               action: tuple[int, int] | None, events: list[tuple]) -> None:
+        """
+        Запоминает тик, только что выполненный engine.step.
+
+        Args:
+            world: Состояние игры после тика.
+            action: Направление, переданное в step.
+            events: События тика.
+        """
+        if action is not None:
+            self.turns.append((world.tick - 1,
+                               engine.DIRECTIONS.index(action)))
+        self.deaths.extend(data for kind, data in events
+                           if kind == engine.EVENT_DEATH)
+        self.ticks = world.tick
+        self.score = world.score
+
+    def to_bytes(self) -> bytes:
+        """Упаковывает запись в двоичный формат."""
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.width, self.height,
+                                    self.seed, self.ticks))
+        write_varint(out, len(self.turns))
+        last = 0
+        for tick, direction in self.turns:
+            write_varint(out, (tick - last) << DIRECTION_BITS | direction)
+            last = tick
+        write_varint(out, len(self.deaths))
+        for score in self.deaths:
+            write_varint(out, score)
+        write_varint(out, self.score)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Replay':
+        """
+        Распаковывает запись.
+
+        Raises:
+            ValueError: Данные не являются записью игры этой версии.
+        """
+        if len(data) < HEADER.size:
+            raise ValueError('Запись игры обрезана')
+        magic, version, width, height, seed, ticks = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Неизвестный формат записи игры')
+        replay = cls(seed, width, height)
+        replay.ticks = ticks
+        pos = HEADER.size
+        count, pos = read_varint(data, pos)
+        tick = 0
+        for _ in range(count):
+            value, pos = read_varint(data, pos)
+            tick += value >> DIRECTION_BITS
+            replay.turns.append((tick, value & (1 << DIRECTION_BITS) - 1))
+        count, pos = read_varint(data, pos)
+        for _ in range(count):
+            score, pos = read_varint(data, pos)
+            replay.deaths.append(score)
+        replay.score, pos = read_varint(data, pos)
+        return replay
+
+    def save(self, path: str) -> None:
+        """Сохраняет запись в файл."""
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'Replay':
+        """Загружает запись из файла."""
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def simulate(replay: Replay) -> Replay:
+    """
+    Повторяет игру по записи.
+
+    Args:
+        replay: Запись игры.
+
+    Returns:
+        Новая запись с результатами повторной игры.
+    """
+    world = engine.World(engine.Board(replay.width, replay.height),
+                         seed=replay.seed)
+    result = Replay(replay.seed, replay.width, replay.height)
+    turns = dict(replay.turns)
+    for tick in range(replay.ticks):
+        direction = turns.get(tick)
+        action = None if direction is None else engine.DIRECTIONS[direction]
+        _, events = engine.step(world, action)
+        result.record(world, action, events)
+    return result
+
+
+def verify(replay: Replay) -> bool:
+    """Проверяет, что повтор игры даёт записанные счета."""
+    result = simulate(replay)
+    return (result.deaths, result.score) == (replay.deaths, replay.score)
+
+
+def main(paths: list[str]) -> int:
+    """
+    Проверка записей из командной строки.
+
+    Returns:
+        Код выхода: 0, если все записи повторились.
+    """
+    status = 0
+    for path in paths:
+        replay = Replay.load(path)
+        started = perf_counter()
+        ok = verify(replay)
+        elapsed = perf_counter() - started
+        rate = replay.ticks / elapsed if elapsed else 0
+        print(f'{path}: {"OK" if ok else "MISMATCH"}, '
+              f'{replay.ticks} тиков, счёт {replay.score}, '
+              f'гибелей {len(replay.deaths)}, {rate:.0f} тиков/с')
+        status |= not ok
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
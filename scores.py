@@ -0,0 +1,309 @@
+"""Хранилище результатов игр в SQLite.
+
+Вся история игр лежит в одной таблице с индексами по счёту, по
+игроку и по дате, поэтому вставка стоит O(log n), а лучший счёт,
+таблица рекордов и результаты игрока читаются по индексу без полного
+просмотра. Каждая запись - отдельная транзакция, а журнал WAL
+позволяет нескольким запущенным копиям игры писать в одну базу, не
+теряя результатов.
+
+Во время игры результаты пишет ScoreWriter в фоновом потоке, чтобы
+медленный диск не задерживал кадры.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+SCORES_DB = 'scores.db'
+
+# Файл рекордов старого формата, переносится в базу при её создании.
+LEGACY_SCORES = 'scores.json'
+
+# Сколько ждать блокировки базы другим процессом, в секундах.
+BUSY_TIMEOUT = 5.0
+
+# Размер очереди фоновой записи и наибольшее число результатов,
+# записываемых одной транзакцией.
+WRITE_QUEUE_SIZE = 256
+WRITE_BATCH = 64
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, id);
+CREATE INDEX IF NOT EXISTS scores_by_name ON scores (name, score DESC);
+CREATE INDEX IF NOT EXISTS scores_by_date ON scores (date, score DESC);
+'''
+
+
+def today() -> str:
+    """Сегодняшняя дата в формате таблицы рекордов."""
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+class ScoreStore:
+    """
+    Таблица результатов всех игр.
+
+    Attributes:
+        path (str): Путь к файлу базы.
+        connection (sqlite3.Connection): Соединение с базой.
+    """
+
+    def __init__(self, path: str = SCORES_DB,
+                 legacy_path: str | None = LEGACY_SCORES):
+        """
+        Открытие базы с созданием схемы и переносом старых рекордов.
+
+        Args:
+            path: Путь к файлу базы.
+            legacy_path: Файл рекордов в JSON, который переносится в
+                новую базу. None - ничего не переносить.
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT,
+                                          isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        with self.transaction():
+            created = not self.connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'scores'"
+            ).fetchone()
+            for statement in SCHEMA.split(';'):
+                if statement.strip():
+                    self.connection.execute(statement)
+            if created and legacy_path and os.path.exists(legacy_path):
+                self.import_json(legacy_path)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Транзакция, сразу захватывающая блокировку записи.
+
+        Другие процессы ждут её завершения до BUSY_TIMEOUT, при ошибке
+        изменения откатываются целиком.
+        """
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+
+    def import_json(self, path: str) -> int:
+        """
+        Перенос результатов из файла старого формата.
+
+        Args:
+            path: Путь к JSON со списком словарей name, score, date.
+
+        Returns:
+            Количество перенесённых результатов.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            rows = [(row['name'], row['score'], row['date'])
+                    for row in json.load(f)]
+        self.connection.executemany(
+            'INSERT INTO scores (name, score, date) VALUES (?, ?, ?)', rows)
+        return len(rows)
+
+    def add(self, name: str, score: int, date: str | None = None) -> None:
+        """
+        Сохраняет результат игры.
+
+        Args:
+            name: Имя игрока.
+            score: Достигнутый счёт.
+            date: Дата игры, по умолчанию сегодняшняя.
+        """
+        self.add_many([(name, score, date or today())])
+
+    def add_many(self, rows: list[tuple[str, int, str]]) -> None:
+        """
+        Сохраняет несколько результатов одной транзакцией.
+
+        Args:
+            rows: Кортежи (имя, счёт, дата).
+        """
+        with self.transaction():
+            self.connection.executemany(
+                'INSERT INTO scores (name, score, date) VALUES (?, ?, ?)',
+                rows)
+
+    def top(self, limit: int = 5, offset: int = 0, name: str | None = None,
+            date: str | None = None) -> list[dict]:
+        """
+        Лучшие результаты по убыванию счёта.
+
+        Читается только запрошенная страница: порядок по счёту даёт
+        индекс, поэтому время не зависит от размера таблицы. С
+        фильтром по дате читаются результаты за этот период по
+        индексу дат и сортируются по счёту, время растёт с числом
+        игр за период, а не за всю историю.
+
+        Args:
+            limit: Количество результатов.
+            offset: Сколько лучших результатов пропустить.
+            name: Только результаты этого игрока.
+            date: Только результаты с датой, начинающейся с этой
+                строки (например, '2024' или '2024-05').
+
+        Returns:
+            Список словарей с ключами name, score, date.
+        """
+        conditions, params = [], []
+        if name:
+            conditions.append('name = ?')
+            params.append(name)
+        if date:
+            # Диапазон вместо LIKE, чтобы условие шло по индексу
+            # scores_by_date.
+            conditions.append('date >= ? AND date < ?')
+            params.extend((date, date + '\uffff'))
+        where = f'WHERE {" AND ".join(conditions)} ' if conditions else ''
+        rows = self.connection.execute(
+            f'SELECT name, score, date FROM scores {where}'
+            'ORDER BY score DESC, id LIMIT ? OFFSET ?',
+            (*params, limit, offset))
+        return [dict(zip(('name', 'score', 'date'), row)) for row in rows]
+
+    def best(self) -> int:
+        """Лучший счёт или 0, если результатов нет."""
+        row = self.connection.execute('SELECT MAX(score) FROM scores')
+        return row.fetchone()[0] or 0
+
+    def player_best(self, name: str) -> int:
+        """Лучший счёт игрока или 0, если результатов игрока нет."""
+        row = self.connection.execute(
+            'SELECT MAX(score) FROM scores WHERE name = ?', (name,))
+        return row.fetchone()[0] or 0
+
+    def player_games(self, name: str) -> int:
+        """Количество сыгранных игроком игр."""
+        row = self.connection.execute(
+            'SELECT COUNT(*) FROM scores WHERE name = ?', (name,))
+        return row.fetchone()[0]
+
+    def __len__(self) -> int:
+        """Количество сохранённых результатов."""
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM scores').fetchone()[0]
+
+    def close(self) -> None:
+        """Закрывает соединение с базой."""
+        self.connection.close()
+
+
+# Сигнал фоновому потоку записи о завершении работы.
+_STOP = object()
+
+
+class ScoreWriter:
+    """
+    Запись результатов в базу в фоновом потоке.
+
+    Результаты складываются в ограниченную очередь, поток забирает всё
+    накопившееся (до WRITE_BATCH за раз) и пишет одной транзакцией.
+    Лучший счёт хранится в памяти и не требует обращения к диску.
+
+    Attributes:
+        path (str): Путь к файлу базы.
+        best (int): Лучший счёт с учётом ещё не записанных результатов.
+        batch (int): Наибольшее число результатов в одной транзакции.
+        queue (queue.Queue): Результаты, ожидающие записи.
+        error (sqlite3.Error | None): Последняя ошибка записи.
+        thread (threading.Thread): Поток записи.
+    """
+
+    def __init__(self, path: str = SCORES_DB,
+                 maxsize: int = WRITE_QUEUE_SIZE, batch: int = WRITE_BATCH):
+        """
+        Открытие базы и запуск потока записи.
+
+        Args:
+            path: Путь к файлу базы.
+            maxsize: Размер очереди. Когда она заполнена, submit ждёт
+                записи.
+            batch: Наибольшее число результатов в одной транзакции.
+        """
+        self.path = path
+        store = ScoreStore(path)
+        self.best = store.best()
+        store.close()
+        self.batch = batch
+        self.queue = queue.Queue(maxsize)
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name='score-writer',
+                                       daemon=True)
+        self.thread.start()
+
+    def submit(self, name: str, score: int, date: str | None = None) -> None:
+        """
+        Передаёт результат на запись.
+
+        Args:
+            name: Имя игрока.
+            score: Достигнутый счёт.
+            date: Дата игры, по умолчанию сегодняшняя.
+        """
+        self.best = max(self.best, score)
+        self.queue.put((name, score, date or today()))
+
+    def next_batch(self) -> tuple[list, bool]:
+        """
+        Ожидает результаты и забирает накопившиеся.
+
+        Returns:
+            Пара из списка результатов и признака завершения работы.
+        """
+        rows = []
+        item = self.queue.get()
+        while item is not _STOP:
+            rows.append(item)
+            if len(rows) >= self.batch:
+                break
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+        return rows, item is _STOP
+
+    def run(self) -> None:
+        """Цикл потока записи."""
+        store = ScoreStore(self.path, legacy_path=None)
+        stop = False
+        while not stop:
+            rows, stop = self.next_batch()
+            try:
+                if rows:
+                    store.add_many(rows)
+            except sqlite3.Error as error:
+                # Игра не должна останавливаться из-за сбоя диска.
+                self.error = error
+            for _ in range(len(rows) + stop):
+                self.queue.task_done()
+        store.close()
+
+    def flush(self) -> None:
+        """
+        Ожидает записи всех переданных результатов.
+
+        После close поток не работает и ждать нечего: результаты,
+        переданные после close, не записываются.
+        """
+        if self.thread.is_alive():
+            self.queue.join()
+
+    def close(self) -> None:
+        """Записывает оставшиеся результаты и завершает поток."""
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
@@ -0,0 +1,268 @@
+"""Сервер сетевой игры на asyncio.
+
+Правила выполняются только на сервере: клиенты присылают повороты, а
+сервер с постоянной частотой тиков продвигает игры всех комнат одной
+задачей и рассылает изменения (см. protocol.py). Змейки комнаты без
+игроков ведёт engine.steer_clear, поэтому вошедший игрок занимает
+свободную змейку в уже идущей игре.
+
+    python server.py --port=8765 --tick-rate=10
+"""
+import asyncio
+import sys
+from collections import deque
+from time import perf_counter
+
+import engine
+import protocol
+
+HOST = '127.0.0.1'
+PORT = 8765
+
+# Тиков в секунду во всех комнатах.
+TICK_RATE = 10
+
+# Размер поля и количество змеек в новой комнате.
+ROOM_BOARD = (engine.GRID_WIDTH, engine.GRID_HEIGHT)
+ROOM_SNAKES = 4
+
+# Повороты игрока, ожидающие тиков. Как в my_snake.TurnQueue, при
+# полной очереди отбрасывается новый поворот, а не самый старый.
+MAX_PENDING_TURNS = 3
+
+# Наибольшая длина сообщения клиента: вход в комнату занимает
+# несколько десятков байт, поворот - один байт.
+MAX_CLIENT_MESSAGE = 256
+
+# Клиент, не успевающий читать, отключается, когда данных для него
+# накопилось больше этого числа байт.
+MAX_SEND_BUFFER = 1 << 20
+
+
+class Player:
+    """
+    Игрок, подключённый к комнате.
+
+    Attributes:
+        name (str): Имя игрока.
+        slot (int): Номер змейки игрока в комнате.
+        writer (asyncio.StreamWriter): Поток отправки клиенту.
+        turns (deque): Повороты, ожидающие тиков.
+    """
+
+    def __init__(self, name: str, slot: int, writer: asyncio.StreamWriter):
+        self.name = name
+        self.slot = slot
+        self.writer = writer
+        self.turns = deque()
+
+    def send(self, message: bytes) -> bool:
+        """
+        Ставит сообщение в очередь отправки без ожидания.
+
+        Returns:
+            False, если клиент отстал или отключился.
+        """
+        transport = self.writer.transport
+        if (transport.is_closing()
+                or transport.get_write_buffer_size() > MAX_SEND_BUFFER):
+            return False
+        self.writer.write(message)
+        return True
+
+
+class Room:
+    """
+    Игра одной комнаты.
+
+    Attributes:
+        name (str): Название комнаты.
+        world (engine.World): Состояние игры.
+        tracker (protocol.DeltaTracker): Изменения для рассылки.
+        players (dict[int, Player]): Игроки по номерам змеек.
+    """
+
+    def __init__(self, name: str, board: tuple[int, int] = ROOM_BOARD,
+                 snakes: int = ROOM_SNAKES, seed: int | None = None):
+        self.name = name
+        self.world = engine.World(engine.Board(*board), seed=seed,
+                                  snakes=snakes)
+        self.tracker = protocol.DeltaTracker(self.world)
+        self.players = {}
+
+    def join(self, name: str, writer: asyncio.StreamWriter) -> Player | None:
+        """
+        Отдаёт игроку свободную змейку и отправляет ему снимок игры.
+
+        Returns:
+            Игрок или None, если свободных змеек нет.
+        """
+        free = [slot for slot in range(len(self.world.snakes))
+                if slot not in self.players]
+        if not free:
+            return None
+        player = Player(name, free[0], writer)
+        self.players[player.slot] = player
+        player.send(protocol.frame(protocol.MSG_WELCOME,
+                                   self.tracker.snapshot(player.slot)))
+        return player
+
+    def leave(self, player: Player) -> None:
+        """Возвращает змейку игрока под управление сервера."""
+        if self.players.get(player.slot) is player:
+            del self.players[player.slot]
+
+    def tick(self) -> None:
+        """Один тик игры и рассылка изменений игрокам."""
+        world = self.world
+        actions = []
+        for slot, snake in enumerate(world.snakes):
+            player = self.players.get(slot)
+            if player is None:
+                actions.append(engine.steer_clear(world, snake))
+            else:
+                actions.append(player.turns.popleft()
+                               if player.turns else None)
+        _, events = engine.step_all(world, actions)
+        message = protocol.frame(protocol.MSG_TICK,
+                                 self.tracker.delta(events))
+        # Одно и то же сообщение уходит всем игрокам комнаты.
+        for player in list(self.players.values()):
+            if not player.send(message):
+                self.leave(player)
+                player.writer.close()
+
+
+async def read_message(reader: asyncio.StreamReader,
+                       limit: int = protocol.MAX_MESSAGE) -> tuple[int, bytes]:
+    """
+    Читает одно сообщение.
+
+    Args:
+        reader: Поток чтения.
+        limit: Наибольшая длина тела сообщения.
+
+    Raises:
+        asyncio.IncompleteReadError: Соединение закрыто.
+        ValueError: Слишком длинное сообщение.
+    """
+    kind, size = protocol.FRAME.unpack(
+        await reader.readexactly(protocol.FRAME.size))
+    if size > limit:
+        raise ValueError('Слишком длинное сообщение')
+    return kind, await reader.readexactly(size)
+
+
+class GameServer:
+    """
+    Сервер комнат.
+
+    Все комнаты продвигаются одной задачей tick_loop: на тике не
+    создаются задачи и не ожидается отправка, поэтому один процесс
+    обслуживает сотни комнат.
+
+    Attributes:
+        rooms (dict[str, Room]): Комнаты по названиям.
+        tick_rate (int): Тиков в секунду.
+        room_options (dict): Параметры новых комнат для Room.
+        tick_time (float): Время последнего тика всех комнат (с).
+        ticker (asyncio.Task | None): Задача тиков после serve.
+    """
+
+    def __init__(self, tick_rate: int = TICK_RATE, **room_options):
+        self.rooms = {}
+        self.tick_rate = tick_rate
+        self.room_options = room_options
+        self.tick_time = 0.0
+        self.ticker = None
+
+    def room(self, name: str) -> Room:
+        """Комната по названию, новая создаётся при первом входе."""
+        if name not in self.rooms:
+            self.rooms[name] = Room(name, **self.room_options)
+        return self.rooms[name]
+
+    def tick(self) -> None:
+        """Один тик всех комнат."""
+        started = perf_counter()
+        for room in self.rooms.values():
+            room.tick()
+        self.tick_time = perf_counter() - started
+
+    async def tick_loop(self) -> None:
+        """Тики с постоянной частотой без накопления опозданий."""
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.tick_rate
+        deadline = loop.time()
+        while True:
+            deadline += interval
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            self.tick()
+
+    async def handle(self, reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        """Соединение одного клиента: вход в комнату и повороты."""
+        player = room = None
+        try:
+            kind, payload = await read_message(reader, MAX_CLIENT_MESSAGE)
+            if kind != protocol.MSG_JOIN:
+                return
+            room_name, name = protocol.unpack_text(payload)
+            room = self.room(room_name)
+            player = room.join(name, writer)
+            if player is None:
+                writer.write(protocol.frame(protocol.MSG_REJECT))
+                return
+            while True:
+                kind, payload = await read_message(reader, MAX_CLIENT_MESSAGE)
+                if kind == protocol.MSG_TURN and payload:
+                    direction = payload[0]
+                    if (direction < len(engine.DIRECTIONS)
+                            and len(player.turns) < MAX_PENDING_TURNS):
+                        player.turns.append(engine.DIRECTIONS[direction])
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            if player is not None:
+                room.leave(player)
+                if not room.players:
+                    # Пустая комната больше не тратит время тиков.
+                    self.rooms.pop(room.name, None)
+            writer.close()
+
+    async def serve(self, host: str = HOST,
+                    port: int = PORT) -> asyncio.Server:
+        """
+        Запускает приём соединений и тики.
+
+        Args:
+            host: Адрес сервера.
+            port: Порт, 0 - любой свободный.
+
+        Returns:
+            Запущенный asyncio.Server.
+        """
+        server = await asyncio.start_server(self.handle, host, port)
+        self.ticker = asyncio.create_task(self.tick_loop())
+        return server
+
+
+async def main(host: str = HOST, port: int = PORT,
+               tick_rate: int = TICK_RATE) -> None:
+    """Работа сервера до прерывания."""
+    server = await GameServer(tick_rate).serve(host, port)
+    address = server.sockets[0].getsockname()
+    print(f'Сервер слушает {address[0]}:{address[1]}, {tick_rate} тиков/с')
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    options = dict(arg[2:].split('=', 1) for arg in sys.argv[1:]
+                   if arg.startswith('--') and '=' in arg)
+    try:
+        asyncio.run(main(options.get('host', HOST),
+                         int(options.get('port', PORT)),
+                         int(options.get('tick-rate', TICK_RATE))))
+    except KeyboardInterrupt:
+        pass
@@ -29,6 +29,22 @@ def import_the_snake():
     import my_snake  # noqa
 
 
+@pytest.fixture(autouse=True)
+def _scores_db(tmp_path, monkeypatch):
+    """Keep scores of games played in tests out of the real scores.db."""
+    import scores
+    monkeypatch.setattr(scores, 'SCORES_DB', str(tmp_path / 'scores.db'))
+    yield
+    snake = sys.modules.get('my_snake')
+    if snake is None:
+        return
+    if snake._score_writer is not None:
+        snake._score_writer.close()
+    if snake._score_store is not None:
+        snake._score_store.close()
+    snake._score_writer = snake._score_store = None
+
+
 @pytest.fixture(scope='session')
 def snake_import_test():
     check_import_process = Process(target=import_the_snake)
@@ -0,0 +1,71 @@
+import os
+
+import pygame
+
+import assets
+
+
+def test_atlas_is_cached_on_disk(tmp_path):
+    first = assets.load_atlas(16, cache_dir=str(tmp_path))
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and files[0].startswith('atlas-96x16-')
+
+    second = assets.load_atlas(16, cache_dir=str(tmp_path))
+    assert (pygame.image.tobytes(first.surface, 'RGBA')
+            == pygame.image.tobytes(second.surface, 'RGBA'))
+    assert second.rects['apple', 0] == pygame.Rect(32, 0, 16, 16)
+
+
+def test_cache_key_depends_on_size(tmp_path):
+    assets.load_image('logo', (30, 20), cache_dir=str(tmp_path))
+    assets.load_image('logo', (60, 40), cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_broken_cache_file_is_rebuilt(tmp_path):
+    assets.load_image('apple', (8, 8), cache_dir=str(tmp_path))
+    (path,) = tmp_path.iterdir()
+    path.write_bytes(b'broken')
+    image = assets.load_image('apple', (8, 8), cache_dir=str(tmp_path))
+    assert image.get_size() == (8, 8)
+    assert path.stat().st_size == 8 * 8 * 4
+
+
+def test_unwritable_cache_does_not_stop_loading(tmp_path):
+    # Каталог кеша нельзя создать: на его месте файл.
+    blocker = tmp_path / 'file'
+    blocker.write_bytes(b'')
+    image = assets.load_image('apple', (8, 8),
+                              cache_dir=str(blocker / 'cache'))
+    assert image.get_size() == (8, 8)
+    # Файл кеша нельзя заменить: временный файл убирается.
+    assets.load_image('apple', (8, 8), cache_dir=str(tmp_path / 'cache'))
+    (path,) = (tmp_path / 'cache').iterdir()
+    path.unlink()
+    path.mkdir()
+    image = assets.load_image('apple', (8, 8),
+                              cache_dir=str(tmp_path / 'cache'))
+    assert image.get_size() == (8, 8)
+    assert [entry.name for entry in (tmp_path / 'cache').iterdir()] == [
+        path.name]
+
+
+def test_rotations_are_packed_into_atlas(tmp_path):
+    atlas = assets.load_atlas(16, rotations={'snake_head': (0, 90, 180)},
+                              cache_dir=str(tmp_path))
+    assert atlas.surface.get_size() == (16 * 8, 16)
+    rotated = pygame.transform.rotate(atlas.image('snake_head'), 90)
+    assert (pygame.image.tobytes(rotated, 'RGBA')
+            == pygame.image.tobytes(atlas.image('snake_head', 90), 'RGBA'))
+
+
+def test_text_cache_reuses_and_evicts_surfaces():
+    pygame.font.init()
+    font = pygame.font.Font(None, 12)
+    cache = assets.TextCache(maxsize=2)
+    first = cache.render(font, 'a', (0, 0, 0))
+    assert cache.render(font, 'a', (0, 0, 0)) is first
+    cache.render(font, 'b', (0, 0, 0))
+    cache.render(font, 'c', (0, 0, 0))
+    assert (font, 'a', (0, 0, 0)) not in cache.surfaces
+    assert (cache.hits, cache.misses) == (1, 3)
@@ -0,0 +1,127 @@
+import autopilot
+import engine
+import tournament
+
+
+def test_neighbour_table_wraps_around_edges():
+    board = engine.Board(7, 5)
+    table = autopilot.neighbour_table(board)
+    assert len(table) == 4 * board.size
+    for cell in range(board.size):
+        x, y = board.point(cell)
+        for d, (dx, dy) in enumerate(engine.DIRECTIONS):
+            assert table[4 * cell + d] == board.index(
+                board.wrap(x + dx, y + dy))
+
+
+def test_distance_field_follows_apples():
+    world = engine.World(seed=4)
+    board = world.board
+    pilot = autopilot.Autopilot(board)
+    field = pilot.distance_field(world)
+    x, y = world.apple.position
+    assert field[board.index((x, y))] == 0
+    for dx, dy in engine.DIRECTIONS:
+        cell = board.wrap(x + dx, y + dy)
+        if not board.is_wall(cell):
+            assert field[board.index(cell)] == 1
+    assert all(field[cell] == autopilot.UNREACHABLE
+               for cell in range(board.size) if board.wall_map[cell])
+    # Пока яблоко на месте, поле не пересчитывается.
+    assert pilot.distance_field(world) is field
+    world.apple.place(next(cell for cell in board.open_cells
+                           if cell != (x, y)), world.free)
+    assert pilot.distance_field(world) is not field
+
+
+def test_boards_of_one_size_keep_their_own_walls():
+    open_board = engine.Board(12, 12)
+    open_board.wall_map[:] = bytes(open_board.size)
+    crossed = engine.Board(12, 12)
+    pilot = autopilot.Autopilot(open_board)
+    for board in (open_board, crossed, open_board):
+        world = engine.World(board, seed=5)
+        world.apple.place((2, 2), world.free)
+        field = pilot.distance_field(world)
+        wall = board.index((5, 8))
+        if board.wall_map[wall]:
+            assert field[wall] == autopilot.UNREACHABLE
+        else:
+            assert field[wall] == 9
+
+
+def test_large_board_field_grows_in_bounded_steps():
+    world = engine.World(engine.Board(400, 400), seed=6)
+    pilot = autopilot.Autopilot(world.board)
+    pilot(world, world.snake)
+    visited = int((pilot.field != autopilot.UNREACHABLE).sum())
+    # Один слой может выйти за бюджет, но не на всё поле.
+    assert 0 < visited < 4 * autopilot.FIELD_BUDGET
+    # Пока обход не дошёл до головы, змейка всё равно идёт к яблоку.
+    score = world.score
+    for _ in range(1200):
+        engine.step(world, pilot(world, world.snake))
+    assert world.score > score
+
+
+def test_autopilot_does_not_enter_dead_end():
+    board = engine.Board(12, 12)
+    board.wall_map[:] = bytes(board.size)
+    # Тупик на три клетки слева от головы, яблоко в нём.
+    for cell in [(0, 5), (1, 4), (2, 4), (3, 4), (1, 6), (2, 6), (3, 6)]:
+        board.wall_map[board.index(cell)] = 1
+    world = engine.World(board, seed=1)
+    world.apple.place((2, 5), world.free)
+    snake = world.snake
+    snake.positions = [(x, 5) for x in range(4, 12)]
+    snake.length = snake.size
+    snake.direction = engine.LEFT
+    pilot = autopilot.Autopilot(board)
+    # Ближе всего к яблоку - ход в тупик.
+    assert pilot.distance_field(world)[board.index((3, 5))] == 1
+    assert pilot(world, snake) in (engine.UP, engine.DOWN)
+
+
+def test_autopilot_chases_tail_when_boxed_in():
+    board = engine.Board(6, 6)
+    board.wall_map[:] = bytes(board.size)
+    world = engine.World(board, seed=2)
+    snake = world.snake
+    # Змейка заполняет поле, кроме клетки за хвостом: выжить можно,
+    # только идя за хвостом.
+    cells = [(x if y % 2 == 0 else 5 - x, y)
+             for y in range(6) for x in range(6)][:-1]
+    snake.positions = cells[::-1]
+    snake.length = snake.size
+    snake.direction = engine.LEFT
+    world.apple.release(world.free)
+    for _ in range(100):
+        _, events = engine.step(world, autopilot.drive(world, snake))
+        assert not events
+    assert snake.length == len(cells)
+
+
+def test_autopilot_outplays_greedy():
+    scores = {}
+    for name in ('greedy', 'autopilot'):
+        controller = tournament.resolve_controller(name)
+        scores[name] = sum(tournament.play_game(controller, seed,
+                                                max_ticks=1500)[1]
+                           for seed in range(4))
+    assert scores['autopilot'] > 2 * scores['greedy']
+
+
+def test_frontend_attract_mode(_the_snake, monkeypatch):
+    saved = []
+    monkeypatch.setattr(_the_snake, 'save_score',
+                        lambda name, score: saved.append(score))
+    monkeypatch.setattr(_the_snake, 'AUTOPILOT', True)
+    state = _the_snake.GameState('Demo')
+    assert state.autopilot
+    for _ in range(200):
+        state.advance(0.2)
+        state.draw_all(0.5)
+    assert state.world.score > 0
+    assert not saved
+    # Записываются только повороты, а не направление каждого тика.
+    assert 0 < len(state.recording.turns) < state.world.tick
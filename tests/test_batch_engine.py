@@ -0,0 +1,62 @@
+import numpy as np
+
+from batch_engine import BatchWorld
+from engine import DIRECTIONS, RIGHT
+
+
+def place(world, game, head, direction=RIGHT):
+    world.grid[game] = 0
+    world.heads[game] = head
+    world.directions[game] = DIRECTIONS.index(direction)
+    world.lengths[game] = 1
+    cell = head[1] * world.board.width + head[0]
+    world.grid[game, cell] = world.tick + 1
+
+
+def test_all_games_advance_and_wrap():
+    world = BatchWorld(4, seed=1)
+    place(world, 0, (world.board.width - 1, 0))
+    world.fruits[0] = (5, 5)
+    world.step()
+    assert tuple(world.heads[0]) == (0, 0)
+
+
+def test_apple_grows_snake_and_respawns_fruit():
+    world = BatchWorld(2, seed=2)
+    place(world, 0, (1, 1))
+    world.fruits[0] = (2, 1)
+    ate, dead, _ = world.step()
+    assert ate[0] and not dead[0]
+    assert world.lengths[0] == 2 and world.scores[0] == 10
+    assert tuple(world.fruits[0]) != (2, 1)
+    world.fruits[0] = (9, 9)
+    world.step()
+    assert (world.grid[0] > world.tick).sum() == 2
+
+
+def test_wall_collision_resets_game():
+    world = BatchWorld(1, seed=3)
+    wall_x = (world.board.width - 1) // 2
+    place(world, 0, (wall_x - 1, 1))
+    world.fruits[0] = (0, 0)
+    world.scores[0] = 30
+    _, dead, final_scores = world.step()
+    assert dead[0] and final_scores[0] == 30
+    assert world.scores[0] == 0 and world.lengths[0] == 1
+
+
+def test_reverse_turn_is_ignored():
+    world = BatchWorld(1, seed=4)
+    world.directions[0] = DIRECTIONS.index(RIGHT)
+    world.step(np.array([1]))
+    assert world.directions[0] == 0
+
+
+def test_fruit_never_spawns_on_snake_or_wall():
+    world = BatchWorld(64, seed=5)
+    for _ in range(300):
+        world.step(world.rng.integers(-1, 4, size=world.size))
+        cells = world.cells(world.fruits)
+        games = np.arange(world.size)
+        assert not world.walls[cells].any()
+        assert (world.grid[games, cells] <= world.tick).all()
@@ -0,0 +1,321 @@
+from random import Random
+
+import engine
+
+
+def make_world(seed=0):
+    return engine.World(rng=Random(seed))
+
+
+def test_step_returns_world_and_events():
+    world = make_world()
+    result, events = engine.step(world)
+    assert result is world
+    assert isinstance(events, list)
+
+
+def test_snake_wraps_around_board():
+    world = make_world()
+    snake = world.snake
+    snake.positions = [(world.board.width - 1, 0)]
+    snake.direction = engine.RIGHT
+    engine.step(world)
+    assert snake.get_head_position() == (0, 0)
+
+
+def test_reverse_turn_is_ignored():
+    world = make_world()
+    world.snake.direction = engine.RIGHT
+    world.snake.update_direction(engine.LEFT)
+    assert world.snake.direction == engine.RIGHT
+    world.snake.update_direction(engine.UP)
+    assert world.snake.direction == engine.UP
+
+
+def test_eating_apple_grows_snake():
+    world = make_world()
+    snake = world.snake
+    head = snake.get_head_position()
+    world.apple.place(world.board.wrap(head[0] + snake.direction[0],
+                                       head[1] + snake.direction[1]),
+                      world.free)
+    _, events = engine.step(world)
+    assert (engine.EVENT_EAT, engine.FRUIT_APPLE) in events
+    assert snake.length == 2
+    assert world.score == 10
+    assert world.apple.position not in snake.positions
+
+
+def test_wall_collision_resets_game():
+    world = make_world()
+    snake = world.snake
+    wall = next(iter(world.board.walls))
+    snake.positions = [world.board.wrap(wall[0] - 1, wall[1])]
+    snake.direction = engine.RIGHT
+    world.score = 40
+    _, events = engine.step(world)
+    assert (engine.EVENT_DEATH, 40) in events
+    assert world.score == 0
+    assert snake.get_head_position() not in world.board.walls
+
+
+def test_same_seed_gives_same_game():
+    worlds = [make_world(seed=7), make_world(seed=7)]
+    for _ in range(500):
+        for world in worlds:
+            engine.step(world)
+    first, second = worlds
+    assert first.snake.positions == second.snake.positions
+    assert first.apple.position == second.apple.position
+
+
+def test_free_cells_index_matches_board():
+    world = make_world(seed=3)
+    directions = engine.DIRECTIONS
+    for _ in range(3000):
+        engine.step(world, world.rng.choice(directions))
+        taken = set(world.snake.positions)
+        taken |= {fruit.position for fruit in [world.apple, *world.bonuses]
+                  if fruit.active}
+        assert set(world.free.cells) == world.board.open_cells - taken
+
+
+def test_head_to_head_on_fruit_keeps_fruit_cell_taken():
+    # Обе змейки гибнут, яблоко остаётся, его клетка не свободна.
+    world = engine.World(seed=3, snakes=2)
+    first, second = world.snakes
+    first.positions, first.direction = [(3, 3)], engine.RIGHT
+    second.positions, second.direction = [(5, 3)], engine.LEFT
+    world.apple.place((4, 3), world.free)
+    engine.step_all(world)
+    assert world.fruit_at((4, 3)) is world.apple
+    assert not world.occupancy[world.board.index((4, 3))]
+    taken = {cell for snake in world.snakes for cell in snake.positions}
+    taken |= {fruit.position for fruit in [world.apple, *world.bonuses]
+              if fruit.active}
+    assert set(world.free.cells) == world.board.open_cells - taken
+
+
+def test_ring_buffer_body_moves_grows_and_shrinks():
+    world = make_world()
+    snake = world.snake
+    snake.positions = [(3, 1), (2, 1), (1, 1)]
+    snake.length = 4
+    snake.direction = engine.RIGHT
+    snake.move()
+    assert snake.positions == [(4, 1), (3, 1), (2, 1), (1, 1)]
+    snake.move()
+    assert snake.positions == [(5, 1), (4, 1), (3, 1), (2, 1)]
+    assert not snake.occupies((1, 1)) and (1, 1) in world.free
+    snake.shrink(2)
+    assert snake.positions == [(5, 1), (4, 1)]
+    assert not snake.occupies((3, 1))
+
+
+def test_snake_bites_itself():
+    world = make_world()
+    snake = world.snake
+    snake.positions = [(2, 2), (3, 2), (3, 3), (2, 3), (1, 3)]
+    snake.length = 5
+    snake.direction = engine.DOWN
+    snake.move()
+    assert snake.bites_itself()
+
+
+def test_speed_is_capped():
+    world = make_world()
+    for _ in range(1000):
+        world.snake.accelerate()
+    assert world.snake.speed == engine.MAX_SPEED
+
+
+def test_timer_wheel_fires_on_tick():
+    wheel = engine.TimerWheel(size=4)
+    wheel.schedule(2, ('a', 1))
+    # Таймер дальше размера колеса ждёт нужного оборота.
+    wheel.schedule(6, ('b', 2))
+    cancelled = wheel.schedule(2, ('c', 3))
+    wheel.cancel(cancelled)
+    fired = {wheel.tick + 1: wheel.advance() for _ in range(8)}
+    assert fired[2] == [('a', 1)]
+    assert fired[6] == [('b', 2)]
+    assert sum(map(len, fired.values())) == 2
+
+
+def test_bonus_has_its_own_expiry_timer():
+    world = make_world()
+    world.bonus_ready = True
+    cherry = next(b for b in world.bonuses if b.name == engine.FRUIT_CHERRY)
+    world.bonuses = [cherry]
+    world.rng.random = lambda: 0.0
+    engine.bonus_spawn(world)
+    assert cherry.active and not world.bonus_ready
+    lifetime = world.ticks_for(engine.BONUS_LIFETIME)
+    assert cherry.timer.tick == world.tick + lifetime
+    assert world.bonus_remaining(cherry) == engine.BONUS_LIFETIME
+    for _ in range(lifetime - 1):
+        world.tick += 1
+        engine.fire_timers(world)
+    assert cherry.active
+    world.tick += 1
+    engine.fire_timers(world)
+    assert not cherry.active and cherry.position in world.free
+
+
+def test_placed_fruit_moves_its_cell_in_free_index():
+    world = make_world()
+    apple = world.apple
+    old = apple.position
+    new = next(iter(world.free.cells))
+    apple.place(new, world.free)
+    assert world.fruit_at(new) is apple and world.fruit_at(old) is None
+    assert old in world.free and new not in world.free
+
+
+def test_fruit_under_head_is_found_by_cell_index():
+    world = engine.World(seed=5, apples=300)
+    assert len(world.fruits) == 300
+    snake = world.snake
+    snake.positions = [(1, 1)]
+    snake.direction = engine.RIGHT
+    target = (2, 1)
+    apple = world.fruit_at(target) or world.apples[-1]
+    apple.place(target, world.free)
+    _, events = engine.step(world)
+    assert events == [(engine.EVENT_EAT, engine.FRUIT_APPLE)]
+    assert apple.active and world.fruits[apple.position] is apple
+    assert world.fruit_at(target) is None
+    assert len(world.fruits) == 300
+
+
+def test_registered_fruit_type_is_spawned(monkeypatch):
+    monkeypatch.setattr(engine, 'FRUIT_TYPES', dict(engine.FRUIT_TYPES))
+
+    @engine.register_fruit('gold', chance=1.0, lifetime=3)
+    def eat_gold(world, snake, fruit):
+        snake.score += 500
+
+    world = make_world()
+    assert [b.name for b in world.bonuses][-1] == 'gold'
+    world.bonuses = [world.bonuses[-1]]
+    world.bonus_ready = True
+    engine.bonus_spawn(world)
+    gold = world.bonuses[0]
+    assert gold.active
+    engine.eat_fruit(world, world.snake, gold)
+    assert world.score == 500 and gold.timer is None
+
+
+def test_body_buffer_grows_with_snake():
+    world = make_world()
+    snake = world.snake
+    cells = [(x, 1) for x in range(32, 0, -1) if x != 16]
+    snake.positions = cells
+    assert len(snake.body) < world.board.size
+    assert snake.positions == cells
+    snake.length = len(cells) + 1
+    snake.direction = engine.UP
+    snake.move()
+    assert snake.positions == [(32, 0)] + cells
+
+
+def test_large_board_uses_compact_maps():
+    board = engine.Board(1000, 1000)
+    world = engine.World(board, seed=1)
+    assert len(board.wall_map) == board.size
+    assert board.is_wall((499, 3)) and not board.is_wall((3, 3))
+    assert len(world.free) == board.size - len(board.walls) - 2
+    assert world.apple.position not in world.free
+
+
+def make_arena(snakes, seed=0):
+    world = engine.World(rng=Random(seed), snakes=snakes)
+    for apple in world.apples:
+        apple.release(world.free)
+        apple.position = None
+    return world
+
+
+def place(snake, cells, direction):
+    snake.positions = cells
+    snake.length = len(cells)
+    snake.direction = direction
+
+
+def test_head_to_head_kills_both_snakes():
+    world = make_arena(2)
+    first, second = world.snakes
+    place(first, [(3, 1)], engine.RIGHT)
+    place(second, [(5, 1)], engine.LEFT)
+    first.score, second.score = 20, 30
+    _, events = engine.step_all(world)
+    assert (engine.EVENT_DEATH, 0, 20) in events
+    assert (engine.EVENT_DEATH, 1, 30) in events
+    assert first.score == second.score == 0
+
+
+def test_head_into_other_body_kills_only_attacker():
+    world = make_arena(2)
+    first, second = world.snakes
+    place(first, [(4, 0)], engine.DOWN)
+    place(second, [(5, 1), (4, 1), (3, 1)], engine.RIGHT)
+    _, events = engine.step_all(world)
+    assert [event[:2] for event in events] == [(engine.EVENT_DEATH, 0)]
+    assert second.positions == [(6, 1), (5, 1), (4, 1)]
+    assert world.occupancy[world.board.index((4, 0))] == 0
+
+
+def test_head_follows_other_tail():
+    world = make_arena(2)
+    first, second = world.snakes
+    place(first, [(3, 2)], engine.UP)
+    place(second, [(5, 1), (4, 1), (3, 1)], engine.RIGHT)
+    _, events = engine.step_all(world)
+    assert events == []
+    assert first.get_head_position() == (3, 1)
+
+
+def test_contested_fruit_is_not_eaten():
+    world = make_arena(2)
+    first, second = world.snakes
+    place(first, [(3, 1)], engine.RIGHT)
+    place(second, [(5, 1)], engine.LEFT)
+    world.apple.place((4, 1), world.free)
+    _, events = engine.step_all(world)
+    assert all(kind == engine.EVENT_DEATH for kind, _, _ in events)
+    assert world.fruit_at((4, 1)) is world.apple
+
+
+def test_rival_eats_fruit_and_step_reports_first_snake_only():
+    world = make_arena(2)
+    first, second = world.snakes
+    place(first, [(3, 4)], engine.RIGHT)
+    place(second, [(5, 1)], engine.LEFT)
+    world.apple.place((4, 1), world.free)
+    _, events = engine.step(world)
+    assert events == []
+    assert second.score == 10 and second.length == 2
+    assert world.score == 0
+
+
+def test_steer_clear_turns_away_from_bodies():
+    world = make_arena(2)
+    first, second = world.snakes
+    place(first, [(3, 1)], engine.RIGHT)
+    place(second, [(4, 2), (4, 1), (4, 0)], engine.DOWN)
+    assert engine.steer_clear(world, first) == engine.DOWN
+    place(first, [(3, 5)], engine.RIGHT)
+    assert engine.steer_clear(world, first) is None
+
+
+def test_arena_with_many_snakes_keeps_occupancy_consistent():
+    board = engine.Board(200, 200)
+    world = engine.World(board, seed=5, snakes=150, apples=50)
+    for _ in range(200):
+        engine.step_all(world, [engine.steer_clear(world, snake)
+                                for snake in world.snakes])
+    total = sum(snake.size for snake in world.snakes)
+    assert sum(world.occupancy) == total
+    taken = {cell for snake in world.snakes for cell in snake.positions}
+    assert len(taken) == total
+    assert not taken & set(world.free.cells)
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+import engine
+import env
+
+
+def test_observation_is_written_in_place():
+    game = env.SnakeEnv()
+    observation, info = game.reset(seed=4)
+    world = game.world
+    walls = np.zeros((world.board.height, world.board.width), np.uint8)
+    for x, y in world.board.walls:
+        walls[y, x] = 1
+    assert (observation[env.CHANNEL_WALLS] == walls).all()
+    assert observation[env.CHANNEL_HEAD].sum() == 1
+    assert observation[env.CHANNEL_APPLE].sum() == 1
+    assert info == {'score': 0, 'length': 1, 'tick': 0}
+
+    world.apple.place((4, 1), world.free)
+    snake = world.snake
+    snake.positions = [(3, 1)]
+    snake.direction = engine.RIGHT
+    again, reward, terminated, truncated, info = game.step(None)
+    assert again is observation
+    assert reward == 10 and not terminated and not truncated
+    assert info['length'] == 2
+    assert observation[env.CHANNEL_HEAD, 1, 4] == 1
+    assert observation[env.CHANNEL_HEAD].sum() == 1
+    body = np.argwhere(observation[env.CHANNEL_BODY])
+    assert sorted(map(tuple, body)) == sorted(
+        (y, x) for x, y in snake.positions)
+    assert observation[env.CHANNEL_APPLE, 1, 4] == 0
+
+
+def test_death_ends_episode():
+    game = env.SnakeEnv(max_steps=3)
+    game.reset(seed=1)
+    snake = game.world.snake
+    snake.positions = [(15, 1)]
+    snake.direction = engine.RIGHT
+    game.world.score = 40
+    _, reward, terminated, truncated, info = game.step(
+        engine.DIRECTIONS.index(engine.RIGHT))
+    assert terminated and not truncated
+    assert reward == 0 and info['score'] == 40
+    game.reset(seed=1)
+    for _ in range(3):
+        _, _, terminated, truncated, _ = game.step(None)
+    assert truncated or terminated
+
+
+def test_shared_batch_matches_local_envs():
+    count = 6
+    local = [env.SnakeEnv() for _ in range(count)]
+    for index, game in enumerate(local):
+        game.reset(seed=100 + index)
+    with env.SharedEnvBatch(count, workers=2) as batch:
+        observations = batch.reset(seed=100)
+        assert observations.shape == (count, *env.observation_shape(
+            (engine.GRID_WIDTH, engine.GRID_HEIGHT)))
+        for index, game in enumerate(local):
+            assert (observations[index] == game.observation).all()
+        rng = np.random.default_rng(0)
+        done = np.zeros(count, bool)
+        for _ in range(10):
+            actions = rng.integers(-1, 4, size=count)
+            _, rewards, terminated, truncated = batch.step(actions)
+            for index, game in enumerate(local):
+                if done[index]:
+                    continue
+                action = int(actions[index])
+                _, reward, ended, _, _ = game.step(
+                    action if action >= 0 else None)
+                assert terminated[index] == ended
+                assert rewards[index] == reward
+                done[index] = ended
+                if not ended:
+                    assert (observations[index] == game.observation).all()
+
+
+def test_shared_batch_is_reproducible_after_auto_reset():
+    runs = []
+    for _ in range(2):
+        with env.SharedEnvBatch(4, workers=2, max_steps=30) as batch:
+            batch.reset(seed=7)
+            rng = np.random.default_rng(1)
+            ended = 0
+            for _ in range(80):
+                _, _, terminated, truncated = batch.step(
+                    rng.integers(-1, 4, size=4))
+                ended += int((terminated | truncated).sum())
+            runs.append(batch.observations.copy())
+        assert ended >= 4
+    assert (runs[0] == runs[1]).all()
+    # Следующий эпизод среды начинается с зерна со сдвигом на размер
+    # пакета.
+    assert env.episode_seed(7, 1, 2, 4) == 16
+    assert env.episode_seed(None, 1, 2, 4) is None
+
+
+def test_shared_batch_reports_worker_errors():
+    with env.SharedEnvBatch(2, workers=2) as batch:
+        # Без reset у сред нет мира: ошибка процесса доходит до вызова,
+        # а пакет остаётся рабочим.
+        with pytest.raises(AttributeError):
+            batch.step()
+        batch.reset(seed=3)
+        batch.step()
@@ -0,0 +1,29 @@
+import pygame
+
+
+def test_quick_presses_are_applied_on_successive_ticks(_the_snake):
+    queue = _the_snake.TurnQueue()
+    right = _the_snake.RIGHT
+    assert queue.push(pygame.K_UP, right, 1.0)
+    # Налево нельзя относительно RIGHT, но можно после UP из очереди.
+    assert queue.push(pygame.K_LEFT, right, 1.01)
+    assert not queue.push(pygame.K_RIGHT, right, 1.02)
+    assert queue.pop(1.1) == _the_snake.UP
+    assert queue.pop(1.2) == _the_snake.LEFT
+    assert queue.pop(1.3) is None
+    report = queue.latency_report()
+    assert report['count'] == 2
+    assert abs(report['max_ms'] - 190) < 1e-6
+
+
+def test_queued_turns_drive_the_snake(_the_snake):
+    state = _the_snake.GameState('Tester')
+    snake = state.world.snake
+    state.world.apple.place((30, 20), state.world.free)
+    snake.positions = [(3, 3)]
+    snake.direction = _the_snake.RIGHT
+    state.turns.push(pygame.K_DOWN, snake.direction, 0.0)
+    state.turns.push(pygame.K_LEFT, snake.direction, 0.0)
+    state.tick()
+    state.tick()
+    assert snake.get_head_position() == (2, 4)
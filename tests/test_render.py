@@ -0,0 +1,144 @@
+import pygame
+import pytest
+
+
+def make_state(module):
+    state = module.GameState('Tester')
+    snake = state.world.snake
+    snake.positions = [(x, 1) for x in range(14, 0, -1)]
+    snake.length = 14
+    snake.direction = module.RIGHT
+    return state
+
+
+def test_frame_is_submitted_in_one_call(_the_snake):
+    state = make_state(_the_snake)
+    state.draw_all()
+    assert state.batch.draw_calls == 1
+    # Фон, 14 сегментов, яблоко и 5 строк статистики по 2 изображения.
+    assert state.batch.blit_count == 1 + 14 + 1 + 10
+
+
+def test_dirty_frame_redraws_only_changed_cells(_the_snake):
+    state = make_state(_the_snake)
+    state.draw_all()
+    state.world.snake.move()
+    state.draw_all()
+    # Новая голова, бывшая голова (теперь тело) и освободившийся хвост.
+    assert state.batch.draw_calls == 1
+    assert state.batch.blit_count == 4
+
+
+def test_dirty_and_full_frames_match(_the_snake):
+    state = make_state(_the_snake)
+    state.draw_all()
+    for _ in range(5):
+        state.tick()
+        state.draw_all()
+    partial = pygame.image.tobytes(_the_snake.screen, 'RGB')
+    state.full_redraw = True
+    state.draw_all()
+    assert pygame.image.tobytes(_the_snake.screen, 'RGB') == partial
+
+
+def test_logic_runs_fixed_ticks_regardless_of_frame_rate(_the_snake):
+    state = make_state(_the_snake)
+    state.world.apple.place((30, 20), state.world.free)
+    state.world.snake.positions = [(10, 1), (9, 1)]
+    state.world.snake.length = 2
+    duration = _the_snake.engine.tick_duration(state.world.snake.speed)
+    alpha = state.advance(duration * 3.5)
+    assert state.world.snake.get_head_position() == (13, 1)
+    assert abs(alpha - 0.5) < 1e-9
+    overlay_rect, _ = state.head_overlay(alpha)
+    assert overlay_rect.topleft == (12 * 20 + 10, 20)
+
+
+def test_camera_follows_head_on_large_board(_the_snake):
+    camera = _the_snake.Camera((1000, 800), view_size=(33, 25))
+    assert camera.scrolls
+    camera.follow((500, 400))
+    head = camera.to_view((500, 400))
+    margin = _the_snake.CAMERA_MARGIN
+    assert margin <= head[0] < 33 - margin and margin <= head[1] < 25 - margin
+    assert camera.to_view((0, 0)) is None
+    # Поле замкнуто: у края камера показывает клетки с другой стороны.
+    camera.follow((999, 0))
+    assert camera.to_view((0, 1)) is not None
+
+
+def test_small_board_keeps_camera_still(_the_snake):
+    camera = _the_snake.Camera((33, 25), view_size=(33, 25))
+    assert not camera.scrolls
+    assert not camera.follow((32, 24))
+    assert camera.to_view((32, 24)) == (32, 24)
+
+
+def test_board_size_option_is_checked(_the_snake, monkeypatch):
+    monkeypatch.setattr(_the_snake, 'BOARD_SIZE', _the_snake.BOARD_SIZE)
+    _the_snake.parse_options(['--board=100x80'])
+    assert _the_snake.BOARD_SIZE == (100, 80)
+    for size in ('10', '0x0', '10x-5', '10x10x10', '70000x10', 'ax10'):
+        with pytest.raises(SystemExit):
+            _the_snake.parse_options([f'--board={size}'])
+    assert _the_snake.BOARD_SIZE == (100, 80)
+
+
+def test_board_of_other_size_draws_its_own_walls(_the_snake):
+    for size in [(20, 15), (40, 20)]:
+        state = _the_snake.GameState('Tester', board_size=size)
+        background = state.background
+        board = state.world.board
+        period = _the_snake.GROUND_PERIOD
+        for cell in [(9, 2), (16, 2), (2, 7), (2, 12)]:
+            view = state.camera.to_view(cell)
+            if view is None:
+                continue
+            color = background.get_at(_the_snake.to_screen(view))
+            grass = _the_snake.images['fon'].get_at(_the_snake.to_screen(
+                (cell[0] % period, cell[1] % period)))
+            if board.is_wall(cell):
+                assert color != grass
+            else:
+                assert color == grass
+        # Клетки окна за краем поля не похожи на траву.
+        outside = _the_snake.to_screen((min(size[0], 32), size[1]))
+        assert background.get_at(outside) == pygame.Color(
+            _the_snake.BOARD_BACKGROUND_COLOR)
+
+
+def test_large_board_frame_depends_on_view(_the_snake):
+    state = _the_snake.GameState('Tester', board_size=(2000, 1000))
+    snake = state.world.snake
+    snake.positions = [(x, 3) for x in range(100, 0, -1)]
+    snake.direction = _the_snake.RIGHT
+    state.camera.follow(snake.get_head_position())
+    state.full_redraw = True
+    state.draw_all()
+    view_cells = 33 * 25
+    # Видимые сегменты и фрукты, но не вся змейка и не всё поле.
+    assert len(state.drawn_sprites) <= view_cells
+    assert len(state.drawn_sprites) < 100
+    state.advance(1.0)
+    state.draw_all(0.5)
+    partial = pygame.image.tobytes(_the_snake.screen, 'RGB')
+    state.full_redraw = True
+    state.draw_all(0.5)
+    assert pygame.image.tobytes(_the_snake.screen, 'RGB') == partial
+
+
+def test_rivals_share_the_board(_the_snake, monkeypatch):
+    monkeypatch.setattr(_the_snake, 'save_score', lambda *args: None)
+    state = _the_snake.GameState('Tester', rivals=3)
+    assert state.recording is None
+    assert len(state.snakes) == 4
+    heads = {snake.get_head_position() for snake in state.world.snakes}
+    sprites = state.frame_sprites()
+    assert all(sprites[head][0] == 'snake_head' for head in heads)
+    for _ in range(50):
+        state.advance(0.2)
+        state.draw_all(0.5)
+    partial = pygame.image.tobytes(_the_snake.screen, 'RGB')
+    state.full_redraw = True
+    state.draw_all(0.5)
+    assert pygame.image.tobytes(_the_snake.screen, 'RGB') == partial
@@ -0,0 +1,52 @@
+from random import Random
+
+import pytest
+
+import engine
+from replay import Replay, simulate, verify
+
+
+def play(seed, ticks=3000):
+    """Игра со случайными поворотами и её запись."""
+    world = engine.World(seed=seed)
+    recording = Replay(seed)
+    moves = Random(seed + 1)
+    for _ in range(ticks):
+        action = None
+        if moves.random() < 0.2:
+            action = moves.choice(engine.DIRECTIONS)
+        _, events = engine.step(world, action)
+        recording.record(world, action, events)
+    return recording
+
+
+def test_same_seed_same_game():
+    assert play(7).to_bytes() == play(7).to_bytes()
+    assert play(7).to_bytes() != play(8).to_bytes()
+
+
+def test_replay_round_trip_and_verify():
+    recording = play(42)
+    assert recording.deaths
+    data = recording.to_bytes()
+    # Поворот занимает один-два байта.
+    assert len(data) < 64 + 2 * len(recording.turns) + 4 * len(
+        recording.deaths)
+    loaded = Replay.from_bytes(data)
+    assert loaded.turns == recording.turns
+    assert loaded.deaths == recording.deaths
+    assert verify(loaded)
+    assert simulate(loaded).to_bytes() == data
+
+
+def test_tampered_score_is_detected():
+    recording = play(3)
+    recording.score += 10
+    assert not verify(Replay.from_bytes(recording.to_bytes()))
+
+
+def test_bad_data_is_rejected():
+    with pytest.raises(ValueError):
+        Replay.from_bytes(b'NOPE' + bytes(40))
+    with pytest.raises(ValueError):
+        Replay.from_bytes(play(1).to_bytes()[:-1])
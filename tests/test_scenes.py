@@ -0,0 +1,53 @@
+import time
+
+import pygame
+
+
+def test_static_menu_waits_for_event(_the_snake):
+    _the_snake.open_window(_the_snake.SCREEN_SIZE)
+    pygame.event.clear()
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_UP))
+    events = _the_snake.wait_events(animated=False)
+    assert [event.type for event in events] == [pygame.KEYDOWN]
+
+
+def test_animated_menu_does_not_block(_the_snake):
+    _the_snake.open_window(_the_snake.SCREEN_SIZE)
+    pygame.event.clear()
+    assert _the_snake.wait_events(animated=True) == []
+
+
+def test_cpu_time_is_charged_to_scene(_the_snake):
+    _the_snake.scene_cpu_times.clear()
+    mark = time.process_time()
+    sum(range(100000))
+    mark = _the_snake.charge_cpu('Test', mark)
+    _the_snake.charge_cpu('Test', mark)
+    assert _the_snake.scene_cpu_times['Test'] > 0
+    assert 'Test' in _the_snake.cpu_report()
+
+
+def test_menus_are_built_once(_the_snake):
+    scenes = _the_snake.SceneManager(_the_snake.MENU_SCENES)
+    scenes.stack.append(scenes.scene('menu'))
+    for _ in range(3):
+        scenes.push('scores')
+        scores = scenes.current
+        scenes.pop()
+    assert scenes.scene('scores') is scores
+    assert len(scenes.stack) == 1
+    assert set(scenes.scenes) == {'menu', 'scores'}
+
+
+def test_back_button_returns_from_scene(_the_snake):
+    scenes = _the_snake.SceneManager(_the_snake.MENU_SCENES)
+    scenes.stack.append(scenes.scene('menu'))
+    scenes.push('manual')
+    pygame.event.clear()
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN,
+                                         unicode='\r', scancode=40, mod=0))
+    # «Назад» - единственная кнопка, Enter возвращает в главное меню.
+    scenes.current.run(scenes)
+    assert scenes.current is scenes.scene('menu')
+    assert pygame.display.get_surface().get_size() == (
+        _the_snake.SCREEN_MANUAL)
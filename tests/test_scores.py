@@ -0,0 +1,118 @@
+import json
+import multiprocessing
+
+from scores import ScoreStore, ScoreWriter
+
+
+def test_top_and_best(tmp_path):
+    store = ScoreStore(str(tmp_path / 'scores.db'))
+    assert store.best() == 0 and store.top() == []
+    for name, score in (('a', 10), ('b', 30), ('a', 20), ('c', 30)):
+        store.add(name, score, '2024-01-01')
+    assert store.best() == 30
+    # При равном счёте выше тот, кто набрал его раньше.
+    assert [row['name'] for row in store.top(3)] == ['b', 'c', 'a']
+    assert store.top(2, offset=2)[0] == {
+        'name': 'a', 'score': 20, 'date': '2024-01-01'}
+    assert store.player_best('a') == 20 and store.player_games('a') == 2
+    assert len(store) == 4
+
+
+def test_history_is_kept(tmp_path):
+    store = ScoreStore(str(tmp_path / 'scores.db'))
+    for score in range(100):
+        store.add('p', score)
+    assert len(store) == 100
+    assert ScoreStore(str(tmp_path / 'scores.db')).best() == 99
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    legacy = tmp_path / 'scores.json'
+    legacy.write_text(json.dumps(
+        [{'name': 'old', 'score': 50, 'date': '2023-05-05'}]))
+    path = str(tmp_path / 'scores.db')
+    ScoreStore(path, str(legacy)).close()
+    store = ScoreStore(path, str(legacy))
+    assert len(store) == 1 and store.best() == 50
+
+
+def add_scores(path, name):
+    store = ScoreStore(path)
+    for score in range(50):
+        store.add(name, score)
+
+
+def test_concurrent_writers_do_not_lose_results(tmp_path):
+    path = str(tmp_path / 'scores.db')
+    ScoreStore(path).close()
+    workers = [multiprocessing.Process(target=add_scores, args=(path, name))
+               for name in 'abcd']
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert len(ScoreStore(path)) == 200
+
+
+def test_writer_flushes_on_close(tmp_path):
+    path = str(tmp_path / 'scores.db')
+    writer = ScoreWriter(path, batch=16)
+    for score in range(100):
+        writer.submit('p', score)
+    # Лучший счёт известен сразу, без ожидания записи.
+    assert writer.best == 99
+    writer.close()
+    assert len(ScoreStore(path)) == 100
+    assert ScoreWriter(path).best == 99
+    # После close flush не ждёт остановленный поток.
+    writer.submit('p', 100)
+    writer.flush()
+    writer.close()
+
+
+def test_writer_takes_queued_results_in_batches(tmp_path):
+    writer = ScoreWriter(str(tmp_path / 'scores.db'), batch=3)
+    writer.close()
+    for score in range(5):
+        writer.queue.put(('p', score, '2024-01-01'))
+    rows, stop = writer.next_batch()
+    assert len(rows) == 3 and not stop
+    rows, stop = writer.next_batch()
+    assert len(rows) == 2 and not stop
+
+
+def test_store_filters_by_player_and_date(tmp_path):
+    store = ScoreStore(str(tmp_path / 'scores.db'))
+    store.add_many([('a', 10, '2024-01-05'), ('b', 20, '2024-02-01'),
+                    ('a', 30, '2024-02-10'), ('a', 5, '2023-12-31')])
+    assert [row['score'] for row in store.top(10, name='a')] == [30, 10, 5]
+    assert [row['score'] for row in store.top(10, date='2024-02')] == [
+        30, 20]
+    assert store.top(10, name='a', date='2024-01') == [
+        {'name': 'a', 'score': 10, 'date': '2024-01-05'}]
+    # Фильтр по дате идёт по индексу, а не просмотром всей таблицы.
+    plan = store.connection.execute(
+        'EXPLAIN QUERY PLAN SELECT name FROM scores '
+        'WHERE date >= ? AND date < ? ORDER BY score DESC, id LIMIT 5',
+        ('2024-02', '2024-02\uffff')).fetchall()
+    assert any('scores_by_date' in row[-1] for row in plan)
+
+
+def test_leaderboard_pages(_the_snake, tmp_path, monkeypatch):
+    store = ScoreStore(str(tmp_path / 'scores.db'))
+    store.add_many([('p', score, '2024-01-01') for score in range(12)])
+    monkeypatch.setattr(_the_snake, '_score_store', store)
+    scenes = _the_snake.SceneManager(_the_snake.MENU_SCENES)
+    board = scenes.scene('scores').on_enter.__self__
+    board.reset(None)
+    assert board.rows[0].get_title() == 'p: 11 (2024-01-01)'
+    board.turn(1)
+    board.turn(1)
+    assert board.page == 2 and not board.has_next
+    assert [row.get_title() for row in board.rows] == [
+        'p: 1 (2024-01-01)', 'p: 0 (2024-01-01)', '', '', '']
+    board.turn(1)
+    assert board.page == 2
+    board.filter(name='nobody')
+    assert board.page == 0
+    assert board.rows[0].get_title() == 'Пока нет рекордов!'
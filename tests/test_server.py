@@ -0,0 +1,226 @@
+import asyncio
+
+import pytest
+
+import client
+import engine
+import protocol
+import server
+
+
+def assert_same_game(world, mirror):
+    for snake, copy in zip(world.snakes, mirror.snakes):
+        assert copy.positions == snake.positions
+        assert copy.direction == snake.direction
+        assert (copy.score, copy.length) == (snake.score, snake.length)
+    for fruit, copy in zip(protocol.fruit_slots(world), mirror.fruits):
+        assert copy.active == fruit.active
+        if fruit.active:
+            assert copy.position == fruit.position
+    assert mirror.world.tick == world.tick
+
+
+def test_mirror_follows_deltas():
+    world = engine.World(seed=3, snakes=6, apples=3)
+    for _ in range(20):
+        engine.step_all(world)
+    tracker = protocol.DeltaTracker(world)
+    mirror = protocol.Mirror(tracker.snapshot(2))
+    assert mirror.slot == 2
+    sent = deaths = 0
+    for _ in range(500):
+        actions = [engine.steer_clear(world, snake) for snake in world.snakes]
+        _, events = engine.step_all(world, actions)
+        payload = tracker.delta(events)
+        sent += len(payload)
+        applied = mirror.apply(payload)
+        deaths += sum(kind == engine.EVENT_DEATH for kind, _, _ in applied)
+        assert_same_game(world, mirror)
+    assert deaths
+    # Изменения, а не списки клеток: несколько байт на змейку за тик.
+    assert sent / 500 < 8 * len(world.snakes)
+
+
+async def read_message(reader):
+    return await asyncio.wait_for(server.read_message(reader), 5)
+
+
+async def join(port, room, name):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(protocol.frame(protocol.MSG_JOIN,
+                                protocol.pack_text(room, name)))
+    kind, payload = await read_message(reader)
+    return reader, writer, kind, payload
+
+
+def test_server_over_localhost():
+    async def scenario():
+        game = server.GameServer(snakes=3)
+        listener = await game.serve('127.0.0.1', 0)
+        # Тики выполняет тест, чтобы сравнивать копии между ними.
+        game.ticker.cancel()
+        port = listener.sockets[0].getsockname()[1]
+
+        first = await join(port, 'arena', 'Ann')
+        second = await join(port, 'arena', 'Bob')
+        assert first[2] == second[2] == protocol.MSG_WELCOME
+        mirrors = [protocol.Mirror(first[3]), protocol.Mirror(second[3])]
+        assert [mirror.slot for mirror in mirrors] == [0, 1]
+
+        room = game.rooms['arena']
+        snake = room.world.snakes[0]
+        turn = next(direction for direction in engine.DIRECTIONS
+                    if direction[0] != snake.direction[0]
+                    and direction[1] != snake.direction[1])
+        first[1].write(protocol.frame(
+            protocol.MSG_TURN, bytes([engine.DIRECTIONS.index(turn)])))
+        await first[1].drain()
+        while not room.players[0].turns:
+            await asyncio.sleep(0.01)
+
+        for _ in range(30):
+            game.tick()
+            for (reader, *_), mirror in zip((first, second), mirrors):
+                kind, payload = await read_message(reader)
+                assert kind == protocol.MSG_TICK
+                mirror.apply(payload)
+                assert_same_game(room.world, mirror)
+            if room.world.tick == 1:
+                assert snake.direction == turn or snake.size == 1
+
+        third = await join(port, 'arena', 'Cid')
+        fourth = await join(port, 'arena', 'Dan')
+        assert third[2] == protocol.MSG_WELCOME
+        assert fourth[2] == protocol.MSG_REJECT
+
+        for connection in (first, second, third, fourth):
+            connection[1].close()
+        await asyncio.sleep(0.05)
+        # Комната без игроков закрывается.
+        assert 'arena' not in game.rooms
+        listener.close()
+
+    asyncio.run(scenario())
+
+
+def test_server_limits_client_messages():
+    async def scenario():
+        game = server.GameServer(snakes=2)
+        listener = await game.serve('127.0.0.1', 0)
+        game.ticker.cancel()
+        port = listener.sockets[0].getsockname()[1]
+
+        reader, writer, kind, _ = await join(port, 'limits', 'Ann')
+        assert kind == protocol.MSG_WELCOME
+        player = game.rooms['limits'].players[0]
+        # Лишние повороты отбрасываются, первые остаются.
+        for direction in range(server.MAX_PENDING_TURNS + 2):
+            writer.write(protocol.frame(protocol.MSG_TURN,
+                                        bytes([direction % 4])))
+        await writer.drain()
+        while len(player.turns) < server.MAX_PENDING_TURNS:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        assert list(player.turns) == [
+            engine.DIRECTIONS[i] for i in range(server.MAX_PENDING_TURNS)]
+
+        # Заголовок слишком длинного сообщения закрывает соединение
+        # до чтения тела.
+        writer.write(protocol.FRAME.pack(protocol.MSG_TURN,
+                                         server.MAX_CLIENT_MESSAGE + 1))
+        await writer.drain()
+        assert await asyncio.wait_for(reader.read(), 5) == b''
+        assert 'limits' not in game.rooms
+        writer.close()
+        listener.close()
+
+    asyncio.run(scenario())
+
+
+def test_thin_client_connection():
+    async def scenario():
+        game = server.GameServer(tick_rate=100, snakes=2)
+        listener = await game.serve('127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        connection = await asyncio.to_thread(
+            client.Connection, '127.0.0.1', port, 'duel', 'Ann')
+        ticks = 0
+        while ticks < 10:
+            await asyncio.sleep(0.02)
+            _, received, closed = connection.receive()
+            ticks += received
+            assert not closed
+        mirror = connection.mirror
+        world = game.rooms['duel'].world
+        assert mirror.world.tick <= world.tick
+        connection.close()
+        game.ticker.cancel()
+        listener.close()
+
+    asyncio.run(scenario())
+
+
+def test_one_server_ticks_many_rooms():
+    game = server.GameServer()
+    rooms = [game.room(f'room-{i}') for i in range(300)]
+    for _ in range(5):
+        game.tick()
+    assert all(room.world.tick == 5 for room in rooms)
+
+
+def test_frontend_plays_as_thin_client(_the_snake, monkeypatch):
+    saved = []
+    monkeypatch.setattr(_the_snake, 'save_score',
+                        lambda name, score: saved.append(score))
+
+    async def scenario():
+        game = server.GameServer(snakes=3)
+        listener = await game.serve('127.0.0.1', 0)
+        game.ticker.cancel()
+        port = listener.sockets[0].getsockname()[1]
+        bot = await join(port, 'room', 'Bot')
+        connection = await asyncio.to_thread(
+            client.Connection, '127.0.0.1', port, 'room', 'Ann')
+        state = _the_snake.RemoteGameState('Ann', connection)
+        room = game.rooms['room']
+        assert state.recording is None
+        assert connection.mirror.slot == 1
+        own = room.world.snakes[1]
+        for _ in range(40):
+            game.tick()
+            while state.world.tick < room.world.tick:
+                await asyncio.sleep(0.005)
+                state.draw_all(state.advance(0.005))
+            assert state.world.snake.positions == own.positions
+        state.full_redraw = True
+        state.draw_all()
+        connection.close()
+        bot[1].close()
+        listener.close()
+
+    asyncio.run(scenario())
+
+
+def test_server_address_is_checked(_the_snake, monkeypatch):
+    assert _the_snake.parse_server('example.org:8765') == ('example.org',
+                                                           8765)
+    for address in ('example.org', ':8765', 'host:port', 'host:70000'):
+        with pytest.raises(ValueError):
+            _the_snake.parse_server(address)
+    monkeypatch.setattr(_the_snake, 'SERVER', None)
+    with pytest.raises(SystemExit):
+        _the_snake.parse_options(['--connect=example.org'])
+
+
+def test_unreachable_server_returns_to_menu(_the_snake, monkeypatch):
+    # На порту 1 локального адреса никто не слушает.
+    monkeypatch.setattr(_the_snake, 'SERVER', '127.0.0.1:1')
+    scenes = _the_snake.SceneManager(_the_snake.MENU_SCENES)
+    scenes.push('menu')
+    game = _the_snake.GameScene('Ann')
+    scenes.push(game)
+    game.run(scenes)
+    assert len(scenes.stack) == 2
+    assert scenes.stack[0] is scenes.scene('menu')
+    label = scenes.current.menu.get_widgets()[0]
+    assert '127.0.0.1:1' in label.get_title()
@@ -0,0 +1,26 @@
+import subprocess
+import sys
+
+from conftest import BASE_DIR
+
+CHECK_IMPORT = '''
+import pygame
+import my_snake
+print(pygame.display.get_init(), pygame.font.get_init(),
+      pygame.mixer.get_init(), len(my_snake.images), len(my_snake.sounds))
+'''
+
+
+def test_import_does_not_initialize_pygame():
+    result = subprocess.run(
+        [sys.executable, '-c', CHECK_IMPORT],
+        cwd=BASE_DIR, capture_output=True, text=True, timeout=10,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split()[-5:] == ['False', 'False', 'None', '0', '0']
+
+
+def test_window_is_opened_on_first_use(_the_snake):
+    screen = _the_snake.open_window(_the_snake.SCREEN_SIZE)
+    assert screen.get_size() == _the_snake.SCREEN_SIZE
+    assert 'window' in _the_snake.startup_times
@@ -0,0 +1,38 @@
+import numpy as np
+
+import engine
+import tournament
+
+
+def test_play_game_reports_cause_of_death():
+    seed, score, length, ticks, cause = tournament.play_game(
+        tournament.straight, seed=1)
+    assert seed == 1 and length == 1 and score == 0
+    # Прямо идущая змейка длины 1 может погибнуть только в стене.
+    assert cause == tournament.CAUSE_WALL
+    assert 0 < ticks <= max(engine.GRID_WIDTH, engine.GRID_HEIGHT)
+
+
+def test_games_stop_at_tick_limit():
+    result = tournament.play_game(engine.steer_clear, seed=2, max_ticks=50)
+    assert result[3] == 50 and result[4] == tournament.CAUSE_TIMEOUT
+
+
+def test_pool_matches_single_process(tmp_path):
+    names = ['straight', 'engine:steer_clear']
+    local = tournament.run_tournament(names, 70, max_ticks=200, workers=1)
+    pooled = tournament.run_tournament(names, 70, max_ticks=200, workers=2)
+    for name in names:
+        assert len(local[name]) == 70
+        assert (local[name] == pooled[name]).all()
+    assert list(local[names[0]]['seed']) == list(range(70))
+
+    path = tmp_path / 'results.npz'
+    tournament.save_results(path, pooled)
+    loaded = tournament.load_results(path)
+    assert list(loaded) == names
+    for name in names:
+        assert (loaded[name] == pooled[name]).all()
+    with np.load(path) as data:
+        assert data['score'].dtype == np.int32
+    assert 'straight' in tournament.summary(loaded)
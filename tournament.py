@@ -0,0 +1,265 @@
+"""Турнир ботов: тысячи игр без окна на всех ядрах.
+
+Бот (контроллер) - функция (world, snake) -> направление или None,
+которая вызывается на каждом тике. Каждый бот играет одни и те же
+зёрна; игра идёт до первой гибели змейки или до предела тиков.
+
+Игры раздаются процессам пачками по зёрнам: процесс получает только
+название бота и диапазон зёрен, а возвращает результаты пачки одним
+массивом NumPy. Итог записывается по столбцам в сжатый .npz:
+
+    python tournament.py --controllers=steer_clear,greedy --games=10000
+
+Бот из своего модуля задаётся как модуль:функция.
+"""
+import importlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+import numpy as np
+
+import autopilot
+import engine
+
+# Наибольшая длительность одной игры в тиках.
+MAX_TICKS = 5000
+
+# Игр в одном задании процесса.
+CHUNK_SIZE = 64
+
+# Причины окончания игры по номерам в столбце cause.
+CAUSES = ('timeout', 'wall', 'body')
+CAUSE_TIMEOUT, CAUSE_WALL, CAUSE_BODY = range(len(CAUSES))
+
+# Результат одной игры.
+RESULT_DTYPE = np.dtype([
+    ('seed', np.uint64),
+    ('score', np.int32),
+    ('length', np.int32),
+    ('ticks', np.int32),
+    ('cause', np.uint8),
+])
+
+
+def straight(world: engine.World, snake: engine.Snake) -> None:
+    """Бот, который никогда не поворачивает."""
+    return None
+
+
+def greedy(world: engine.World,
+           snake: engine.Snake) -> tuple[int, int] | None:
+    """Бот, идущий к ближайшему яблоку в обход занятых клеток."""
+    board = world.board
+    x, y = snake.get_head_position()
+    target = min((apple.position for apple in world.apples if apple.active),
+                 key=lambda cell: wrapped_distance(board, (x, y), cell),
+                 default=None)
+    best, best_distance = None, None
+    for direction in engine.DIRECTIONS:
+        # Разворот на месте невозможен.
+        if (direction[0] == -snake.direction[0]
+                and direction[1] == -snake.direction[1]):
+            continue
+        cell = board.wrap(x + direction[0], y + direction[1])
+        if world.blocked(cell):
+            continue
+        distance = (wrapped_distance(board, cell, target)
+                    if target else 0)
+        if best_distance is None or distance < best_distance:
+            best, best_distance = direction, distance
+    return best
+
+
+def wrapped_distance(board: engine.Board, start: tuple[int, int],
+                     end: tuple[int, int]) -> int:
+    """Число ходов между клетками с учётом выхода за край поля."""
+    dx = abs(start[0] - end[0])
+    dy = abs(start[1] - end[1])
+    return min(dx, board.width - dx) + min(dy, board.height - dy)
+
+
+# Встроенные боты по названиям.
+CONTROLLERS = {
+    'straight': straight,
+    'steer_clear': engine.steer_clear,
+    'greedy': greedy,
+    'autopilot': autopilot.drive,
+}
+
+
+def resolve_controller(name: str):
+    """
+    Бот по названию.
+
+    Args:
+        name: Название из CONTROLLERS или 'модуль:функция'.
+
+    Raises:
+        KeyError: Неизвестное название.
+    """
+    if ':' in name:
+        module, function = name.split(':', 1)
+        return getattr(importlib.import_module(module), function)
+    return CONTROLLERS[name]
+
+
+def play_game(controller, seed: int, max_ticks: int = MAX_TICKS,
+              board_size: tuple[int, int] = (engine.GRID_WIDTH,
+                                             engine.GRID_HEIGHT)) -> tuple:
+    """
+    Одна игра бота до гибели змейки или предела тиков.
+
+    Args:
+        controller: Функция (world, snake) -> направление или None.
+        seed: Зерно игры.
+        max_ticks: Предел тиков.
+        board_size: Размер поля.
+
+    Returns:
+        Кортеж полей RESULT_DTYPE.
+    """
+    world = engine.World(engine.Board(*board_size), seed=seed)
+    snake = world.snake
+    step = engine.step
+    while world.tick < max_ticks:
+        action = controller(world, snake)
+        if action is not None:
+            snake.update_direction(action)
+        length = snake.length
+        wall = world.board.is_wall(snake.next_head())
+        _, events = step(world)
+        for kind, data in events:
+            if kind == engine.EVENT_DEATH:
+                cause = CAUSE_WALL if wall else CAUSE_BODY
+                return seed, data, length, world.tick, cause
+    return seed, world.score, snake.length, world.tick, CAUSE_TIMEOUT
+
+
+def play_chunk(name: str, first_seed: int, count: int,
+               max_ticks: int, board_size: tuple[int, int]) -> np.ndarray:
+    """
+    Пачка игр одного бота в процессе пула.
+
+    Returns:
+        Массив RESULT_DTYPE длиной count.
+    """
+    controller = resolve_controller(name)
+    return np.array([play_game(controller, first_seed + i, max_ticks,
+                               board_size)
+                     for i in range(count)], dtype=RESULT_DTYPE)
+
+
+def run_tournament(names: list[str], games: int, first_seed: int = 0,
+                   max_ticks: int = MAX_TICKS,
+                   board_size: tuple[int, int] = (engine.GRID_WIDTH,
+                                                  engine.GRID_HEIGHT),
+                   workers: int | None = None) -> dict[str, np.ndarray]:
+    """
+    Играет games игр каждым ботом на зёрнах first_seed, first_seed + 1...
+
+    Args:
+        names: Названия ботов (см. resolve_controller).
+        games: Количество игр каждого бота.
+        first_seed: Первое зерно.
+        max_ticks: Предел тиков одной игры.
+        board_size: Размер поля.
+        workers: Количество процессов, по умолчанию по числу ядер.
+            1 - играть в текущем процессе.
+
+    Returns:
+        Результаты по названиям ботов в порядке зёрен.
+    """
+    for name in names:
+        resolve_controller(name)
+    jobs = [(name, first_seed + start, min(CHUNK_SIZE, games - start),
+             max_ticks, board_size)
+            for name in names for start in range(0, games, CHUNK_SIZE)]
+    if workers == 1:
+        chunks = [play_chunk(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            chunks = list(pool.map(play_chunk, *zip(*jobs)))
+    results = {name: [] for name in names}
+    for job, chunk in zip(jobs, chunks):
+        results[job[0]].append(chunk)
+    return {name: np.concatenate(parts) if parts
+            else np.empty(0, RESULT_DTYPE)
+            for name, parts in results.items()}
+
+
+def save_results(path: str, results: dict[str, np.ndarray]) -> None:
+    """
+    Записывает результаты по столбцам в сжатый .npz.
+
+    Столбец controller хранит номер бота в массиве controllers,
+    cause - номер причины в массиве causes.
+    """
+    names = list(results)
+    table = (np.concatenate(list(results.values())) if results
+             else np.empty(0, RESULT_DTYPE))
+    controller = np.repeat(np.arange(len(names), dtype=np.uint16),
+                           [len(rows) for rows in results.values()])
+    np.savez_compressed(
+        path, controllers=np.array(names), causes=np.array(CAUSES),
+        controller=controller,
+        **{field: table[field] for field in RESULT_DTYPE.names})
+
+
+def load_results(path: str) -> dict[str, np.ndarray]:
+    """Читает результаты, записанные save_results."""
+    with np.load(path) as data:
+        table = np.empty(len(data['controller']), RESULT_DTYPE)
+        for field in RESULT_DTYPE.names:
+            table[field] = data[field]
+        return {str(name): table[data['controller'] == i]
+                for i, name in enumerate(data['controllers'])}
+
+
+def summary(results: dict[str, np.ndarray]) -> str:
+    """Таблица средних результатов ботов."""
+    lines = [f'{"бот":<16}{"игр":>8}{"счёт":>10}{"длина":>8}{"тики":>9}  '
+             + ' '.join(f'{cause:>7}' for cause in CAUSES)]
+    for name, rows in results.items():
+        causes = np.bincount(rows['cause'], minlength=len(CAUSES))
+        means = [rows[field].mean() if len(rows) else 0.0
+                 for field in ('score', 'length', 'ticks')]
+        lines.append(f'{name:<16}{len(rows):>8}{means[0]:>10.1f}'
+                     f'{means[1]:>8.1f}{means[2]:>9.0f}  '
+                     + ' '.join(f'{count:>7}' for count in causes))
+    return '\n'.join(lines)
+
+
+def main(argv: list[str]) -> int:
+    """
+    Турнир из командной строки.
+
+    Параметры --controllers, --games, --seed, --max-ticks, --board=ШxВ,
+    --workers, --out.
+
+    Returns:
+        Код выхода.
+    """
+    options = dict(arg[2:].split('=', 1) for arg in argv
+                   if arg.startswith('--') and '=' in arg)
+    names = options.get('controllers', 'steer_clear,greedy').split(',')
+    games = int(options.get('games', 1000))
+    board_size = tuple(map(int, options.get(
+        'board', f'{engine.GRID_WIDTH}x{engine.GRID_HEIGHT}').split('x')))
+    workers = int(options['workers']) if 'workers' in options else None
+    out = options.get('out', 'tournament.npz')
+    started = perf_counter()
+    results = run_tournament(names, games, int(options.get('seed', 0)),
+                             int(options.get('max-ticks', MAX_TICKS)),
+                             board_size, workers)
+    elapsed = perf_counter() - started
+    save_results(out, results)
+    print(summary(results))
+    print(f'{games * len(names)} игр за {elapsed:.1f} с '
+          f'на {workers or os.cpu_count()} процессах, результаты в {out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))